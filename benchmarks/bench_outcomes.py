@@ -0,0 +1,89 @@
+"""Benchmark : classement des passages et duels, boucle ligne à ligne vs k9.outcomes vectorisé.
+
+Usage : python benchmarks/bench_outcomes.py [nb_lignes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from k9.outcomes import category_counts, duel_summary, penalties, speeds  # noqa: E402
+
+
+def random_runs(n, seed=0):
+    """Colonnes texte comme dans resultats : virgules décimales, '-' pour éliminé, '' ou '-' sans pénalité."""
+    rng = np.random.default_rng(seed)
+    vit = np.char.replace(np.round(rng.uniform(3, 6, n), 2).astype(str), ".", ",")
+    vit = np.where(rng.random(n) < 0.15, "-", vit)
+    pen = rng.choice(["0", "0,00", "-", "", "5", "5,00", "10", "15,35", "26,5"], n)
+    return pd.Series(vit, dtype=object), pd.Series(pen, dtype=object)
+
+
+# --- Anciennes implémentations (copie du code des pages avant vectorisation) ---
+
+def categoriser(row):
+    vit = str(row['vitesse']).strip()
+    pen_str = str(row['penalites']).replace(',', '.').strip()
+    if vit in ['-', '', '0', 'None']: return 'Eliminé'
+    try:
+        pen = float(pen_str) if pen_str not in ['-', ''] else 0.0
+        if pen == 0: return 'Sans Faute'
+        if pen <= 5: return 'Excellent'
+        if pen <= 10: return 'Très Bon'
+        return 'Bon'
+    except ValueError:
+        return 'Sans Faute' if pen_str == '-' else 'Bon'
+
+
+def duels_boucle(df):
+    score_1, score_2, vainqueurs = 0, 0, []
+    for _, row in df.iterrows():
+        eli_1 = str(row['vit_1']).strip() in ['-', '', '0', 'None']
+        eli_2 = str(row['vit_2']).strip() in ['-', '', '0', 'None']
+        pen_1 = float(str(row['pen_1']).replace(',', '.')) if str(row['pen_1']) not in ['-', ''] else 0.0
+        spd_1 = float(str(row['vit_1']).replace(',', '.')) if not eli_1 else 0.0
+        pen_2 = float(str(row['pen_2']).replace(',', '.')) if str(row['pen_2']) not in ['-', ''] else 0.0
+        spd_2 = float(str(row['vit_2']).replace(',', '.')) if not eli_2 else 0.0
+        if eli_1 and eli_2: res = 0
+        elif eli_1: res = 2
+        elif eli_2: res = 1
+        elif pen_1 < pen_2: res = 1
+        elif pen_2 < pen_1: res = 2
+        elif spd_1 > spd_2: res = 1
+        elif spd_2 > spd_1: res = 2
+        else: res = 0
+        score_1 += res == 1
+        score_2 += res == 2
+        vainqueurs.append(res)
+    return score_1, score_2, vainqueurs
+
+
+def timed(func, *args):
+    t0 = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    vit, pen = random_runs(n)
+    df_raw = pd.DataFrame({"vitesse": vit, "penalites": pen})
+
+    old, t_old = timed(lambda: df_raw.apply(categoriser, axis=1).value_counts())
+    new, t_new = timed(lambda: category_counts(speeds(vit), penalties(pen)))
+    assert all(old.get(c, 0) == new[c] for c in new.index), "catégories différentes"
+    print(f"Catégories  {n:>9,} lignes : boucle {t_old:7.3f}s | vectorisé {t_new:7.3f}s | x{t_old / t_new:,.0f}")
+
+    vit_2, pen_2 = random_runs(n, seed=1)
+    df_duels = pd.DataFrame({"vit_1": vit, "pen_1": pen, "vit_2": vit_2, "pen_2": pen_2})
+    old, t_old = timed(duels_boucle, df_duels)
+    new, t_new = timed(lambda: duel_summary(speeds(vit), penalties(pen), speeds(vit_2), penalties(pen_2)))
+    assert (old[0], old[1]) == (new["score_1"], new["score_2"]) and list(new["vainqueurs"]) == old[2], "duels différents"
+    print(f"Duels       {n:>9,} lignes : boucle {t_old:7.3f}s | vectorisé {t_new:7.3f}s | x{t_old / t_new:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
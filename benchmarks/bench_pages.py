@@ -0,0 +1,200 @@
+"""Benchmark page par page : chaque requête et chaque traitement pandas des pages, chronométrés.
+
+Les paramètres sont pris dans la base (couple le plus actif, son principal rival, race et
+juge les plus représentés, dernière saison), les requêtes passent directement par une
+connexion en lecture seule (sans le cache de k9.cache) pour mesurer leur coût réel.
+Le rapport JSON se compare d'une version à l'autre avec --compare.
+
+Usage :
+    python benchmarks/bench_pages.py base.db [--repeat 5] [--json rapport.json]
+    python benchmarks/bench_pages.py base.db --compare ancien.json [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from k9.analytics import head_to_head, percentiles  # noqa: E402
+from k9.courses import judge_courses_query, judge_stats_query  # noqa: E402
+from k9.db import open_readonly  # noqa: E402
+from k9.history import duel_averages_query, duel_page_query, duel_sheet_html, history_page_query, PAGE_SIZE  # noqa: E402
+from k9.kpis import DASHBOARD_KPIS_SQL  # noqa: E402
+from k9.leaderboards import leaderboard_query  # noqa: E402
+from k9.migrations import schema_version  # noqa: E402
+from k9.profiles import (category_histogram, filter_summary, monthly_speed,  # noqa: E402
+                         profile_kpis, profile_summary_query, profile_years)
+from k9.regions import region_stats_query  # noqa: E402
+from k9.rivalries import head_to_head_query, top_rivals_query  # noqa: E402
+from k9.schema import APP_QUERIES  # noqa: E402
+from k9.search import search_query  # noqa: E402
+from k9.seasons import seasons_query  # noqa: E402
+
+
+def pick_parameters(conn):
+    """Paramètres représentatifs : les cas les plus lourds de chaque page."""
+    id_couple, nom_chien = conn.execute(
+        "SELECT id_couple, nom_chien FROM recherche_couples ORDER BY nb_parcours DESC LIMIT 1").fetchone()
+    rival = conn.execute(*top_rivals_query(id_couple, limit=1)).fetchone()
+    (race,) = conn.execute("SELECT race FROM classements GROUP BY race ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+    (juge,) = conn.execute(
+        "SELECT juge FROM parcours_juges GROUP BY juge ORDER BY SUM(nb_participants) DESC LIMIT 1").fetchone()
+    (annee,) = conn.execute("SELECT MAX(annee) FROM saisons").fetchone()
+    return {
+        "id_couple": int(id_couple), "recherche": nom_chien,
+        "rival": int(rival[0]) if rival else int(id_couple),
+        "race": race, "juge": juge, "annee": str(annee),
+    }
+
+
+def page_steps(p):
+    """{page: [(étape, fonction(conn, résultats précédents))]} dans l'ordre d'exécution des pages."""
+    def sql(query):
+        return lambda conn, _: pd.read_sql_query(query[0], conn, params=query[1])
+
+    def with_params(name, params):
+        return sql((APP_QUERIES[name][0], params))
+
+    return {
+        "dashboard": [
+            ("kpis", sql((DASHBOARD_KPIS_SQL, ()))),
+            ("recents", sql(APP_QUERIES["dashboard_recents"])),
+            ("top_races", sql(APP_QUERIES["dashboard_top_races"])),
+        ],
+        "profil": [
+            ("recherche", sql(search_query(p["recherche"], limit=50))),
+            ("resume", sql(profile_summary_query(p["id_couple"]))),
+            ("filtres_graphiques", lambda _, r: _profile_post(r["resume"])),
+            ("rangs_percentiles", lambda conn, _: percentiles(
+                p["id_couple"], p["annee"], load=lambda query, params=(), shared=False:
+                pd.read_sql_query(query, conn, params=params))),
+            ("historique_page_1", sql(history_page_query(p["id_couple"], limit=PAGE_SIZE + 1))),
+            ("historique_saison", sql(history_page_query(p["id_couple"], annee=p["annee"], limit=PAGE_SIZE + 1))),
+        ],
+        "top10": [
+            ("races", sql(APP_QUERIES["top10_races"])),
+            ("saisons", sql(seasons_query())),
+            ("classement", sql(leaderboard_query(p["race"]))),
+            ("classement_saison", sql(leaderboard_query(p["race"], annee=p["annee"]))),
+        ],
+        "regions": [
+            ("regions", sql(region_stats_query(min_parcours=50))),
+            ("regions_saison", sql(region_stats_query(annee=p["annee"], min_parcours=50))),
+        ],
+        "juges": [
+            ("juges", sql(judge_stats_query(min_parcours=30))),
+            ("juge_parcours", sql(judge_courses_query(p["juge"]))),
+        ],
+        "versus": [
+            ("rivaux", sql(top_rivals_query(p["id_couple"]))),
+            ("global", with_params("versus_global", (p["id_couple"],))),
+            ("duels_bilan", sql(head_to_head_query(p["id_couple"], p["rival"]))),
+            ("duels_moyennes", sql(duel_averages_query(p["id_couple"], p["rival"]))),
+            ("duels_stats", lambda _, r: head_to_head(r["duels_bilan"], r["duels_moyennes"])),
+            ("feuille_page_1", sql(duel_page_query(p["id_couple"], p["rival"], limit=PAGE_SIZE + 1))),
+            ("feuille_html", lambda _, r: duel_sheet_html(r["feuille_page_1"].iloc[:PAGE_SIZE], "A", "B")),
+        ],
+    }
+
+
+def _profile_post(resume):
+    annees = profile_years(resume)
+    rows = filter_summary(resume, annees[0]) if annees else resume
+    return profile_kpis(rows), monthly_speed(rows), category_histogram(rows)
+
+
+def _size(result):
+    return len(result) if isinstance(result, pd.DataFrame) else None
+
+
+def run(db_path, repeat=5):
+    conn = open_readonly(db_path)
+    try:
+        params = pick_parameters(conn)
+        report = {
+            "meta": {
+                "base": os.path.basename(db_path),
+                "nb_resultats": conn.execute("SELECT COUNT(*) FROM resultats").fetchone()[0],
+                "schema": schema_version(conn),
+                "sqlite": sqlite3.sqlite_version,
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "repetitions": repeat,
+                "parametres": params,
+            },
+            "pages": {},
+        }
+        for page, steps in page_steps(params).items():
+            results, timings = {}, {}
+            for name, step in steps:
+                durations = []
+                for _ in range(repeat):
+                    t0 = time.perf_counter()
+                    results[name] = step(conn, results)
+                    durations.append((time.perf_counter() - t0) * 1000)
+                ordered = sorted(durations)
+                timings[name] = {
+                    "premier_ms": round(durations[0], 3),
+                    "median_ms": round(statistics.median(durations), 3),
+                    "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+                    "lignes": _size(results[name]),
+                }
+            timings["total_median_ms"] = round(sum(t["median_ms"] for t in timings.values()), 3)
+            report["pages"][page] = timings
+    finally:
+        conn.close()
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Étapes dont la médiane dépasse celle de la référence de plus de `tolerance` (ratio)."""
+    regressions = []
+    for page, steps in report["pages"].items():
+        for name, timing in steps.items():
+            old = baseline.get("pages", {}).get(page, {}).get(name)
+            if not isinstance(timing, dict) or not isinstance(old, dict) or old["median_ms"] <= 0:
+                continue
+            ratio = timing["median_ms"] / old["median_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append((page, name, old["median_ms"], timing["median_ms"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chronomètre les requêtes et traitements de chaque page.")
+    parser.add_argument("db_path")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="écrire le rapport dans ce fichier")
+    parser.add_argument("--compare", help="rapport de référence (JSON) à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="hausse tolérée de la médiane (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.db_path, args.repeat)
+    for page, steps in report["pages"].items():
+        print(f"{page:<10} {steps['total_median_ms']:9.2f} ms")
+        for name, timing in steps.items():
+            if isinstance(timing, dict):
+                lignes = "" if timing["lignes"] is None else f"{timing['lignes']:>7} lignes"
+                print(f"  {name:<22} médiane {timing['median_ms']:8.2f} ms  p95 {timing['p95_ms']:8.2f} ms  {lignes}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for page, name, old, new, ratio in regressions:
+            print(f"⚠️  {page}/{name} : {old:.2f} ms -> {new:.2f} ms (x{ratio:.2f})")
+        if regressions:
+            sys.exit(1)
+        print("✅ Aucune régression au-delà de la tolérance.")
+
+
+if __name__ == "__main__":
+    main()
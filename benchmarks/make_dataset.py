@@ -0,0 +1,219 @@
+"""Génère une base K9-Tracker synthétique et déterministe (liste_concours + resultats bruts).
+
+Le texte imite les données réelles : virgules ou points décimaux, '-' / '0' / '' pour les
+éliminés, pénalités '0', '0,00', '-' ou vides, 'Grade n' dans nom_epreuve, régions en casse
+et espaces variables, pays étrangers. Les couples ont un niveau propre (vitesse, fautes,
+éliminations) et une activité très inégale, comme sur le circuit.
+
+Usage : python benchmarks/make_dataset.py chemin.db [--runs 1000000] [--saisons 4] [--seed 0] [--migrate]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from k9.migrations import migrate  # noqa: E402
+
+DERNIERE_SAISON = 2025
+PARCOURS_PAR_CONCOURS = 300       # Passages moyens par concours
+PARCOURS_PAR_COUPLE = 40          # Passages moyens par couple sur toute la période
+CONCOURS_PAR_LOT = 200            # Concours générés puis insérés par lot
+
+EPREUVES = (
+    "Agility Grade 1", "Jumping Grade 1", "Agility Grade 2", "Jumping Grade 2",
+    "Agility Grade 3", "Jumping Grade 3", "Agility Open", "Jumping Open +",
+    "AGILITY GRADE 2 - Manche 2", "Championnat Grade 3", "Open+",
+)
+RACES = (
+    ("Border Collie", 40), ("Berger Australien", 12), ("Shetland", 10), ("Berger Blanc Suisse", 4),
+    ("Jack Russell Terrier", 6), ("Caniche", 5), ("Malinois", 6), ("Border Terrier", 2),
+    ("Pyrénéen", 3), ("Croisé", 7), ("Papillon", 2), ("Kelpie", 3),
+)
+REGIONS = (
+    ("BRETAGNE", 8), ("Bretagne ", 2), ("NORMANDIE", 7), ("OCCITANIE", 8), (" Occitanie", 1),
+    ("ILE DE FRANCE", 9), ("ile de france", 2), ("AUVERGNE RHONE ALPES", 10), ("GRAND EST", 7),
+    ("HAUTS DE FRANCE", 7), ("NOUVELLE AQUITAINE", 9), ("PAYS DE LA LOIRE", 6), ("CENTRE", 4),
+    ("PROVENCE ALPES COTE D'AZUR", 6), ("BOURGOGNE FRANCHE COMTE", 4), ("CORSE", 1),
+    ("SUISSE", 2), ("BELGIQUE", 2), ("ESPAGNE", 1), ("PAYS-BAS", 1), ("", 2),
+)
+CHIENS = ("Pixi", "Rox", "Tiwi", "Nala", "Ulko", "Vegas", "Wiz", "Ysee", "Zephyr", "Lune",
+          "Ozzy", "Sirius", "Tess", "Unik", "Voltaire", "Jazz", "Kenzo", "Moka", "Plume", "Rio")
+PRENOMS = ("Marie", "Nathalie", "Sophie", "Julien", "Thomas", "Claire", "Pierre", "Laura",
+           "Nicolas", "Camille", "Isabelle", "Sébastien", "Emma", "Hugo", "Anne", "Lucas")
+NOMS = ("MARTIN", "BERNARD", "DUBOIS", "THOMAS", "ROBERT", "RICHARD", "PETIT", "DURAND",
+        "LEROY", "MOREAU", "SIMON", "LAURENT", "LEFEBVRE", "MICHEL", "GARCIA", "DUPONT")
+VILLES = ("Rennes", "Caen", "Toulouse", "Lyon", "Nantes", "Lille", "Metz", "Tours", "Dijon",
+          "Brest", "Nîmes", "Pau", "Annecy", "Rouen", "Vannes", "Angers", "Chartres", "Albi")
+
+
+def _weighted(rng, choices, n):
+    values, weights = zip(*choices)
+    p = np.array(weights, dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), n, p=p / p.sum())]
+
+
+def make_couples(rng, n):
+    """Identité et niveau de chaque couple (index 0 = id_couple 1)."""
+    idx = np.arange(n)
+    couples = {
+        "nom_chien": np.array([f"{CHIENS[i % len(CHIENS)]} {i // len(CHIENS) + 1}" for i in idx], dtype=object),
+        "conducteur": np.array([f"{PRENOMS[rng.integers(len(PRENOMS))]} {NOMS[rng.integers(len(NOMS))]}"
+                                for _ in idx], dtype=object),
+        "race": _weighted(rng, RACES, n),
+        "region": _weighted(rng, REGIONS, n),
+        "vitesse": rng.normal(4.3, 0.45, n).clip(2.5, 6.5),
+        "fautes": rng.uniform(0.3, 1.6, n),              # Nombre moyen de fautes par parcours
+        "elimination": rng.beta(2, 11, n),               # ~15 % d'éliminations en moyenne
+    }
+    couples["club"] = np.array([f"Club Canin de {VILLES[rng.integers(len(VILLES))]}" for _ in idx], dtype=object)
+    # Activité très inégale : quelques couples courent tous les week-ends
+    activite = 1.0 / np.arange(1, n + 1) ** 0.6
+    couples["activite"] = rng.permutation(activite / activite.sum())
+    return couples
+
+
+def _decimal_text(rng, values):
+    """'4,52' le plus souvent, parfois '4.52'."""
+    virgule = rng.random(len(values)) < 0.8
+    return [f"{v:.2f}".replace(".", ",") if c else f"{v:.2f}" for v, c in zip(values, virgule)]
+
+
+def _penalty_text(rng, penalites, eliminated):
+    texts = []
+    style = rng.random(len(penalites))
+    for pen, eli, s in zip(penalites, eliminated, style):
+        if eli:
+            texts.append("-" if s < 0.7 else "")
+        elif pen == 0:
+            texts.append("0" if s < 0.5 else "0,00" if s < 0.85 else "-")
+        else:
+            texts.append(f"{pen:.2f}".replace(".", ",") if s < 0.7 else f"{pen:g}".replace(".", ","))
+    return texts
+
+
+def _qualificatif(penalites, eliminated):
+    return np.select(
+        [eliminated, penalites < 6, penalites < 16, penalites < 26],
+        ["Eliminé", "Excellent", "Très Bon", "Bon"], default="Non Classé").astype(object)
+
+
+def make_batch(rng, couples, juges, first_concours, nb_concours, saisons, runs_per_concours):
+    """Concours [first_concours, first_concours + nb_concours) : lignes de liste_concours et de resultats."""
+    concours, runs = [], []
+    n_couples = len(couples["activite"])
+    for id_concours in range(first_concours, first_concours + nb_concours):
+        annee = DERNIERE_SAISON - rng.integers(saisons)
+        date = f"{rng.integers(1, 29):02d}/{rng.integers(1, 13):02d}/{annee}"
+        ville = VILLES[rng.integers(len(VILLES))]
+        concours.append((id_concours, f"Concours d'Agility de {ville}", date))
+
+        epreuves = rng.choice(len(EPREUVES), rng.integers(5, 9), replace=False)
+        taille = max(2, int(rng.poisson(runs_per_concours / len(epreuves))))
+        for e in epreuves:
+            nom_epreuve = EPREUVES[e]
+            longueur = rng.uniform(140, 220)
+            # Tirage avec remise pondéré par l'activité, doublons retirés (un couple court une fois par épreuve)
+            ids = np.unique(rng.choice(n_couples, taille, p=couples["activite"]))
+            n = len(ids)
+            eliminated = rng.random(n) < couples["elimination"][ids]
+            vitesse = (couples["vitesse"][ids] + rng.normal(0, 0.35, n)).clip(1.5, 7.5)
+            temps = longueur / vitesse
+            fautes = rng.poisson(couples["fautes"][ids])
+            depassement = np.where(rng.random(n) < 0.3, rng.uniform(0, 8, n).round(2), 0.0)
+            penalites = np.where(eliminated, 0.0, 5.0 * fautes + depassement)
+
+            vit_text = _decimal_text(rng, vitesse)
+            tps_text = _decimal_text(rng, temps)
+            elim_style = rng.random(n)
+            pen_text = _penalty_text(rng, penalites, eliminated)
+            qualif = _qualificatif(penalites, eliminated)
+            juge = juges[rng.integers(len(juges))]
+            for k, i in enumerate(ids):
+                if eliminated[k]:
+                    vit = "-" if elim_style[k] < 0.7 else "0" if elim_style[k] < 0.85 else ""
+                    tps = "-"
+                else:
+                    vit, tps = vit_text[k], tps_text[k]
+                runs.append((id_concours, nom_epreuve, int(i) + 1, couples["nom_chien"][i], couples["conducteur"][i],
+                             couples["race"][i], couples["club"][i], couples["region"][i], juge,
+                             vit, pen_text[k], tps, qualif[k]))
+    return concours, runs
+
+
+def create_raw_tables(conn):
+    conn.executescript("""
+        DROP TABLE IF EXISTS resultats;
+        DROP TABLE IF EXISTS liste_concours;
+        CREATE TABLE liste_concours (id_concours INTEGER PRIMARY KEY, nom_concours TEXT, date_concours TEXT);
+        CREATE TABLE resultats (
+            id INTEGER PRIMARY KEY, id_concours INTEGER, nom_epreuve TEXT, id_couple INTEGER,
+            nom_chien TEXT, conducteur TEXT, race TEXT, club TEXT, region TEXT, juge TEXT,
+            vitesse TEXT, penalites TEXT, temps TEXT, qualificatif TEXT
+        );
+        PRAGMA user_version = 0;
+    """)
+
+
+def generate(db_path, runs=1_000_000, saisons=4, seed=0):
+    """Écrit environ `runs` passages (coupé exactement à `runs`) ; renvoie le nombre de lignes."""
+    rng = np.random.default_rng(seed)
+    couples = make_couples(rng, max(50, runs // PARCOURS_PAR_COUPLE))
+    juges = [f"{NOMS[i % len(NOMS)]} {PRENOMS[(i * 7) % len(PRENOMS)]}" for i in range(max(20, runs // 15_000))]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    create_raw_tables(conn)
+    written, next_concours, t0 = 0, 1, time.perf_counter()
+    while written < runs:
+        concours, lignes = make_batch(rng, couples, juges, next_concours, CONCOURS_PAR_LOT, saisons,
+                                      PARCOURS_PAR_CONCOURS)
+        lignes = lignes[:runs - written]
+        used = {ligne[0] for ligne in lignes}
+        conn.executemany("INSERT INTO liste_concours VALUES (?, ?, ?)", [c for c in concours if c[0] in used])
+        conn.executemany("""
+            INSERT INTO resultats (id_concours, nom_epreuve, id_couple, nom_chien, conducteur, race, club,
+                                   region, juge, vitesse, penalites, temps, qualificatif)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, lignes)
+        conn.commit()
+        written += len(lignes)
+        next_concours += CONCOURS_PAR_LOT
+        print(f"  {written:,}/{runs:,} passages ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+    conn.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génère une base K9-Tracker synthétique.")
+    parser.add_argument("db_path")
+    parser.add_argument("--runs", type=int, default=1_000_000, help="nombre de passages (10k à 10M)")
+    parser.add_argument("--saisons", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--migrate", action="store_true", help="appliquer ensuite les migrations (tables dérivées)")
+    parser.add_argument("--force", action="store_true", help="remplacer le fichier s'il existe déjà")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db_path):
+        if not args.force:
+            parser.error(f"{args.db_path} existe déjà (--force pour le remplacer)")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db_path + suffix):
+                os.remove(args.db_path + suffix)
+    written = generate(args.db_path, args.runs, args.saisons, args.seed)
+    print(f"✅ {written:,} passages écrits dans {args.db_path}")
+    if args.migrate:
+        conn = sqlite3.connect(args.db_path)
+        try:
+            migrate(conn)
+        finally:
+            conn.close()
+        print("✅ Migrations appliquées.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Briques internes de K9-Tracker (accès base, caches, agrégats)."""
@@ -0,0 +1,285 @@
+"""Calculs des pages, sans Streamlit : réutilisés par l'application et par l'API JSON (k9.api).
+
+Chaque fonction reçoit `load(sql, params, shared=False, schema=None) -> DataFrame` ; par défaut query(),
+qui passe par le cache du processus, le cache disque partagé et le pool de connexions.
+Les pages Streamlit passent k9.ui.load_data pour garder l'instrumentation des reruns.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from k9 import snapshot as columnar
+from k9.cache import get_cache, make_key
+from k9.courses import judge_stats_query
+from k9.db import get_pool
+from k9.distributions import Histogram, couple_context_query, couple_runs_query, distributions_query, histograms
+from k9.frames import read_frame
+from k9.history import duel_averages_query
+from k9.kpis import DASHBOARD_KPIS_SQL
+from k9.leaderboards import leaderboard_query
+from k9.profiles import (category_histogram, filter_summary, monthly_speed, profile_kpis,
+                         profile_summary_query, profile_years)
+from k9.regions import region_stats_query
+from k9.rivalries import head_to_head_query, top_rivals_query
+from k9.search import search_query
+from k9.seasons import seasons_query
+from k9.sharedcache import cache_key, get_shared_cache
+
+# --- REQUÊTES PARTAGÉES PAR LES PAGES ET L'API ---
+DASHBOARD_RECENTS_SQL = """
+    SELECT
+        lc.date_concours AS Date,
+        lc.nom_concours AS [Club Organisateur],
+        (SELECT COUNT(*) FROM resultats r WHERE r.id_concours = lc.id_concours) / 3 AS [Participants (est.)]
+    FROM liste_concours lc
+    ORDER BY lc.date_key DESC
+    LIMIT 10
+"""
+
+TOP_RACES_SQL = """
+    SELECT race, COUNT(*) as nb
+    FROM resultats
+    WHERE race IS NOT NULL AND race != ''
+    GROUP BY race
+    ORDER BY nb DESC
+    LIMIT 10
+"""
+
+RACES_SQL = "SELECT DISTINCT race FROM resultats WHERE race IS NOT NULL AND race != '' ORDER BY race"
+
+VERSUS_GLOBAL_SQL = """
+    SELECT
+        COUNT(id) as total,
+        AVG(vitesse_num) as vit_moy,
+        SUM(is_clean) as sans_faute
+    FROM resultats
+    WHERE id_couple = ?
+"""
+
+
+# --- EXÉCUTION ---
+def _read_sql(sql, params, schema=None, raw=None):
+    """Lecture sur une connexion du pool ; avec un schéma, taille brute évitée notée dans raw["octets"]."""
+    with get_pool().connection() as conn:
+        df, raw_bytes = read_frame(conn, sql, params, schema)
+    if raw is not None:
+        raw["octets"] = raw_bytes
+    return df
+
+
+def fetch(sql, params=(), shared=False, schema=None):
+    """Cache du processus, puis cache disque partagé (si shared), puis connexion du pool.
+
+    Aucun appel Streamlit : utilisable depuis un thread. Renvoie (df, taille en octets,
+    hit d'un cache, début, fin, taille brute) ; début et fin en perf_counter(). La taille brute
+    (résultat non typé, k9.frames) n'est connue qu'avec un schéma et une vraie lecture, sinon None.
+    """
+    cache = get_cache()
+    key = make_key(sql, params, schema)
+    t0 = time.perf_counter()
+    df, size = cache.get(key, with_size=True)
+    if df is not None:
+        return df, size, True, t0, time.perf_counter(), None
+    version = cache.version()     # Relevée avant la lecture : un résultat d'avant une écriture n'est pas gardé
+    raw = {"octets": None}
+    disk = get_shared_cache() if shared else None
+    if disk is not None:
+        df, hit = disk.get_or_compute(cache_key(sql, params, schema), lambda: _read_sql(sql, params, schema, raw))
+    else:
+        df, hit = _read_sql(sql, params, schema, raw), False
+    size = cache.put(key, df, version)
+    return df, size, hit, t0, time.perf_counter(), raw["octets"]
+
+
+def query(sql, params=(), shared=False, schema=None):
+    return fetch(sql, params, shared, schema)[0]
+
+
+# --- AGRÉGATS (instantané en colonnes s'il existe, tables pré-agrégées sinon) ---
+def region_stats(annee=None, grade=None, min_parcours=50, load=query):
+    snapshot = columnar.get_snapshot()
+    if snapshot is not None:
+        return columnar.region_stats(snapshot, annee=annee, grade=grade, min_parcours=min_parcours)
+    return load(*region_stats_query(annee=annee, grade=grade, min_parcours=min_parcours), shared=True)
+
+
+def judge_stats(grade=None, min_parcours=30, load=query):
+    snapshot = columnar.get_snapshot()
+    if snapshot is not None:
+        return columnar.judge_stats(snapshot, grade=grade, min_parcours=min_parcours)
+    return load(*judge_stats_query(grade=grade, min_parcours=min_parcours), shared=True)
+
+
+def top_races(load=query):
+    snapshot = columnar.get_snapshot()
+    if snapshot is not None:
+        return columnar.top_races(snapshot, limit=10)
+    return load(TOP_RACES_SQL, (), shared=True)
+
+
+# --- PAGES ---
+def dashboard(load=query):
+    kpis = load(DASHBOARD_KPIS_SQL, (), shared=True)
+    return {
+        "kpis": {column: int(kpis[column][0]) for column in kpis.columns} if not kpis.empty else {},
+        "recents": load(DASHBOARD_RECENTS_SQL, (), shared=True),
+        "top_races": top_races(load),
+    }
+
+
+def search(text, limit=50, load=query):
+    return load(*search_query(text, limit=limit))
+
+
+def seasons(load=query):
+    return load(*seasons_query())["annee"].dropna().tolist()
+
+
+def profile(id_couple, annee=None, type_epreuve=None, load=query):
+    """Statistiques d'un couple pour une année (la plus récente par défaut) et un type d'épreuve."""
+    df_profil = load(*profile_summary_query(id_couple))
+    annees = profile_years(df_profil) if not df_profil.empty else []
+    annee = annee or (annees[0] if annees else None)
+    rows = filter_summary(df_profil, annee, type_epreuve) if annee else df_profil.iloc[0:0]
+    return {
+        "id_couple": id_couple,
+        "annees": annees,
+        "annee": annee,
+        "type_epreuve": type_epreuve,
+        "kpis": profile_kpis(rows),
+        "vitesse_mensuelle": monthly_speed(rows),
+        "categories": category_histogram(rows).to_dict(),
+        "percentiles": percentiles(id_couple, annee, load) if annee else None,
+    }
+
+
+# Libellés des populations de comparaison du profil, dans l'ordre d'affichage
+PERCENTILE_DIMENSIONS = {"race": "Race", "grade": "Grade", "region": "Région", "saison": "Saison"}
+
+
+def _median(values):
+    values = values[~np.isnan(values)]
+    return float(np.median(values)) if len(values) else None
+
+
+def percentiles(id_couple, annee, load=query):
+    """Rangs percentiles des parcours d'un couple sur une saison, dans sa race, son grade, sa région et la saison.
+
+    Les distributions comptent des parcours : chaque parcours du couple y est classé, puis on
+    retient le rang médian (une moyenne de saison, bien moins dispersée que des parcours isolés,
+    serait poussée vers les extrêmes).
+    vitesse : % des parcours plus lents ; penalites : % des parcours plus pénalisés.
+    Renvoie aussi les histogrammes {mesure: {dimension: Histogram}} pour les graphiques ;
+    None si le couple n'a pas couru cette saison.
+    """
+    context = load(*couple_context_query(id_couple, annee))
+    if context.empty:
+        return None
+    couple = context.iloc[0]
+    values = {"race": couple["race"], "region": couple["region"], "saison": "",
+              "grade": str(int(couple["grade"])) if couple["grade"] else None}
+    keys = [(dimension, values[dimension]) for dimension in PERCENTILE_DIMENSIONS if values[dimension] is not None]
+    found = histograms(load(*distributions_query(annee, keys)))
+    runs = load(*couple_runs_query(id_couple, annee))
+    vitesses = runs["vitesse"].to_numpy(dtype="float64", na_value=np.nan)
+    penalites = runs["penalites"].to_numpy(dtype="float64", na_value=np.nan)
+    rangs, par_mesure = [], {}
+    for (mesure, dimension, _), histogram in found.items():
+        par_mesure.setdefault(mesure, {})[dimension] = histogram
+    for dimension, valeur in keys:
+        h_vitesse = found.get(("vitesse", dimension, valeur))
+        h_penalites = found.get(("penalites", dimension, valeur))
+        rang_penalites = h_penalites.median_rank(penalites) if h_penalites is not None else None
+        rangs.append({
+            "dimension": dimension,
+            "valeur": valeur,
+            "parcours": h_vitesse.total if h_vitesse is not None else 0,
+            "vitesse": h_vitesse.median_rank(vitesses) if h_vitesse is not None else None,
+            "vitesse_mediane": h_vitesse.quantile(0.5) if h_vitesse is not None else None,
+            "penalites": 100 - rang_penalites if rang_penalites is not None else None,
+        })
+    return {
+        "annee": annee,
+        "race": values["race"],
+        "grade": values["grade"],
+        "region": values["region"],
+        "parcours_couple": int(np.count_nonzero(~np.isnan(vitesses))),
+        "vitesse_couple": _median(vitesses),
+        "penalites_couple": _median(penalites),
+        "rangs": rangs,
+        "histogrammes": par_mesure,
+    }
+
+
+def top10(race, type_epreuve=None, grade=None, annee=None, limit=10, load=query):
+    return load(*leaderboard_query(race, type_epreuve=type_epreuve, grade=grade, annee=annee, limit=limit))
+
+
+def global_stats(row):
+    """Bilan d'un couple à partir d'une ligne de VERSUS_GLOBAL_SQL (valeurs nulles -> 0)."""
+    total = int(row["total"]) if pd.notnull(row["total"]) else 0
+    return {
+        "parcours": total,
+        "vitesse_moy": round(float(row["vit_moy"]), 2) if pd.notnull(row["vit_moy"]) else 0,
+        "pct_sans_faute": float(row["sans_faute"] / total * 100) if total > 0 else 0,
+    }
+
+
+def _mean(value):
+    return float(value) if pd.notnull(value) else 0.0
+
+
+def head_to_head(bilan, moyennes):
+    """Score pré-calculé (k9.rivalries) et moyennes en confrontation directe ; None sans duel."""
+    if bilan.empty:
+        return None
+    row, moy = bilan.iloc[0], moyennes.iloc[0]
+    return {
+        "score_1": int(row["victoires"]),
+        "score_2": int(row["defaites"]),
+        "egalites": int(row["egalites"]),
+        "nb_confrontations": int(row["nb_confrontations"]),
+        "derniere_rencontre": row["derniere_rencontre"],
+        "couple_1": {"vitesse_moy": _mean(moy["vit_moy_1"]), "penalites_moy": _mean(moy["pen_moy_1"]),
+                     "pct_elimination": _mean(moy["pct_elim_1"])},
+        "couple_2": {"vitesse_moy": _mean(moy["vit_moy_2"]), "penalites_moy": _mean(moy["pen_moy_2"]),
+                     "pct_elimination": _mean(moy["pct_elim_2"])},
+    }
+
+
+def versus(id_1, id_2, load=query):
+    duel = head_to_head(load(*head_to_head_query(id_1, id_2)), load(*duel_averages_query(id_1, id_2)))
+    result = {
+        "couple_1": global_stats(load(VERSUS_GLOBAL_SQL, (id_1,)).iloc[0]),
+        "couple_2": global_stats(load(VERSUS_GLOBAL_SQL, (id_2,)).iloc[0]),
+        "nb_duels": duel["nb_confrontations"] if duel else 0,
+    }
+    if duel is not None:
+        result["duels"] = duel
+    return result
+
+
+def rivals(id_couple, limit=5, load=query):
+    return load(*top_rivals_query(id_couple, limit=limit))
+
+
+def to_json(value):
+    """Objets renvoyés ci-dessus -> types JSON (DataFrame -> liste de dicts, NaN -> None)."""
+    if isinstance(value, pd.DataFrame):
+        return [{str(k): to_json(v) for k, v in row.items()} for row in value.to_dict("records")]
+    if isinstance(value, Histogram):
+        return to_json(value.frame())
+    if isinstance(value, pd.Series):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
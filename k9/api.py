@@ -0,0 +1,386 @@
+"""API JSON en lecture seule, sans Streamlit : python -m k9.api [--port 8502] [--db base.db]
+
+Pour les sites de clubs et les applications mobiles qui ne veulent qu'un profil ou un
+classement : un serveur HTTP/1.1 asyncio (bibliothèque standard uniquement) qui sert les
+calculs de k9.analytics, sans session ni rerun de app.py.
+- les calculs tournent dans un pool de threads (connexions du pool k9.db, caches k9.cache
+  et k9.sharedcache) ; des requêtes identiques simultanées ne calculent qu'une fois ;
+- cache de réponses (JSON sérialisé, gzip) par chemin + paramètres, invalidé quand la
+  version de la base change (k9.cache.db_version) ;
+- ETag sur le corps : If-None-Match -> 304 sans corps ;
+- gzip si le client l'accepte (Accept-Encoding) et que le corps en vaut la peine.
+
+Routes (GET ou HEAD) :
+    /api/sante
+    /api/dashboard
+    /api/saisons
+    /api/recherche?q=&limit=
+    /api/couples/{id}?annee=&epreuve=
+    /api/couples/{id}/rivaux?limit=
+    /api/top10?race=&epreuve=&grade=&annee=&limit=
+    /api/regions?annee=&grade=&min=
+    /api/juges?grade=&min=
+    /api/versus?id1=&id2=
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from k9 import analytics, db
+from k9.cache import db_version
+from k9.dimensions import GRADES, TYPES_EPREUVE
+
+# --- RÉGLAGES ---
+HOST = "127.0.0.1"
+PORT = 8502
+MAX_WORKERS = int(os.environ.get("K9_API_WORKERS", 8))
+CACHE_ENTRIES = 2048               # Réponses gardées en mémoire (LRU)
+MAX_AGE = 60                       # Cache-Control: max-age, en secondes
+GZIP_MIN_BYTES = 1024              # En dessous, gzip coûte plus qu'il ne rapporte
+GZIP_LEVEL = 6
+MAX_LIMIT = 500                    # Plafond des paramètres limit
+KEEP_ALIVE_SECONDS = 15
+MAX_HEADER_LINES = 100
+
+
+class BadRequest(ValueError):
+    """Paramètre absent ou invalide -> 400."""
+
+
+# --- PARAMÈTRES ---
+def _integer(params, name, default=None, minimum=None, maximum=None):
+    raw = params.get(name)
+    if raw in (None, ""):
+        if default is None:
+            raise BadRequest(f"paramètre '{name}' obligatoire")
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"paramètre '{name}' : entier attendu") from None
+    if minimum is not None:
+        value = max(minimum, value)
+    if maximum is not None:
+        value = min(maximum, value)
+    return value
+
+
+def _choice(params, name, choices):
+    """Valeur parmi `choices`, ou None si absente (= toutes confondues)."""
+    raw = params.get(name) or None
+    if raw is None:
+        return None
+    for choice in choices:
+        if str(choice).lower() == raw.lower():
+            return choice
+    raise BadRequest(f"paramètre '{name}' : une valeur parmi {', '.join(map(str, choices))}")
+
+
+def _couple(raw):
+    """Identifiant de couple : entier s'il en a l'air (profils_couples le stocke sans affinité de type)."""
+    if not raw:
+        raise BadRequest("identifiant de couple obligatoire")
+    return int(raw) if raw.isdigit() else raw
+
+
+def _year(params, name="annee"):
+    raw = params.get(name) or None
+    if raw is not None and not re.fullmatch(r"\d{4}", raw):
+        raise BadRequest(f"paramètre '{name}' : année sur 4 chiffres attendue")
+    return raw
+
+
+# --- ROUTES ---
+def _dashboard(match, params):
+    return analytics.dashboard()
+
+
+def _seasons(match, params):
+    return {"annees": analytics.seasons()}
+
+
+def _search(match, params):
+    text = (params.get("q") or "").strip()
+    if not text:
+        raise BadRequest("paramètre 'q' obligatoire")
+    return analytics.search(text, limit=_integer(params, "limit", 50, 1, MAX_LIMIT))
+
+
+def _profile(match, params):
+    return analytics.profile(_couple(match["id"]), annee=_year(params),
+                             type_epreuve=_choice(params, "epreuve", TYPES_EPREUVE))
+
+
+def _rivals(match, params):
+    return analytics.rivals(_couple(match["id"]), limit=_integer(params, "limit", 5, 1, 50))
+
+
+def _top10(match, params):
+    race = (params.get("race") or "").strip()
+    if not race:
+        raise BadRequest("paramètre 'race' obligatoire")
+    return analytics.top10(race, type_epreuve=_choice(params, "epreuve", TYPES_EPREUVE),
+                           grade=_choice(params, "grade", GRADES), annee=_year(params),
+                           limit=_integer(params, "limit", 10, 1, MAX_LIMIT))
+
+
+def _regions(match, params):
+    return analytics.region_stats(annee=_year(params), grade=_choice(params, "grade", GRADES),
+                                  min_parcours=_integer(params, "min", 50, 0))
+
+
+def _judges(match, params):
+    return analytics.judge_stats(grade=_choice(params, "grade", GRADES),
+                                 min_parcours=_integer(params, "min", 30, 0))
+
+
+def _versus(match, params):
+    id_1, id_2 = _couple(params.get("id1")), _couple(params.get("id2"))
+    if id_1 == id_2:
+        raise BadRequest("'id1' et 'id2' doivent désigner deux couples différents")
+    return analytics.versus(id_1, id_2)
+
+
+ROUTES = [
+    (re.compile(r"/api/dashboard"), _dashboard),
+    (re.compile(r"/api/saisons"), _seasons),
+    (re.compile(r"/api/recherche"), _search),
+    (re.compile(r"/api/couples/(?P<id>[^/]+)"), _profile),
+    (re.compile(r"/api/couples/(?P<id>[^/]+)/rivaux"), _rivals),
+    (re.compile(r"/api/top10"), _top10),
+    (re.compile(r"/api/regions"), _regions),
+    (re.compile(r"/api/juges"), _judges),
+    (re.compile(r"/api/versus"), _versus),
+]
+
+
+def resolve(path):
+    for pattern, handler in ROUTES:
+        match = pattern.fullmatch(path)
+        if match is not None:
+            return handler, match.groupdict()
+    return None, None
+
+
+# --- RÉPONSES ---
+def encode(value):
+    return json.dumps(analytics.to_json(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(header, tag):
+    """If-None-Match : liste d'ETags (faibles acceptés) ou '*'."""
+    if not header:
+        return False
+    candidates = [t.strip() for t in header.split(",")]
+    return "*" in candidates or any(t.removeprefix("W/") == tag for t in candidates)
+
+
+def accepts_gzip(header):
+    for part in (header or "").split(","):
+        coding, _, q = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return q.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Response:
+    """Corps JSON prêt à servir, avec son ETag et sa version gzip (calculée une fois)."""
+
+    def __init__(self, status, body, version=None):
+        self.status = status
+        self.body = body
+        self.version = version
+        self.etag = etag(body)
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+def error(status, message):
+    return Response(status, encode({"erreur": message}))
+
+
+class ResponseCache:
+    """LRU chemin + paramètres -> Response ; une entrée d'une autre version de la base est ignorée."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key, version):
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None or response.version != version:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return response
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entrees=len(self._entries))
+
+
+# --- SERVEUR ---
+class ApiServer:
+    def __init__(self, max_workers=MAX_WORKERS, cache=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="k9-api")
+        self.cache = cache or ResponseCache()
+        self._inflight = {}               # clé -> Future : un seul calcul par réponse manquante
+        self._started = time.time()
+        self._served = 0
+
+    def _compute(self, handler, match, params, version):
+        try:
+            return Response(200, encode(handler(match, params)), version)
+        except BadRequest as exc:
+            return error(400, str(exc))
+        except Exception as exc:
+            print(f"[k9] api : {type(exc).__name__}: {exc}", file=sys.stderr)
+            return error(500, "erreur interne")
+
+    async def respond(self, target):
+        """Réponse (éventuellement en cache) pour une cible 'chemin?paramètres'."""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        params = dict(parse_qsl(url.query))
+        if path == "/api/sante":
+            return Response(200, encode({"statut": "ok", "base": db.DB_PATH, "servies": self._served,
+                                         "depuis_s": round(time.time() - self._started),
+                                         "cache_reponses": self.cache.stats()}))
+        handler, match = resolve(path)
+        if handler is None:
+            return error(404, f"route inconnue : {path}")
+        version = db_version()
+        key = (path, tuple(sorted(params.items())))
+        response = self.cache.get(key, version)
+        if response is not None:
+            return response
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, self._compute, handler, match, params, version)
+            self._inflight[key] = future
+            try:
+                response = await future
+            finally:
+                del self._inflight[key]
+            if response.status == 200:
+                self.cache.put(key, response)
+            return response
+        return await asyncio.shield(future)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+                    await self._send(writer, "GET", error(400, "requête HTTP invalide"), headers, False)
+                    break
+                method, target, http_version = parts
+                length = headers.get("content-length", "0")
+                if length.isdigit() and int(length):
+                    await reader.readexactly(int(length))   # corps ignoré : routes en lecture seule
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if http_version == "HTTP/1.1" else connection == "keep-alive"
+                if method not in ("GET", "HEAD"):
+                    response = error(405, f"méthode {method} non prise en charge (GET, HEAD)")
+                else:
+                    response = await self.respond(target)
+                self._served += 1
+                await self._send(writer, method, response, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, method, response, headers, keep_alive):
+        status, body = response.status, response.body
+        extra = []
+        if status == 200:
+            extra += [f"ETag: {response.etag}", f"Cache-Control: public, max-age={MAX_AGE}", "Vary: Accept-Encoding"]
+            if etag_matches(headers.get("if-none-match"), response.etag):
+                status, body = 304, b""
+            elif len(body) >= GZIP_MIN_BYTES and accepts_gzip(headers.get("accept-encoding")):
+                body = response.gzipped()
+                extra.append("Content-Encoding: gzip")
+        elif status == 405:
+            extra.append("Allow: GET, HEAD")
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"] + extra
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(host=HOST, port=PORT, max_workers=MAX_WORKERS):
+    api = ApiServer(max_workers=max_workers)
+    server = await asyncio.start_server(api.handle, host, port)
+    print(f"✅ API k9 sur http://{host}:{port}/api/ (base {db.DB_PATH})", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON en lecture seule sur la base de résultats.")
+    parser.add_argument("--hote", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", default=db.DB_PATH, help="base SQLite servie")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="threads de calcul")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = args.db
+    try:
+        asyncio.run(serve(args.hote, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
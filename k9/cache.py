@@ -0,0 +1,154 @@
+"""Cache des résultats de requêtes (LRU borné en taille et en durée, invalidé quand la base change)."""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from k9 import db
+
+# --- RÉGLAGES DU CACHE ---
+MAX_BYTES = 256 * 1024 * 1024      # Budget mémoire total des DataFrames en cache
+MAX_ENTRIES = 2048
+TTL_SECONDS = 15 * 60
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query):
+    """Réduit les espaces/retours à la ligne pour que deux écritures d'une même requête partagent la clé."""
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+def make_key(query, params=(), schema=None):
+    """Un même SQL lu avec un schéma de colonnes différent (k9.frames) est une autre entrée."""
+    key = (normalize_sql(query), tuple(params))
+    return key if not schema else key + (tuple(schema.items()),)
+
+
+def db_version(db_path=None):
+    """Empreinte de la base : (mtime, taille) du fichier principal et du journal WAL."""
+    db_path = db_path or db.DB_PATH
+    version = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            version.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class QueryCache:
+    """LRU de DataFrames : clé = SQL normalisé + paramètres, vidé à chaque changement de version de la base."""
+
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, version_func=db_version):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_func = version_func
+        self._entries = OrderedDict()      # clé -> (expiration, taille, DataFrame)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "trop_gros": 0,
+                       "perimes": 0}
+
+    def _check_version(self):
+        version = self.version_func()
+        if version != self._version:
+            if self._entries:
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key, with_size=False):
+        """Renvoie une copie du DataFrame en cache, ou None ; (DataFrame, octets) si with_size."""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return (None, 0) if with_size else None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return (None, 0) if with_size else None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            _, size, df = entry
+        # Copie : les pages modifient les DataFrames reçus (colonnes calculées, arrondis...)
+        return (df.copy(), size) if with_size else df.copy()
+
+    def version(self):
+        """Version de la base vue par le cache, à relever avant de lancer un calcul destiné à put()."""
+        with self._lock:
+            self._check_version()
+            return self._version
+
+    def put(self, key, df, version=None):
+        """Met le DataFrame en cache ; renvoie sa taille en octets.
+
+        `version` : version relevée (version()) avant le calcul. Si la base a changé entre-temps,
+        le résultat peut dater de l'ancienne version : il n'est pas gardé.
+        """
+        size = frame_bytes(df)
+        with self._lock:
+            self._check_version()
+            if version is not None and version != self._version:
+                self._stats["perimes"] += 1
+                return size
+            if size > self.max_bytes:
+                self._stats["trop_gros"] += 1
+                return size
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, df.copy())
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+        return size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["entrees"] = len(self._entries)
+            s["octets"] = self._bytes
+        lookups = s["hits"] + s["misses"]
+        s["taux_hit"] = (s["hits"] / lookups) if lookups else 0.0
+        return s
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Cache unique du processus, partagé par toutes les sessions."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryCache()
+    return _cache
+
+
+def cache_stats():
+    return get_cache().stats()
@@ -0,0 +1,64 @@
+"""Suivi des modifications de la base : compteur de modifications et couples retirés.
+
+Le compteur (table compteurs, ligne 'modifications') est incrémenté par des triggers à chaque
+INSERT, UPDATE ou DELETE sur resultats et liste_concours, quel qu'en soit l'auteur (k9.ingest,
+migration, correction à la main). k9.snapshot le note dans son manifeste : une mise à jour sur
+place, qui ne change ni le nombre de lignes ni les rowid, suffit à périmer l'instantané.
+
+Couples retirés, pour les mises à jour incrémentales de k9.refresh : k9.ingest remplace
+des épreuves entières, et un couple absent du nouveau fichier n'a plus de ligne dans
+l'épreuve rechargée, mais son profil, sa fiche de recherche et ses rivalités
+doivent tout de même être recalculés (ou supprimés). Avant chaque suppression, ses id_couple
+sont notés dans couples_retires ; les refreshers travaillent sur l'union des couples d'avant
+et d'après, puis refresh_all vide la table. Elle est persistante (et non temporaire) pour
+qu'un chargement --sans-refresh suivi de python -m k9.refresh --concours reste exact.
+"""
+
+# Tables dont le contenu est exporté par k9.snapshot (liste_concours : date_key)
+COUNTED_TABLES = ("resultats", "liste_concours")
+
+
+def create_change_counter(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS compteurs (nom TEXT PRIMARY KEY, valeur INTEGER) WITHOUT ROWID")
+    conn.execute("INSERT OR IGNORE INTO compteurs VALUES ('modifications', 0)")
+    for table in COUNTED_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_modifications_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE compteurs SET valeur = valeur + 1 WHERE nom = 'modifications';
+                END
+            """)
+    conn.commit()
+
+
+def change_count(conn):
+    """Valeur du compteur de modifications (None si la base n'a pas encore la migration 14)."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'compteurs'").fetchone():
+        return None
+    return conn.execute("SELECT valeur FROM compteurs WHERE nom = 'modifications'").fetchone()[0]
+
+
+def create_change_tables(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS couples_retires (id_couple PRIMARY KEY) WITHOUT ROWID")
+
+
+def record_removed_couples(conn, where, params=()):
+    """Note les couples des lignes de resultats sur le point d'être supprimées (`where` sur resultats)."""
+    conn.execute(f"INSERT OR IGNORE INTO couples_retires SELECT DISTINCT id_couple FROM resultats WHERE {where}",
+                 params)
+
+
+def touched_couples_sql(concours_ids):
+    """(sql, params) des couples à recalculer : présents dans les concours chargés ou retirés au rechargement."""
+    ids = list(concours_ids)
+    return f"""
+        SELECT id_couple FROM resultats WHERE id_concours IN ({', '.join('?' * len(ids))})
+        UNION
+        SELECT id_couple FROM couples_retires
+    """, tuple(ids)
+
+
+def clear_removed_couples(conn):
+    conn.execute("DELETE FROM couples_retires")
+    conn.commit()
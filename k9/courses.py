@@ -0,0 +1,108 @@
+"""Table de faits au niveau du parcours : une ligne par (id_concours, nom_epreuve, juge).
+
+Sert "Analyse des Juges" : le classement agrège quelques dizaines de milliers de parcours
+au lieu de millions de passages, et le détail d'un juge liste ses parcours un par un.
+La longueur d'un parcours est déduite de vitesse × temps des couples classés
+(le TPS officiel n'est pas présent dans resultats : on garde le meilleur temps à la place).
+"""
+from k9.dimensions import annee_sql, grade_sql, type_epreuve_sql
+
+# Schéma de colonnes (k9.frames) du détail d'un juge : libellés en catégories, dates parsées.
+# (Le classement n'en a pas : une ligne par juge, une catégorie y coûterait plus qu'elle n'économise.)
+JUDGE_COURSES_SCHEMA = {"Date": "date", "Lieu": "category", "Epreuve": "category"}
+
+
+def create_course_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS parcours_juges (
+            id_concours, nom_epreuve TEXT, juge TEXT,
+            annee TEXT, grade INTEGER, type_epreuve TEXT,
+            nb_participants INTEGER, nb_sans_faute INTEGER, nb_elimines INTEGER,
+            nb_vitesse INTEGER, somme_vitesse REAL, vitesse_min REAL, vitesse_max REAL,
+            nb_distance INTEGER, somme_distance REAL, longueur_parcours REAL,
+            temps_min REAL,
+            PRIMARY KEY (id_concours, nom_epreuve, juge)
+        );
+        CREATE INDEX IF NOT EXISTS idx_parcours_juges_juge ON parcours_juges (juge, grade);
+        CREATE INDEX IF NOT EXISTS idx_parcours_juges_grade ON parcours_juges (grade);
+    """)
+
+
+def _insert_courses(conn, where="", params=()):
+    conn.execute(f"""
+        INSERT INTO parcours_juges
+        SELECT
+            r.id_concours, r.nom_epreuve, UPPER(TRIM(r.juge)),
+            {annee_sql()}, {grade_sql()}, {type_epreuve_sql()},
+            COUNT(*), SUM(r.is_clean), SUM(r.is_eliminated),
+            COUNT(r.vitesse_num), SUM(r.vitesse_num), MIN(r.vitesse_num), MAX(r.vitesse_num),
+            COUNT(r.vitesse_num * r.temps_num), SUM(r.vitesse_num * r.temps_num), AVG(r.vitesse_num * r.temps_num),
+            MIN(CASE WHEN r.is_eliminated = 0 THEN r.temps_num END)
+        FROM resultats r
+        LEFT JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE r.juge IS NOT NULL AND TRIM(r.juge) != '' {where}
+        GROUP BY r.id_concours, r.nom_epreuve, UPPER(TRIM(r.juge))
+    """, params)
+
+
+def rebuild_courses(conn):
+    create_course_tables(conn)
+    conn.execute("DELETE FROM parcours_juges")
+    _insert_courses(conn)
+    conn.commit()
+
+
+def refresh_courses(conn, concours_ids):
+    ids = list(concours_ids)
+    if not ids:
+        return
+    in_ids = f"IN ({', '.join('?' * len(ids))})"
+    conn.execute(f"DELETE FROM parcours_juges WHERE id_concours {in_ids}", ids)
+    _insert_courses(conn, f"AND r.id_concours {in_ids}", ids)
+    conn.commit()
+
+
+def judge_stats_query(grade=None, min_parcours=30):
+    """(sql, params) du classement des juges, mêmes colonnes que l'agrégat sur resultats."""
+    where, params = "", []
+    if grade is not None:
+        where = "WHERE grade = ?"
+        params.append(grade)
+    return f"""
+        SELECT
+            juge as Juge,
+            SUM(nb_participants) as Total_Parcours,
+            SUM(somme_vitesse) / SUM(nb_vitesse) as Vitesse_Moyenne,
+            SUM(somme_distance) / SUM(nb_distance) as Distance_Moyenne,
+            SUM(nb_sans_faute) as Sans_Faute,
+            SUM(nb_elimines) as Elimines,
+            COUNT(*) as Nb_Epreuves
+        FROM parcours_juges
+        {where}
+        GROUP BY juge
+        HAVING Total_Parcours > ?
+    """, tuple(params) + (min_parcours,)
+
+
+def judge_courses_query(juge, grade=None):
+    """(sql, params) du détail parcours par parcours d'un juge, du plus récent au plus ancien."""
+    where, params = "WHERE pj.juge = ?", [juge]
+    if grade is not None:
+        where += " AND pj.grade = ?"
+        params.append(grade)
+    return f"""
+        SELECT
+            lc.date_concours AS Date,
+            lc.nom_concours AS Lieu,
+            pj.nom_epreuve AS Epreuve,
+            pj.nb_participants AS Participants,
+            ROUND(pj.longueur_parcours, 0) AS [Longueur (m)],
+            ROUND(pj.somme_vitesse / pj.nb_vitesse, 2) AS [Vitesse moy. (m/s)],
+            ROUND(pj.temps_min, 2) AS [Meilleur temps (s)],
+            ROUND(100.0 * pj.nb_sans_faute / pj.nb_participants, 1) AS [Sans faute (%)],
+            ROUND(100.0 * pj.nb_elimines / pj.nb_participants, 1) AS [Éliminés (%)]
+        FROM parcours_juges pj
+        LEFT JOIN liste_concours lc ON pj.id_concours = lc.id_concours
+        {where}
+        ORDER BY lc.date_key DESC
+    """, tuple(params)
@@ -0,0 +1,144 @@
+"""Pool de connexions SQLite en lecture seule, partagé entre toutes les sessions Streamlit."""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Chemin relatif vers la base de données depuis le dossier /web
+DB_PATH = "agility_complete.db"
+
+# --- RÉGLAGES DES CONNEXIONS ---
+MMAP_SIZE = 256 * 1024 * 1024      # 256 Mo projetés en mémoire
+CACHE_SIZE_KB = 64 * 1024          # 64 Mo de cache de pages par connexion
+MAX_CONNECTIONS = 16               # Au-delà, les threads attendent qu'une connexion se libère
+
+PRAGMAS = (
+    f"PRAGMA mmap_size = {MMAP_SIZE}",
+    f"PRAGMA cache_size = -{CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA query_only = ON",
+)
+
+
+def open_readonly(db_path=DB_PATH):
+    """Ouvre une connexion en lecture seule (URI mode=ro) avec les pragmas de lecture."""
+    uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def explain(conn, sql, params=()):
+    """Étapes de l'EXPLAIN QUERY PLAN d'une requête (conseiller k9.schema, requêtes lentes de k9.querylog)."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def open_readwrite(db_path=DB_PATH):
+    """Connexion en écriture, réservée aux outils hors ligne (migrations, chargements)."""
+    return sqlite3.connect(db_path, timeout=30)
+
+
+class ConnectionPool:
+    """Connexions réutilisées d'un rerun à l'autre : un thread n'en détient qu'une à la fois."""
+
+    def __init__(self, db_path=DB_PATH, max_connections=MAX_CONNECTIONS):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self._idle = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {
+            "ouvertures": 0,
+            "emprunts": 0,
+            "reutilisations": 0,
+            "attentes": 0,
+            "fermetures": 0,
+            "temps_ouverture_s": 0.0,
+        }
+
+    def _acquire(self):
+        with self._cond:
+            self._stats["emprunts"] += 1
+            while not self._idle and self._in_use >= self.max_connections:
+                self._stats["attentes"] += 1
+                self._cond.wait()
+            self._in_use += 1
+            if self._idle:
+                self._stats["reutilisations"] += 1
+                return self._idle.pop()
+        # Ouverture hors verrou : les autres threads ne sont pas bloqués pendant le connect()
+        try:
+            t0 = time.perf_counter()
+            conn = open_readonly(self.db_path)
+            elapsed = time.perf_counter() - t0
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["ouvertures"] += 1
+            self._stats["temps_ouverture_s"] += elapsed
+        return conn
+
+    def _release(self, conn):
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Prête une connexion au thread courant (réentrant : un appel imbriqué réutilise la même)."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def close_all(self):
+        """Ferme les connexions inactives (ex : après remplacement du fichier de base)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._stats["fermetures"] += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        """Compteurs du pool, pour mesurer les ouvertures/fermetures évitées."""
+        with self._cond:
+            s = dict(self._stats)
+            s["inactives"] = len(self._idle)
+            s["actives"] = self._in_use
+        s["ouverture_moy_ms"] = (s["temps_ouverture_s"] / s["ouvertures"] * 1000) if s["ouvertures"] else 0.0
+        s["taux_reutilisation"] = (s["reutilisations"] / s["emprunts"]) if s["emprunts"] else 0.0
+        return s
+
+
+# Pool unique au niveau du module : Streamlit ne réimporte pas les modules entre deux reruns,
+# il est donc partagé par toutes les sessions du processus.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Renvoie le pool du processus (créé au premier appel)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def pool_stats():
+    return get_pool().stats()
@@ -0,0 +1,61 @@
+"""Dimensions d'analyse dérivées du texte brut (année, grade, type d'épreuve, région).
+
+Expressions SQL partagées par les tables pré-agrégées, pour que toutes découpent les
+résultats exactement de la même façon que les filtres des pages.
+"""
+
+GRADES = (1, 2, 3)
+TYPES_EPREUVE = ("Agility", "Jumping")
+
+# LA LISTE NOIRE DES PAYS ÉTRANGERS (exclus du comparatif national)
+PAYS_ETRANGERS = (
+    'ETRANGER', 'SUISSE', 'ESPAGNE', 'BELGIQUE', 'ALLEMAGNE',
+    'ITALIE', 'LUXEMBOURG', 'PAYS-BAS', 'PAYS BAS', 'MONACO',
+    'ANDORRE', 'ROYAUME-UNI', 'ANGLETERRE', 'PORTUGAL',
+)
+
+
+def annee_sql(date_col="lc.date_concours"):
+    """Année d'une date texte 'JJ/MM/AAAA'."""
+    return f"SUBSTR({date_col}, 7, 4)"
+
+
+def date_iso_sql(date_col="lc.date_concours"):
+    """'JJ/MM/AAAA' -> 'AAAA-MM-JJ', triable comme du texte."""
+    return f"(SUBSTR({date_col}, 7, 4) || '-' || SUBSTR({date_col}, 4, 2) || '-' || SUBSTR({date_col}, 1, 2))"
+
+
+def date_key_sql(date_col="lc.date_concours"):
+    """'JJ/MM/AAAA' -> AAAAMMJJ entier (clé de date de k9.seasons)."""
+    return f"CAST(SUBSTR({date_col}, 7, 4) || SUBSTR({date_col}, 4, 2) || SUBSTR({date_col}, 1, 2) AS INTEGER)"
+
+
+def grade_sql(epreuve_col="r.nom_epreuve"):
+    """1, 2 ou 3 si le nom de l'épreuve contient 'Grade n', 0 sinon."""
+    cases = " ".join(f"WHEN UPPER({epreuve_col}) LIKE '%GRADE {g}%' THEN {g}" for g in GRADES)
+    return f"CASE {cases} ELSE 0 END"
+
+
+def type_epreuve_sql(epreuve_col="r.nom_epreuve"):
+    """'Agility', 'Jumping' ou 'Autre'."""
+    cases = " ".join(f"WHEN UPPER({epreuve_col}) LIKE '%{t.upper()}%' THEN '{t}'" for t in TYPES_EPREUVE)
+    return f"CASE {cases} ELSE 'Autre' END"
+
+
+def region_sql(region_col="r.region"):
+    return f"UPPER(TRIM({region_col}))"
+
+
+def region_francaise_sql(region_col="r.region"):
+    """Condition : région renseignée et hors liste des pays étrangers."""
+    pays = ", ".join(f"'{p}'" for p in PAYS_ETRANGERS)
+    return (f"{region_col} IS NOT NULL AND TRIM({region_col}) != '' "
+            f"AND {region_sql(region_col)} NOT IN ({pays})")
+
+
+def grade_from_label(label):
+    """'Grade 2' -> 2 ; tout autre libellé ('Tous les grades'...) -> None."""
+    for g in GRADES:
+        if label == f"Grade {g}":
+            return g
+    return None
@@ -0,0 +1,253 @@
+"""Distributions pré-calculées de la vitesse et des pénalités, pour les rangs percentiles du profil.
+
+Chaque distribution est un histogramme à classes fixes (mêmes bornes pour toutes) : deux
+histogrammes se fusionnent en additionnant leurs compteurs, exactement, dans n'importe quel
+ordre. Rang percentile et quantiles s'en déduisent en temps constant, à une demi-classe près
+(interpolation linéaire dans la classe).
+
+Une distribution par mesure × (dimension, valeur) × saison, où dimension vaut :
+- saison : tous les parcours de la saison (valeur '') ;
+- race, grade ('1' à '3'), region : les parcours de cette race / ce grade / cette région.
+
+Deux niveaux, comme le cube des régions :
+- distributions_concours : contribution de chaque concours (remplacée à chaque rechargement) ;
+- distributions : fusion des contributions, lue par la page profil et l'API.
+Sont comptés les parcours non éliminés ayant une valeur ; au-delà des bornes, la valeur
+tombe dans la première ou la dernière classe.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from k9.dimensions import annee_sql, grade_sql, region_sql
+
+# mesure -> (colonne, borne basse, borne haute, nombre de classes)
+# Pénalités : classes centrées sur les multiples de 0,5 (0, 5, 10... au milieu d'une classe),
+# pour que les nombreux ex aequo à 0 comptent pour moitié dans le rang (rang moyen).
+MEASURES = {
+    "vitesse": ("r.vitesse_num", 0.0, 10.0, 200),
+    "penalites": ("r.penalites_num", -0.25, 99.75, 200),
+}
+
+# dimension -> (expression de la valeur, condition sur la ligne)
+DIMENSIONS = {
+    "saison": ("''", "1"),
+    "race": ("r.race", "r.race IS NOT NULL AND r.race != ''"),
+    "grade": (f"CAST({grade_sql()} AS TEXT)", f"{grade_sql()} > 0"),
+    "region": (region_sql(), "r.region IS NOT NULL AND TRIM(r.region) != ''"),
+}
+
+_KEY = "mesure, dimension, valeur, annee"
+
+
+class Histogram:
+    """Histogramme à classes fixes d'une mesure : add() / merge() / rank() / quantile(), sérialisable en BLOB."""
+
+    def __init__(self, mesure, counts=None):
+        self.mesure = mesure
+        _, self.lo, self.hi, self.n = MEASURES[mesure]
+        self.width = (self.hi - self.lo) / self.n
+        self.scale = self.n / (self.hi - self.lo)      # Même calcul de classe qu'en SQL (_contributions)
+        self.counts = np.zeros(self.n, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        bins = np.clip(((values - self.lo) * self.scale).astype(np.int64), 0, self.n - 1)
+        self.counts += np.bincount(bins, minlength=self.n)
+        return self
+
+    def merge(self, other):
+        self.counts = self.counts + other.counts
+        return self
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def rank(self, value):
+        """Part des valeurs inférieures à `value`, en % (interpolée dans sa classe) ; None si vide."""
+        total = self.total
+        if not total or value is None or np.isnan(value):
+            return None
+        x = min(max((value - self.lo) * self.scale, 0.0), float(self.n))
+        i = min(int(x), self.n - 1)
+        below = self.counts[:i].sum() + (x - i) * self.counts[i]
+        return float(below / total * 100)
+
+    def median_rank(self, values):
+        """Rang percentile médian d'une série de valeurs (NaN ignorés) ; None si vide."""
+        values = np.asarray(values, dtype=np.float64)
+        ranks = [self.rank(value) for value in values[~np.isnan(values)]]
+        ranks = [rank for rank in ranks if rank is not None]
+        return float(np.median(ranks)) if ranks else None
+
+    def quantile(self, q):
+        """Valeur sous laquelle se trouve la fraction q des parcours ; None si vide."""
+        total = self.total
+        if not total:
+            return None
+        cumulative = np.cumsum(self.counts)
+        target = q * total
+        i = int(np.searchsorted(cumulative, target, side="left"))
+        i = min(i, self.n - 1)
+        before = cumulative[i - 1] if i else 0
+        inside = (target - before) / self.counts[i] if self.counts[i] else 0.0
+        return float(self.lo + (i + inside) * self.width)
+
+    def frame(self):
+        """DataFrame (debut, fin, nb) des classes non vides, pour les graphiques."""
+        nonzero = np.flatnonzero(self.counts)
+        starts = self.lo + nonzero * self.width
+        return pd.DataFrame({"debut": starts, "fin": starts + self.width, "nb": self.counts[nonzero]})
+
+    def to_blob(self):
+        return zlib.compress(self.counts.astype("<i4").tobytes())
+
+    @classmethod
+    def from_blob(cls, mesure, blob):
+        if not blob:
+            return cls(mesure)
+        return cls(mesure, np.frombuffer(zlib.decompress(blob), dtype="<i4"))
+
+
+def create_distribution_tables(conn):
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS distributions_concours (
+            mesure TEXT, dimension TEXT, valeur TEXT, annee TEXT, id_concours,
+            nb INTEGER, histogramme BLOB,
+            PRIMARY KEY ({_KEY}, id_concours)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_distributions_concours_id ON distributions_concours (id_concours);
+        CREATE TABLE IF NOT EXISTS distributions (
+            mesure TEXT, dimension TEXT, valeur TEXT, annee TEXT,
+            nb INTEGER, histogramme BLOB,
+            PRIMARY KEY (annee, dimension, valeur, mesure)
+        ) WITHOUT ROWID;
+    """)
+
+
+def _contributions(conn, where="", params=()):
+    """{(mesure, dimension, valeur, annee, id_concours): Histogram} pour les lignes filtrées."""
+    histograms = {}
+    for mesure, (column, lo, hi, n) in MEASURES.items():
+        bin_expr = f"MIN({n - 1}, MAX(0, CAST(({column} - ({lo})) * {n / (hi - lo)} AS INTEGER)))"
+        for dimension, (value_expr, condition) in DIMENSIONS.items():
+            rows = conn.execute(f"""
+                SELECT {value_expr}, {annee_sql()}, r.id_concours, {bin_expr}, COUNT(*)
+                FROM resultats r
+                JOIN liste_concours lc ON r.id_concours = lc.id_concours
+                WHERE {column} IS NOT NULL AND r.is_eliminated = 0 AND {condition} {where}
+                GROUP BY 1, 2, 3, 4
+            """, params)
+            for valeur, annee, id_concours, bin_, nb in rows:
+                key = (mesure, dimension, valeur, annee, id_concours)
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = Histogram(mesure)
+                histogram.counts[bin_] += nb
+    return histograms
+
+
+def _store_contributions(conn, histograms):
+    conn.executemany(f"""
+        INSERT OR REPLACE INTO distributions_concours ({_KEY}, id_concours, nb, histogramme)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, ((*key, h.total, h.to_blob()) for key, h in histograms.items()))
+
+
+def _publish(conn, merged):
+    conn.executemany(f"INSERT OR REPLACE INTO distributions ({_KEY}, nb, histogramme) VALUES (?, ?, ?, ?, ?, ?)",
+                     ((*key, h.total, h.to_blob()) for key, h in merged.items()))
+
+
+def rebuild_distributions(conn):
+    create_distribution_tables(conn)
+    conn.execute("DELETE FROM distributions_concours")
+    conn.execute("DELETE FROM distributions")
+    histograms = _contributions(conn)
+    _store_contributions(conn, histograms)
+    merged = {}
+    for (*key, _), histogram in histograms.items():
+        key = tuple(key)
+        if key in merged:
+            merged[key].merge(histogram)
+        else:
+            merged[key] = Histogram(key[0], histogram.counts.copy())
+    _publish(conn, merged)
+    conn.commit()
+
+
+def refresh_distributions(conn, concours_ids):
+    """Remplace les contributions des concours chargés puis refusionne les distributions touchées.
+
+    Clés touchées avant ET après rechargement : une ligne corrigée peut changer de race ou de région.
+    """
+    ids = list(concours_ids)
+    if not ids:
+        return
+    in_ids = f"IN ({', '.join('?' * len(ids))})"
+    touched = set(conn.execute(f"SELECT {_KEY} FROM distributions_concours WHERE id_concours {in_ids}", ids))
+    conn.execute(f"DELETE FROM distributions_concours WHERE id_concours {in_ids}", ids)
+    histograms = _contributions(conn, f"AND r.id_concours {in_ids}", ids)
+    _store_contributions(conn, histograms)
+    touched |= {tuple(key[:4]) for key in histograms}
+
+    merged = {}
+    for key in touched:
+        histogram = Histogram(key[0])
+        for (blob,) in conn.execute("""
+                SELECT histogramme FROM distributions_concours
+                WHERE mesure = ? AND dimension = ? AND valeur = ? AND annee = ?""", key):
+            histogram.merge(Histogram.from_blob(key[0], blob))
+        if histogram.total:
+            merged[key] = histogram
+        else:
+            conn.execute("DELETE FROM distributions WHERE mesure = ? AND dimension = ? AND valeur = ? AND annee = ?",
+                         key)
+    _publish(conn, merged)
+    conn.commit()
+
+
+# --- LECTURE ---
+def distributions_query(annee, keys):
+    """(sql, params) des histogrammes d'une saison pour une liste de (dimension, valeur)."""
+    # Une recherche par clé primaire complète par population (UNION ALL), pas de parcours de la saison
+    keys = list(keys)
+    select = "SELECT mesure, dimension, valeur, nb, histogramme FROM distributions " \
+             "WHERE annee = ? AND dimension = ? AND valeur = ?"
+    return "\nUNION ALL\n".join(select for _ in keys), tuple(v for key in keys for v in (annee, *key))
+
+
+def histograms(df):
+    """Lignes de distributions_query -> {(mesure, dimension, valeur): Histogram}."""
+    return {(row.mesure, row.dimension, row.valeur): Histogram.from_blob(row.mesure, row.histogramme)
+            for row in df.itertuples(index=False)}
+
+
+def couple_context_query(id_couple, annee):
+    """(sql, params) : race, région et grade le plus haut d'un couple sur une saison."""
+    return f"""
+        SELECT
+            r.race AS race,
+            {region_sql()} AS region,
+            MAX({grade_sql()}) AS grade,
+            COUNT(*) AS nb
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE r.id_couple = ? AND {annee_sql()} = ?
+        GROUP BY 1, 2
+        ORDER BY nb DESC
+        LIMIT 1
+    """, (id_couple, annee)
+
+
+def couple_runs_query(id_couple, annee):
+    """(sql, params) des parcours d'un couple sur une saison, comptés comme dans les distributions."""
+    return f"""
+        SELECT r.vitesse_num AS vitesse, r.penalites_num AS penalites
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE r.id_couple = ? AND {annee_sql()} = ? AND r.is_eliminated = 0
+    """, (id_couple, annee)
@@ -0,0 +1,69 @@
+"""DataFrames compacts : types de colonnes appliqués à la lecture, par paquets de lignes.
+
+pd.read_sql_query renvoie les textes en dtype object ou str (un objet par cellule) : 50 à 70
+octets par valeur là où un float64 en prend 8 et un code de catégorie 1 ou 2. Avec un schéma
+{colonne: type}, le résultat est lu par paquets de CHUNK_ROWS lignes, chaque paquet typé
+aussitôt : la copie en dtype object n'existe jamais qu'un paquet à la fois.
+
+Types : "category" (libellés peu variés : race, région, juge, épreuve...), "decimal" (texte à
+virgule ou à point, '-' -> NaN), "float", "int", "date" ('JJ/MM/AAAA'), "date_iso" ('AAAA-MM-JJ').
+Les colonnes absentes du schéma sont laissées telles quelles.
+"""
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, union_categoricals
+
+from k9.cache import frame_bytes
+
+CHUNK_ROWS = 20_000
+
+_DATE_FORMATS = {"date": "%d/%m/%Y", "date_iso": "%Y-%m-%d"}
+
+
+def _convert(column, kind):
+    if kind == "category":
+        return column.astype("category")
+    if kind == "decimal":
+        if not is_numeric_dtype(column):
+            column = column.astype("string").str.strip().str.replace(",", ".", regex=False)
+        return pd.to_numeric(column, errors="coerce").astype("float64")
+    if kind == "float":
+        return pd.to_numeric(column, errors="coerce").astype("float64")
+    if kind == "int":
+        return pd.to_numeric(column, errors="coerce", downcast="integer")
+    if kind in _DATE_FORMATS:
+        return pd.to_datetime(column, format=_DATE_FORMATS[kind], errors="coerce")
+    raise ValueError(f"type de colonne inconnu : {kind!r}")
+
+
+def apply_schema(df, schema):
+    """Convertit en place les colonnes de `schema` présentes dans df ; renvoie df."""
+    for name, kind in schema.items():
+        if name in df.columns:
+            df[name] = _convert(df[name], kind)
+    return df
+
+
+def concat_chunks(chunks, schema):
+    """Recolle des paquets typés ; les catégories sont unifiées (et triées) au lieu de repasser en object."""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = chunks[0].columns
+    categories = [name for name, kind in schema.items() if kind == "category" and name in columns]
+    df = pd.concat([chunk.drop(columns=categories) for chunk in chunks], ignore_index=True)
+    for name in categories:
+        df[name] = union_categoricals([chunk[name] for chunk in chunks], sort_categories=True)
+    return df[columns]
+
+
+def read_frame(conn, sql, params=(), schema=None, chunksize=CHUNK_ROWS):
+    """(DataFrame, octets qu'aurait pris le résultat brut en dtype object ; None sans schéma)."""
+    if not schema:
+        return pd.read_sql_query(sql, conn, params=params), None
+    chunks, raw_bytes = [], 0
+    for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize):
+        raw_bytes += frame_bytes(chunk)
+        chunks.append(apply_schema(chunk, schema))
+    if not chunks:    # Aucune ligne : pandas peut ne renvoyer aucun paquet
+        df = pd.read_sql_query(sql, conn, params=params)
+        return apply_schema(df, schema), frame_bytes(df)
+    return concat_chunks(chunks, schema), raw_bytes
@@ -0,0 +1,127 @@
+"""Historique du profil et feuille de match du Versus, paginés par clé (date_key, rowid).
+
+Chaque page reprend après la dernière ligne affichée (pas d'OFFSET) : le coût d'une page et
+sa taille ne dépendent pas de la longueur de la carrière. La feuille de match d'une page est
+rendue en un seul bloc HTML au lieu de plusieurs widgets par duel.
+"""
+import html
+
+from k9.outcomes import VAINQUEUR_1, VAINQUEUR_2, duel_winners, penalties, speeds
+from k9.seasons import season_filter_sql
+
+PAGE_SIZE = 50
+CURSOR_COLUMNS = ["date_key", "rid"]
+
+# Schémas de colonnes (k9.frames). La feuille de match garde vitesse et pénalités en texte brut
+# (affichées telles quelles, '-' compris) : ses colonnes numériques sont spd_* / pnum_*.
+HISTORY_SCHEMA = {"Date": "date", "Lieu": "category", "nom_epreuve": "category",
+                  "vitesse": "decimal", "penalites": "decimal", "qualificatif": "category"}
+DUEL_PAGE_SCHEMA = {"date_concours": "category", "nom_concours": "category", "nom_epreuve": "category"}
+
+
+# date_key est NULL pour une date illisible : comptée 0 (en fin de liste) dans la clé de pagination,
+# sinon la comparaison du curseur écarterait ces lignes et next_cursor échouerait sur NaN
+_DATE_KEY = "COALESCE(lc.date_key, 0)"
+
+
+def _after(cursor, alias):
+    """Condition "strictement après le curseur" dans l'ordre (date_key DESC, rowid DESC)."""
+    if cursor is None:
+        return "", ()
+    return f" AND ({_DATE_KEY}, {alias}.rowid) < (?, ?)", tuple(cursor)
+
+
+def history_page_query(id_couple, like_epreuve="%", annee=None, cursor=None, limit=PAGE_SIZE):
+    """(sql, params) d'une page de l'historique d'un couple, du plus récent au plus ancien."""
+    where, params = "r.id_couple = ? AND UPPER(r.nom_epreuve) LIKE UPPER(?)", (id_couple, like_epreuve)
+    if annee is not None:
+        filtre, bornes = season_filter_sql(annee)
+        where, params = f"{where} AND {filtre}", params + bornes
+    after, after_params = _after(cursor, "r")
+    return f"""
+        SELECT lc.date_concours AS Date, lc.nom_concours AS Lieu, r.nom_epreuve, r.vitesse, r.penalites,
+               r.qualificatif, {_DATE_KEY} AS date_key, r.rowid AS rid
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE {where}{after}
+        ORDER BY {_DATE_KEY} DESC, r.rowid DESC
+        LIMIT ?
+    """, params + after_params + (limit,)
+
+
+def duel_averages_query(id_1, id_2):
+    """(sql, params) des moyennes en confrontation directe, agrégées en SQL (une seule ligne).
+
+    Même règle que k9.outcomes.duel_summary : vitesse moyenne hors éliminations, pénalités
+    moyennes des passages renseignés, % d'éliminations sur l'ensemble des duels.
+    Le score vient du bilan pré-calculé (k9.rivalries.head_to_head_query).
+    """
+    return """
+        SELECT COUNT(*) AS nb,
+               AVG(r1.vitesse_num) AS vit_moy_1, AVG(r1.penalites_num) AS pen_moy_1,
+               100.0 * SUM(r1.vitesse_num IS NULL) / COUNT(*) AS pct_elim_1,
+               AVG(r2.vitesse_num) AS vit_moy_2, AVG(r2.penalites_num) AS pen_moy_2,
+               100.0 * SUM(r2.vitesse_num IS NULL) / COUNT(*) AS pct_elim_2
+        FROM resultats r1
+        JOIN resultats r2 ON r1.id_concours = r2.id_concours AND r1.nom_epreuve = r2.nom_epreuve
+        WHERE r1.id_couple = ? AND r2.id_couple = ?
+    """, (id_1, id_2)
+
+
+def duel_page_query(id_1, id_2, cursor=None, limit=PAGE_SIZE):
+    """(sql, params) d'une page de la feuille de match, du plus récent au plus ancien."""
+    after, after_params = _after(cursor, "r1")
+    return f"""
+        SELECT lc.date_concours, lc.nom_concours, r1.nom_epreuve,
+               r1.vitesse AS vit_1, r1.penalites AS pen_1,
+               r2.vitesse AS vit_2, r2.penalites AS pen_2,
+               r1.vitesse_num AS spd_1, r1.penalites_num AS pnum_1,
+               r2.vitesse_num AS spd_2, r2.penalites_num AS pnum_2,
+               {_DATE_KEY} AS date_key, r1.rowid AS rid
+        FROM resultats r1
+        JOIN resultats r2 ON r1.id_concours = r2.id_concours AND r1.nom_epreuve = r2.nom_epreuve
+        JOIN liste_concours lc ON r1.id_concours = lc.id_concours
+        WHERE r1.id_couple = ? AND r2.id_couple = ?{after}
+        ORDER BY {_DATE_KEY} DESC, r1.rowid DESC
+        LIMIT ?
+    """, (id_1, id_2) + after_params + (limit,)
+
+
+def next_cursor(page):
+    """Curseur de la page suivante : clé de la dernière ligne affichée."""
+    last = page.iloc[-1]
+    return int(last["date_key"]), int(last["rid"])
+
+
+def _side(elimine, gagne, penalite, vitesse, couleur, a_droite):
+    if elimine:
+        return "ELIM ⛔" if not a_droite else "⛔ ELIM", "color: #95a5a6;"
+    txt = f"{html.escape(str(penalite))} pts ({html.escape(str(vitesse))}s)"
+    if not gagne:
+        return txt, "color: #333;"
+    txt = f"👑 <b>{txt}</b>" if a_droite else f"<b>{txt}</b> 👑"
+    return txt, f"color: {couleur}; font-size: 1.1em;"
+
+
+def duel_sheet_html(page, nom_1, nom_2):
+    """Feuille de match d'une page de duels, en un seul tableau HTML (un en-tête par concours)."""
+    winners = duel_winners(speeds(page["spd_1"]), penalties(page["pnum_1"]),
+                           speeds(page["spd_2"]), penalties(page["pnum_2"]))
+    elim_1, elim_2 = page["spd_1"].isna().to_numpy(), page["spd_2"].isna().to_numpy()
+    entete = ("<tr><th style='text-align: left;'>Épreuve</th>"
+              f"<th style='text-align: right; color: #e74c3c;'>{html.escape(nom_1)}</th>"
+              f"<th style='text-align: left; color: #3498db;'>{html.escape(nom_2)}</th></tr>")
+    lignes, concours = [], None
+    for i, row in enumerate(page.itertuples(index=False)):
+        if (row.date_concours, row.nom_concours) != concours:
+            concours = (row.date_concours, row.nom_concours)
+            lignes.append(f"<tr><td colspan='3' style='padding-top: 12px;'><b>🏟️ {html.escape(str(row.nom_concours))}</b>"
+                          f" <span style='color: gray; font-size: 0.8em'>- {html.escape(str(row.date_concours))}</span></td></tr>")
+            lignes.append(entete)
+        txt_1, style_1 = _side(elim_1[i], winners[i] == VAINQUEUR_1, row.pen_1, row.vit_1, "#e74c3c", True)
+        txt_2, style_2 = _side(elim_2[i], winners[i] == VAINQUEUR_2, row.pen_2, row.vit_2, "#3498db", False)
+        lignes.append(
+            f"<tr><td>{html.escape(str(row.nom_epreuve))}</td>"
+            f"<td style='text-align: right; {style_1} border-right: 1px solid #ddd; padding-right: 15px;'>{txt_1}</td>"
+            f"<td style='text-align: left; {style_2} padding-left: 15px;'>{txt_2}</td></tr>")
+    return "<table style='width: 100%; border-collapse: collapse;'>" + "".join(lignes) + "</table>"
@@ -0,0 +1,361 @@
+"""Chargement de fichiers de résultats (CSV ou JSON lines) dans resultats et liste_concours.
+
+Les lignes traversent une chaîne de générateurs (lecture -> normalisation -> lots) sans
+jamais tenir le fichier en mémoire. Elles sont d'abord versées, par executemany, dans une
+table temporaire dont la clé naturelle (id_concours, nom_epreuve, id_couple) dédoublonne :
+la dernière occurrence l'emporte. Chaque épreuve (id_concours, nom_epreuve) reçoit ensuite
+une empreinte de son contenu ; une épreuve dont l'empreinte n'a pas changé depuis le dernier
+chargement est ignorée, les autres sont remplacées en bloc. Un fichier partiel (quelques
+épreuves d'un concours) laisse donc intactes les autres épreuves du concours. L'en-tête du
+concours (nom, date) a sa propre empreinte. Recharger un fichier déjà chargé ne coûte donc
+que la lecture et le calcul des empreintes. Tout est écrit dans une seule transaction, en
+mode WAL pour ne pas bloquer les lecteurs de l'application.
+
+Colonnes attendues : id_concours, nom_concours, date_concours, nom_epreuve, id_couple,
+nom_chien, conducteur, race, club, region, juge, vitesse, penalites, temps, qualificatif.
+
+Usage : python -m k9.ingest FICHIER [FICHIER ...] [--db chemin] [--lot 10000] [--sans-refresh]
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+
+from k9.changes import create_change_tables, record_removed_couples
+from k9.db import DB_PATH, open_readwrite
+from k9.refresh import refresh_all
+
+# --- RÉGLAGES ---
+BATCH_SIZE = 10_000                # Lignes par executemany
+
+KEY_COLUMNS = ("id_concours", "nom_epreuve", "id_couple")
+TEXT_COLUMNS = ("nom_chien", "conducteur", "race", "club", "region", "juge")
+DECIMAL_COLUMNS = ("vitesse", "penalites", "temps")
+RESULT_COLUMNS = KEY_COLUMNS + TEXT_COLUMNS + DECIMAL_COLUMNS + ("qualificatif",)
+CONCOURS_COLUMNS = ("nom_concours", "date_concours")
+STAGING_COLUMNS = RESULT_COLUMNS + CONCOURS_COLUMNS
+EMPTY_VALUES = {"", "none", "null", "nan", "n/a"}
+
+_NUMBER = re.compile(r"^[+-]?\d+(?:[.,]\d+)?$")
+_DATE_FORMATS = (
+    (re.compile(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})$"), (1, 2, 3)),   # JJ/MM/AAAA, J.M.AAAA...
+    (re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ].*)?$"), (3, 2, 1)),  # AAAA-MM-JJ (ISO)
+)
+
+
+class RejectedRow(ValueError):
+    """Ligne inexploitable (illisible, clé naturelle incomplète, date illisible)."""
+
+
+# --- LECTURE ---
+def _open_text(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def read_records(path):
+    """Dictionnaires bruts d'un fichier .csv, .jsonl / .ndjson (éventuellement .gz, '-' = stdin en JSON lines).
+
+    Une ligne illisible est produite comme un RejectedRow (levé par normalize_record) :
+    la lecture continue avec la ligne suivante.
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    with _open_text(path) as f:
+        if name.endswith(".csv"):
+            first = f.readline()
+            delimiter = ";" if first.count(";") > first.count(",") else ","
+            reader = iter(csv.DictReader(f, fieldnames=next(csv.reader([first], delimiter=delimiter)),
+                                         delimiter=delimiter))
+            while True:
+                try:
+                    yield next(reader)
+                except StopIteration:
+                    return
+                except csv.Error as exc:
+                    yield RejectedRow(f"CSV illisible : {exc}")
+        else:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield RejectedRow(f"JSON illisible : {exc}")
+
+
+# --- NORMALISATION ---
+def _text(value):
+    text = value.strip() if isinstance(value, str) else "" if value is None else str(value).strip()
+    return "" if len(text) <= 4 and text.lower() in EMPTY_VALUES else text
+
+
+def normalize_decimal(value):
+    """Nombre -> texte à virgule ('4.52' -> '4,52', 5.0 -> '5,00') ; '-', '' et le reste inchangés."""
+    if isinstance(value, bool):
+        return _text(value)
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return "" if value != value else f"{value:.2f}".replace(".", ",")
+    text = _text(value)
+    return text.replace(".", ",") if _NUMBER.match(text) else text
+
+
+@lru_cache(maxsize=4096)
+def _date(text):
+    for pattern, (d, m, y) in _DATE_FORMATS:
+        match = pattern.match(text)
+        if match:
+            day, month, year = int(match.group(d)), int(match.group(m)), int(match.group(y))
+            if 1 <= day <= 31 and 1 <= month <= 12:
+                return f"{day:02d}/{month:02d}/{year:04d}"
+    return None
+
+
+def normalize_date(value):
+    """'1/3/2024', '01.03.2024', '2024-03-01'... -> '01/03/2024', le format de liste_concours."""
+    date = _date(_text(value))
+    if date is None:
+        raise RejectedRow(f"date illisible : {value!r}")
+    return date
+
+
+def _integer(value, column):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    text = _text(value)
+    try:
+        return int(float(text.replace(",", "."))) if text else None
+    except ValueError:
+        raise RejectedRow(f"{column} non entier : {value!r}") from None
+
+
+def normalize_record(record):
+    """Tuple dans l'ordre de STAGING_COLUMNS ; lève RejectedRow si la ligne est inexploitable."""
+    if isinstance(record, RejectedRow):
+        raise record
+    if not isinstance(record, dict):
+        raise RejectedRow(f"enregistrement non objet : {type(record).__name__}")
+    get = record.get
+    id_concours, id_couple = _integer(get("id_concours"), "id_concours"), _integer(get("id_couple"), "id_couple")
+    nom_epreuve = _text(get("nom_epreuve"))
+    if id_concours is None or id_couple is None or not nom_epreuve:
+        raise RejectedRow("clé naturelle incomplète (id_concours, nom_epreuve, id_couple)")
+    return ((id_concours, nom_epreuve, id_couple)
+            + tuple(_text(get(column)) for column in TEXT_COLUMNS)
+            + tuple(normalize_decimal(get(column)) for column in DECIMAL_COLUMNS)
+            + (_text(get("qualificatif")), _text(get("nom_concours")), normalize_date(get("date_concours"))))
+
+
+def normalized(records, stats):
+    """Filtre les lignes rejetées (comptées dans stats, les premières motivées sur stderr)."""
+    for record in records:
+        stats["lues"] += 1
+        try:
+            yield normalize_record(record)
+        except RejectedRow as exc:
+            stats["rejetees"] += 1
+            if stats["rejetees"] <= 10:
+                print(f"[k9] ligne {stats['lues']} rejetée : {exc}", file=sys.stderr)
+
+
+def batched(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- ÉCRITURE ---
+def create_ingest_tables(conn):
+    create_change_tables(conn)
+    # chargements : empreinte de l'en-tête du concours ; chargements_epreuves : du contenu de chaque épreuve
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS chargements (
+            id_concours INTEGER PRIMARY KEY,
+            empreinte TEXT NOT NULL,
+            nb_lignes INTEGER,
+            charge_le TEXT
+        );
+        CREATE TABLE IF NOT EXISTS chargements_epreuves (
+            id_concours INTEGER,
+            nom_epreuve TEXT,
+            empreinte TEXT NOT NULL,
+            nb_lignes INTEGER,
+            charge_le TEXT,
+            PRIMARY KEY (id_concours, nom_epreuve)
+        ) WITHOUT ROWID;
+    """)
+
+
+def _create_staging(conn):
+    conn.executescript(f"""
+        DROP TABLE IF EXISTS temp.chargement_lignes;
+        CREATE TEMP TABLE chargement_lignes (
+            {', '.join(STAGING_COLUMNS)},
+            PRIMARY KEY ({', '.join(KEY_COLUMNS)})
+        ) WITHOUT ROWID;
+    """)
+
+
+def _concours_info(conn, id_concours):
+    """(nom_concours, date_concours) d'un concours chargé, pris sur sa dernière ligne."""
+    return conn.execute(
+        "SELECT nom_concours, date_concours FROM chargement_lignes WHERE id_concours = ? "
+        "ORDER BY nom_epreuve DESC, id_couple DESC LIMIT 1", (id_concours,)).fetchone()
+
+
+def _header_fingerprint(concours):
+    """Empreinte de l'en-tête (nom_concours, date_concours) d'un concours."""
+    return hashlib.blake2b(repr(tuple(concours)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _fingerprint(conn, id_concours, nom_epreuve):
+    """Empreinte du contenu d'une épreuve, indépendante de l'ordre des lignes dans le fichier."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in conn.execute(f"SELECT {', '.join(RESULT_COLUMNS)} FROM chargement_lignes "
+                            "WHERE id_concours = ? AND nom_epreuve = ? ORDER BY id_couple",
+                            (id_concours, nom_epreuve)):
+        digest.update(repr(row).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _closed_season(conn, id_concours, date_concours):
+    """Vrai si le concours est (ou serait, à sa nouvelle date) dans une saison fermée."""
+    annees = {int(date_concours[6:10])}
+    annees |= {a for (a,) in conn.execute(
+        "SELECT annee FROM liste_concours WHERE id_concours = ? AND annee IS NOT NULL", (id_concours,))}
+    return conn.execute(f"SELECT 1 FROM saisons WHERE fermee = 1 AND annee IN ({', '.join('?' * len(annees))})",
+                        tuple(annees)).fetchone() is not None
+
+
+def _upsert_concours(conn, id_concours, nom_concours, date_concours):
+    updated = conn.execute("UPDATE liste_concours SET nom_concours = ?, date_concours = ? WHERE id_concours = ?",
+                           (nom_concours, date_concours, id_concours)).rowcount
+    if not updated:
+        conn.execute("INSERT INTO liste_concours (id_concours, nom_concours, date_concours) VALUES (?, ?, ?)",
+                     (id_concours, nom_concours, date_concours))
+
+
+def _replace_epreuve(conn, id_concours, nom_epreuve):
+    key = (id_concours, nom_epreuve)
+    record_removed_couples(conn, "id_concours = ? AND nom_epreuve = ?", key)
+    conn.execute("DELETE FROM resultats WHERE id_concours = ? AND nom_epreuve = ?", key)
+    return conn.execute(f"""
+        INSERT INTO resultats ({', '.join(RESULT_COLUMNS)})
+        SELECT {', '.join(RESULT_COLUMNS)} FROM chargement_lignes WHERE id_concours = ? AND nom_epreuve = ?
+        ORDER BY id_couple
+    """, key).rowcount
+
+
+def ingest(conn, paths, batch_size=BATCH_SIZE, out=sys.stderr):
+    """Charge les fichiers ; renvoie les statistiques et la liste des id_concours modifiés."""
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    create_ingest_tables(conn)
+    _create_staging(conn)
+    stats = {"lues": 0, "rejetees": 0, "concours": 0, "inchanges": 0, "fermes": 0, "epreuves": 0, "ecrites": 0}
+    t0 = time.perf_counter()
+
+    insert = (f"INSERT OR REPLACE INTO chargement_lignes ({', '.join(STAGING_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(STAGING_COLUMNS))})")
+    changed = []
+    try:
+        for path in paths:
+            for batch in batched(normalized(read_records(path), stats), batch_size):
+                conn.executemany(insert, batch)
+        t_read = time.perf_counter()
+
+        ids = [i for (i,) in conn.execute("SELECT DISTINCT id_concours FROM chargement_lignes ORDER BY id_concours")]
+        for id_concours in ids:
+            stats["concours"] += 1
+            concours = _concours_info(conn, id_concours)
+            empreinte = _header_fingerprint(concours)
+            known = conn.execute("SELECT empreinte FROM chargements WHERE id_concours = ?", (id_concours,)).fetchone()
+            header_changed = not known or known[0] != empreinte
+            known_epreuves = dict(conn.execute(
+                "SELECT nom_epreuve, empreinte FROM chargements_epreuves WHERE id_concours = ?", (id_concours,)))
+            epreuves = [(nom, _fingerprint(conn, id_concours, nom)) for (nom,) in conn.execute(
+                "SELECT DISTINCT nom_epreuve FROM chargement_lignes WHERE id_concours = ?", (id_concours,)).fetchall()]
+            epreuves = [(nom, e) for nom, e in epreuves if known_epreuves.get(nom) != e]
+            if not header_changed and not epreuves:
+                stats["inchanges"] += 1
+                continue
+            if _closed_season(conn, id_concours, concours[1]):
+                stats["fermes"] += 1
+                print(f"[k9] concours {id_concours} ignoré : saison fermée (python -m k9.seasons --rouvrir)",
+                      file=out)
+                continue
+            if header_changed:
+                _upsert_concours(conn, id_concours, *concours)
+            for nom_epreuve, empreinte_epreuve in epreuves:
+                nb_lignes = _replace_epreuve(conn, id_concours, nom_epreuve)
+                stats["epreuves"] += 1
+                stats["ecrites"] += nb_lignes
+                conn.execute("""
+                    INSERT INTO chargements_epreuves (id_concours, nom_epreuve, empreinte, nb_lignes, charge_le)
+                    VALUES (?, ?, ?, ?, datetime('now'))
+                    ON CONFLICT (id_concours, nom_epreuve) DO UPDATE SET
+                        empreinte = excluded.empreinte, nb_lignes = excluded.nb_lignes,
+                        charge_le = excluded.charge_le
+                """, (id_concours, nom_epreuve, empreinte_epreuve, nb_lignes))
+            (nb_lignes,) = conn.execute("SELECT COUNT(*) FROM resultats WHERE id_concours = ?",
+                                        (id_concours,)).fetchone()
+            conn.execute("""
+                INSERT INTO chargements (id_concours, empreinte, nb_lignes, charge_le)
+                VALUES (?, ?, ?, datetime('now'))
+                ON CONFLICT (id_concours) DO UPDATE SET
+                    empreinte = excluded.empreinte, nb_lignes = excluded.nb_lignes, charge_le = excluded.charge_le
+            """, (id_concours, empreinte, nb_lignes))
+            changed.append(id_concours)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.chargement_lignes")
+
+    elapsed = time.perf_counter() - t0
+    stats["lecture_s"] = round(t_read - t0, 2)
+    stats["ecriture_s"] = round(elapsed - (t_read - t0), 2)
+    stats["lignes_par_s"] = round(stats["lues"] / elapsed) if elapsed > 0 else 0
+    return stats, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charge des fichiers de résultats (CSV / JSON lines).")
+    parser.add_argument("fichiers", nargs="+", help="fichiers .csv, .jsonl ou .ndjson (.gz accepté, '-' = stdin)")
+    parser.add_argument("--db", default=DB_PATH, help="base à alimenter")
+    parser.add_argument("--lot", type=int, default=BATCH_SIZE, help="lignes par executemany")
+    parser.add_argument("--sans-refresh", action="store_true", help="ne pas rafraîchir les tables dérivées")
+    args = parser.parse_args(argv)
+
+    conn = open_readwrite(args.db)
+    try:
+        stats, changed = ingest(conn, args.fichiers, args.lot)
+        print(f"{stats['lues']:,} lignes lues ({stats['rejetees']:,} rejetées) en "
+              f"{stats['lecture_s'] + stats['ecriture_s']:.1f}s, {stats['lignes_par_s']:,} lignes/s", file=sys.stderr)
+        print(f"{stats['concours']:,} concours : {len(changed):,} chargés ({stats['epreuves']:,} épreuves, "
+              f"{stats['ecrites']:,} résultats), "
+              f"{stats['inchanges']:,} inchangés, {stats['fermes']:,} en saison fermée", file=sys.stderr)
+        if changed and not args.sans_refresh:
+            for name, seconds in refresh_all(conn, changed).items():
+                print(f"{name:<20} {seconds:8.2f}s", file=sys.stderr)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Chiffres clés du tableau de bord servis depuis une table pré-calculée.
+
+Parcours et concours sont comptés exactement ; chiens, conducteurs et couples distincts sont
+estimés par des sketches HyperLogLog (un par concours, fusionnables, plus un global).
+Avec PRECISION = 14 (16 384 registres), l'erreur type est 1,04 / √16384 ≈ 0,81 %,
+soit moins de 2,5 % dans 99 % des cas (3 écarts-types). En dessous de ~40 000 valeurs
+distinctes, la correction "linear counting" supprime le biais des petits effectifs mais pas
+l'erreur : compter encore de l'ordre de 1 % (jusqu'à ~1,5 %), même pour quelques milliers de valeurs.
+"""
+import hashlib
+import math
+import zlib
+
+PRECISION = 14
+REGISTERS = 1 << PRECISION
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+# Nom du KPI -> colonne de resultats dont on compte les valeurs distinctes
+SKETCHED = {
+    "chiens": "nom_chien",
+    "conducteurs": "conducteur",
+    "couples": "id_couple",
+}
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog 64 bits : add() / merge() / estimate(), sérialisable en BLOB compressé."""
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers is not None else bytearray(REGISTERS)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+        index = h >> (64 - PRECISION)
+        rest = h & ((1 << (64 - PRECISION)) - 1)
+        rank = (64 - PRECISION) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """Union des deux ensembles (maximum registre par registre) ; idempotent."""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        m = REGISTERS
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+    def to_blob(self):
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_blob(cls, blob):
+        return cls(zlib.decompress(blob)) if blob else cls()
+
+
+def create_kpi_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS kpi_sketches (
+            id_concours PRIMARY KEY,
+            nb_parcours INTEGER,
+            chiens BLOB,
+            conducteurs BLOB,
+            couples BLOB
+        );
+        CREATE TABLE IF NOT EXISTS kpi (
+            nom TEXT PRIMARY KEY,
+            valeur INTEGER,
+            erreur_relative REAL,
+            registres BLOB
+        );
+    """)
+
+
+def _concours_sketches(conn, id_concours):
+    nb = conn.execute("SELECT COUNT(*) FROM resultats WHERE id_concours = ?", (id_concours,)).fetchone()[0]
+    sketches = {}
+    for name, column in SKETCHED.items():
+        values = conn.execute(
+            f"SELECT DISTINCT {column} FROM resultats WHERE id_concours = ? AND {column} IS NOT NULL",
+            (id_concours,))
+        sketches[name] = HyperLogLog().update(v for (v,) in values)
+    return nb, sketches
+
+
+def _store(conn, id_concours, nb, sketches):
+    conn.execute("""
+        INSERT OR REPLACE INTO kpi_sketches (id_concours, nb_parcours, chiens, conducteurs, couples)
+        VALUES (?, ?, ?, ?, ?)
+    """, (id_concours, nb, *(sketches[name].to_blob() for name in SKETCHED)))
+
+
+def _publish(conn, globals_):
+    """Écrit les valeurs finales lues par le tableau de bord (une ligne par KPI)."""
+    rows = [(name, round(hll.estimate()), STANDARD_ERROR, hll.to_blob()) for name, hll in globals_.items()]
+    rows.append(("parcours", conn.execute("SELECT COALESCE(SUM(nb_parcours), 0) FROM kpi_sketches").fetchone()[0],
+                 0.0, None))
+    rows.append(("concours", conn.execute("SELECT COUNT(DISTINCT id_concours) FROM liste_concours").fetchone()[0],
+                 0.0, None))
+    conn.executemany("INSERT OR REPLACE INTO kpi (nom, valeur, erreur_relative, registres) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+
+
+def rebuild_kpis(conn):
+    create_kpi_tables(conn)
+    conn.execute("DELETE FROM kpi_sketches")
+    globals_ = {name: HyperLogLog() for name in SKETCHED}
+    ids = [i for (i,) in conn.execute("SELECT DISTINCT id_concours FROM resultats WHERE id_concours IS NOT NULL")]
+    for id_concours in ids:
+        nb, sketches = _concours_sketches(conn, id_concours)
+        _store(conn, id_concours, nb, sketches)
+        for name in SKETCHED:
+            globals_[name].merge(sketches[name])
+    _publish(conn, globals_)
+
+
+def refresh_kpis(conn, concours_ids):
+    """Ajoute les concours chargés : leurs sketches sont fusionnés dans les sketches globaux.
+
+    La fusion étant idempotente, recharger un concours déjà connu ne gonfle pas les totaux.
+    (Des suppressions de lignes ne sont en revanche prises en compte qu'au rebuild complet.)
+    """
+    globals_ = {
+        name: HyperLogLog.from_blob(blob)
+        for name, blob in conn.execute("SELECT nom, registres FROM kpi WHERE registres IS NOT NULL")
+    }
+    for name in SKETCHED:
+        globals_.setdefault(name, HyperLogLog())
+    for id_concours in concours_ids:
+        nb, sketches = _concours_sketches(conn, id_concours)
+        _store(conn, id_concours, nb, sketches)
+        for name in SKETCHED:
+            globals_[name].merge(sketches[name])
+    _publish(conn, globals_)
+
+
+# Même forme de résultat que l'ancienne requête à sous-requêtes COUNT(DISTINCT ...)
+DASHBOARD_KPIS_SQL = """
+    SELECT
+        (SELECT valeur FROM kpi WHERE nom = 'parcours') as total_lignes,
+        (SELECT valeur FROM kpi WHERE nom = 'concours') as total_concours,
+        (SELECT valeur FROM kpi WHERE nom = 'chiens') as total_chiens,
+        (SELECT valeur FROM kpi WHERE nom = 'conducteurs') as total_conducteurs,
+        (SELECT valeur FROM kpi WHERE nom = 'couples') as total_couples
+"""
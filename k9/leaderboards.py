@@ -0,0 +1,98 @@
+"""Classements pré-calculés : meilleurs sans-faute par race, type d'épreuve, grade et saison.
+
+On garde, pour chaque combinaison (race, type_epreuve, grade, annee), les TOP_K couples
+classés sur leur meilleur sans-faute (un couple n'apparaît qu'une fois). Un filtre "Tous"
+sur une dimension se résout à la lecture : le top K global est forcément contenu dans
+l'union des top K des combinaisons qu'il regroupe.
+"""
+from k9.dimensions import annee_sql, grade_sql, type_epreuve_sql
+
+TOP_K = 50
+
+
+def create_leaderboard_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS classements (
+            race TEXT, type_epreuve TEXT, grade INTEGER, annee TEXT, rang INTEGER,
+            id_couple, nom_chien TEXT, conducteur TEXT,
+            vitesse TEXT, vitesse_num REAL, penalites TEXT, region TEXT, club TEXT,
+            id_concours, date_concours TEXT,
+            PRIMARY KEY (race, annee, type_epreuve, grade, rang)
+        ) WITHOUT ROWID;
+    """)
+
+
+def _insert_leaderboards(conn, where="", params=()):
+    conn.execute(f"""
+        INSERT INTO classements
+        SELECT race, type_epreuve, grade, annee, rang,
+               id_couple, nom_chien, conducteur, vitesse, vitesse_num, penalites, region, club,
+               id_concours, date_concours
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY race, type_epreuve, grade, annee ORDER BY vitesse_num DESC) AS rang
+            FROM (
+                SELECT r.race, {type_epreuve_sql()} AS type_epreuve, {grade_sql()} AS grade,
+                       {annee_sql()} AS annee,
+                       r.id_couple, r.nom_chien, r.conducteur, r.vitesse, r.vitesse_num, r.penalites,
+                       r.region, r.club, r.id_concours, lc.date_concours,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY r.race, {type_epreuve_sql()}, {grade_sql()}, {annee_sql()}, r.id_couple
+                           ORDER BY r.vitesse_num DESC) AS rang_couple
+                FROM resultats r
+                JOIN liste_concours lc ON r.id_concours = lc.id_concours
+                WHERE r.is_clean = 1 AND r.race IS NOT NULL AND r.race != '' {where}
+            )
+            WHERE rang_couple = 1
+        )
+        WHERE rang <= {TOP_K}
+    """, params)
+
+
+def rebuild_leaderboards(conn):
+    create_leaderboard_tables(conn)
+    conn.execute("DELETE FROM classements")
+    _insert_leaderboards(conn)
+    conn.commit()
+
+
+def refresh_leaderboards(conn, concours_ids):
+    """Recalcule les classements des (race, saison) présents dans les concours chargés,
+    ou qui y puisaient avant un rechargement."""
+    ids = list(concours_ids)
+    if not ids:
+        return
+    placeholders = ", ".join("?" * len(ids))
+    touched = conn.execute(f"""
+        SELECT r.race, {annee_sql()}
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE r.id_concours IN ({placeholders}) AND r.race IS NOT NULL AND r.race != ''
+        UNION
+        SELECT race, annee FROM classements WHERE id_concours IN ({placeholders})
+    """, ids + ids).fetchall()
+    for race, annee in touched:
+        conn.execute("DELETE FROM classements WHERE race = ? AND annee = ?", (race, annee))
+        _insert_leaderboards(conn, f"AND r.race = ? AND {annee_sql()} = ?", (race, annee))
+    conn.commit()
+
+
+def leaderboard_query(race, type_epreuve=None, grade=None, annee=None, limit=10):
+    """(sql, params) du top `limit` d'une race ; None sur une dimension = toutes confondues."""
+    filters, params = ["race = ?"], [race]
+    for column, value in (("annee", annee), ("type_epreuve", type_epreuve), ("grade", grade)):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+    return f"""
+        SELECT nom_chien, conducteur, vitesse, region, club, penalites, date_concours AS date
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY id_couple ORDER BY vitesse_num DESC) AS rang_couple
+            FROM classements
+            WHERE {' AND '.join(filters)}
+        )
+        WHERE rang_couple = 1
+        ORDER BY vitesse_num DESC
+        LIMIT ?
+    """, tuple(params) + (min(limit, TOP_K),)
+
@@ -0,0 +1,245 @@
+"""Migrations de schéma de la base (numérotées, suivies via PRAGMA user_version).
+
+Usage : python -m k9.migrations [chemin_de_la_base]
+"""
+import argparse
+import sys
+import time
+
+from k9.db import DB_PATH, open_readwrite
+from k9.schema import create_indexes
+from k9.search import rebuild_search_index
+from k9.kpis import rebuild_kpis
+from k9.regions import rebuild_region_cube
+from k9.courses import rebuild_courses
+from k9.rivalries import rebuild_rivalries
+from k9.ratings import rebuild_ratings
+from k9.leaderboards import rebuild_leaderboards
+from k9.profiles import rebuild_profiles
+from k9.seasons import rebuild_seasons
+from k9.distributions import rebuild_distributions
+from k9.refresh import refresh_all
+from k9.changes import create_change_counter
+
+BATCH_SIZE = 50_000
+
+
+# --- NORMALISATION DES COLONNES TEXTE ---
+# Les résultats bruts mélangent virgules et points décimaux, '-' pour les éliminations, etc.
+# Ces expressions SQL sont partagées par le backfill et par les triggers (préfixe "NEW.").
+
+def _decimal(col):
+    """Nombre lu dans le texte, NULL si le texte n'est pas numérique ('-', '', 'DISQ', 'E'...).
+
+    Sans ce garde-fou, CAST('abc' AS REAL) vaut 0.0 : un passage illisible deviendrait sans faute.
+    """
+    text = f"REPLACE(TRIM({col}), ',', '.')"
+    return (f"(CASE WHEN LTRIM({text}, '+-') GLOB '[0-9]*' AND LTRIM({text}, '+-') NOT GLOB '*[^0-9.]*' "
+            f"THEN CAST({text} AS REAL) END)")
+
+
+def vitesse_num_sql(p=""):
+    """Vitesse en m/s, NULL si le couple est éliminé (vitesse '-', '', '0'...) ou illisible."""
+    return f"CASE WHEN {_decimal(p + 'vitesse')} > 0 THEN {_decimal(p + 'vitesse')} END"
+
+
+def temps_num_sql(p=""):
+    return f"CASE WHEN {_decimal(p + 'temps')} > 0 THEN {_decimal(p + 'temps')} END"
+
+
+def penalites_num_sql(p=""):
+    """Pénalités en points, NULL si non renseignées ('-', '' ou NULL) ou illisibles."""
+    return _decimal(p + "penalites")
+
+
+def is_eliminated_sql(p=""):
+    return f"CASE WHEN {_decimal(p + 'vitesse')} > 0 THEN 0 ELSE 1 END"
+
+
+def is_clean_sql(p=""):
+    """Sans faute : parcours terminé et pénalités nulles ou absentes ('-', '', NULL) ; illisibles : pas sans faute."""
+    col = p + "penalites"
+    return (f"CASE WHEN {_decimal(p + 'vitesse')} > 0 AND ({col} IS NULL OR TRIM({col}) IN ('-', '') "
+            f"OR {_decimal(col)} = 0) THEN 1 ELSE 0 END")
+
+
+TYPED_COLUMNS = {
+    "vitesse_num": ("REAL", vitesse_num_sql),
+    "penalites_num": ("REAL", penalites_num_sql),
+    "temps_num": ("REAL", temps_num_sql),
+    "is_eliminated": ("INTEGER", is_eliminated_sql),
+    "is_clean": ("INTEGER", is_clean_sql),
+}
+
+
+def _typed_assignments(p=""):
+    return ",\n    ".join(f"{name} = {expr(p)}" for name, (_, expr) in TYPED_COLUMNS.items())
+
+
+def table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def backfill(conn, table, assignments, batch_size=BATCH_SIZE, label="", where="1"):
+    """UPDATE par tranches de rowid (lignes vérifiant `where`), un commit par tranche pour ne pas bloquer les lecteurs."""
+    lo, hi = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {table}").fetchone()
+    if lo is None:
+        return
+    t0 = time.perf_counter()
+    for start in range(lo, hi + 1, batch_size):
+        conn.execute(f"UPDATE {table} SET {assignments} WHERE rowid BETWEEN ? AND ? AND ({where})",
+                     (start, start + batch_size - 1))
+        conn.commit()
+        done = min(start + batch_size - 1, hi) - lo + 1
+        print(f"  {label} {done:,}/{hi - lo + 1:,} lignes ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+
+
+# --- MIGRATIONS ---
+
+def _m001_colonnes_typees(conn):
+    """Colonnes numériques normalisées + drapeaux is_eliminated / is_clean, tenus à jour par triggers."""
+    existing = table_columns(conn, "resultats")
+    for name, (sql_type, _) in TYPED_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE resultats ADD COLUMN {name} {sql_type}")
+    conn.commit()
+
+    backfill(conn, "resultats", _typed_assignments(), label="resultats")
+    _create_typed_triggers(conn)
+
+
+def _create_typed_triggers(conn):
+    conn.executescript(f"""
+        DROP TRIGGER IF EXISTS resultats_typed_insert;
+        CREATE TRIGGER resultats_typed_insert AFTER INSERT ON resultats
+        BEGIN
+            UPDATE resultats SET
+    {_typed_assignments("NEW.")}
+            WHERE rowid = NEW.rowid;
+        END;
+
+        DROP TRIGGER IF EXISTS resultats_typed_update;
+        CREATE TRIGGER resultats_typed_update AFTER UPDATE OF vitesse, penalites, temps ON resultats
+        BEGIN
+            UPDATE resultats SET
+    {_typed_assignments("NEW.")}
+            WHERE rowid = NEW.rowid;
+        END;
+    """)
+
+
+def _m002_index(conn):
+    create_indexes(conn)
+
+
+def _m003_recherche(conn):
+    rebuild_search_index(conn)
+
+
+def _m004_kpis(conn):
+    rebuild_kpis(conn)
+
+
+def _m005_cube_regions(conn):
+    rebuild_region_cube(conn)
+
+
+def _m006_parcours_juges(conn):
+    rebuild_courses(conn)
+
+
+def _m007_rivalites(conn):
+    rebuild_rivalries(conn)
+
+
+def _m008_elo(conn):
+    rebuild_ratings(conn)
+
+
+def _m009_classements(conn):
+    rebuild_leaderboards(conn)
+
+
+def _m010_profils(conn):
+    rebuild_profiles(conn)
+
+
+def _m011_saisons(conn):
+    rebuild_seasons(conn)
+
+
+def _m012_distributions(conn):
+    rebuild_distributions(conn)
+
+
+def _m013_texte_non_numerique(conn):
+    """Texte non numérique -> NULL (et non 0.0) : triggers recréés, seules les lignes qui changent réécrites."""
+    _create_typed_triggers(conn)
+    differs = " OR ".join(f"{name} IS NOT ({expr()})" for name, (_, expr) in TYPED_COLUMNS.items())
+    before = conn.total_changes
+    backfill(conn, "resultats", _typed_assignments(), label="resultats", where=differs)
+    if conn.total_changes > before:
+        refresh_all(conn)      # Sans faute et catégories des tables dérivées
+
+
+def _m014_compteur_modifications(conn):
+    create_change_counter(conn)
+
+
+# (version, description, fonction) — ne jamais renuméroter une migration déjà livrée
+MIGRATIONS = [
+    (1, "colonnes typées vitesse/penalites/temps", _m001_colonnes_typees),
+    (2, "index de lecture (profil, versus, race, juge, région)", _m002_index),
+    (3, "index de recherche FTS5 des couples", _m003_recherche),
+    (4, "chiffres clés pré-calculés (HyperLogLog)", _m004_kpis),
+    (5, "cube région × année × grade × épreuve", _m005_cube_regions),
+    (6, "table des parcours par juge", _m006_parcours_juges),
+    (7, "bilans des confrontations directes", _m007_rivalites),
+    (8, "classement Elo des couples", _m008_elo),
+    (9, "classements par race, épreuve, grade et saison", _m009_classements),
+    (10, "résumé par couple pour la page profil", _m010_profils),
+    (11, "clé de date entière et catalogue des saisons", _m011_saisons),
+    (12, "distributions de vitesse et de pénalités (rangs percentiles)", _m012_distributions),
+    (13, "colonnes typées : texte non numérique lu comme NULL", _m013_texte_non_numerique),
+    (14, "compteur de modifications de resultats et liste_concours", _m014_compteur_modifications),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """Applique dans l'ordre les migrations manquantes ; renvoie la liste des versions appliquées."""
+    applied = []
+    current = schema_version(conn)
+    for version, description, func in MIGRATIONS:
+        if current < version <= target:
+            print(f"Migration {version} : {description}", file=sys.stderr)
+            func(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            applied.append(version)
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Met à jour le schéma de la base K9-Tracker.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    args = parser.parse_args(argv)
+
+    conn = open_readwrite(args.db_path)
+    try:
+        applied = migrate(conn)
+    finally:
+        conn.close()
+    if applied:
+        print(f"✅ Base à jour (version {SCHEMA_VERSION}).")
+    else:
+        print(f"Rien à faire, la base est déjà en version {SCHEMA_VERSION}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Classement des passages et vainqueurs des duels, calculés sur des colonnes entières (NumPy/pandas).
+
+Une seule définition partagée par "Recherche Profil" (camembert de précision) et
+"Mode Versus" (feuille de match), au lieu de deux boucles ligne à ligne.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ["Sans Faute", "Excellent", "Très Bon", "Bon", "Eliminé"]
+
+# Codes de la colonne Vainqueur_Code : 0 = égalité (ou double élimination), 1 = rouge, 2 = bleu
+EGALITE, VAINQUEUR_1, VAINQUEUR_2 = 0, 1, 2
+
+
+def to_number(values):
+    """Texte brut ('4,52', '-', '', None...) ou colonne déjà typée -> float64, NaN si illisible."""
+    s = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(s):
+        s = pd.to_numeric(s.astype("string").str.strip().str.replace(",", ".", regex=False), errors="coerce")
+    return s.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def speeds(values):
+    """Vitesses en m/s, NaN pour un couple éliminé (vitesse absente, '-' ou nulle)."""
+    v = to_number(values)
+    return np.where(v > 0, v, np.nan)
+
+
+def penalties(values):
+    """Pénalités en points, NaN si non renseignées."""
+    return to_number(values)
+
+
+def classify(speed, penalty):
+    """Catégorie de chaque passage : Sans Faute / Excellent / Très Bon / Bon / Eliminé.
+
+    `speed` et `penalty` viennent de speeds() / penalties() ; une pénalité absente compte pour 0.
+    """
+    eliminated = np.isnan(speed)
+    pen = np.nan_to_num(penalty, nan=0.0)
+    codes = np.select(
+        [eliminated, pen == 0, pen <= 5, pen <= 10],
+        [4, 0, 1, 2],
+        default=3,
+    )
+    return pd.Categorical.from_codes(codes, categories=CATEGORIES)
+
+
+def category_code_sql(alias="r"):
+    """Même règle que classify(), en SQL : code = position dans CATEGORIES.
+
+    Sans faute selon is_clean : des pénalités illisibles (penalites_num NULL, texte non vide)
+    ne comptent pas pour 0.
+    """
+    return f"""CASE
+        WHEN {alias}.vitesse_num IS NULL THEN 4
+        WHEN {alias}.is_clean = 1 THEN 0
+        WHEN {alias}.penalites_num <= 5 THEN 1
+        WHEN {alias}.penalites_num <= 10 THEN 2
+        ELSE 3 END"""
+
+
+def category_counts(speed, penalty):
+    """Nombre de passages par catégorie, dans l'ordre de CATEGORIES (zéros compris)."""
+    counts = np.bincount(classify(speed, penalty).codes, minlength=len(CATEGORIES))
+    return pd.Series(counts, index=CATEGORIES)
+
+
+def duel_winners(speed_1, penalty_1, speed_2, penalty_2):
+    """Vainqueur de chaque confrontation : moins de pénalités, puis vitesse la plus haute.
+
+    Un couple éliminé perd contre un couple classé ; deux éliminés font match nul.
+    """
+    eli_1, eli_2 = np.isnan(speed_1), np.isnan(speed_2)
+    pen_1, pen_2 = np.nan_to_num(penalty_1, nan=0.0), np.nan_to_num(penalty_2, nan=0.0)
+    spd_1, spd_2 = np.nan_to_num(speed_1, nan=0.0), np.nan_to_num(speed_2, nan=0.0)
+    return np.select(
+        [eli_1 & eli_2, eli_1, eli_2, pen_1 < pen_2, pen_2 < pen_1, spd_1 > spd_2, spd_2 > spd_1],
+        [EGALITE, VAINQUEUR_2, VAINQUEUR_1, VAINQUEUR_1, VAINQUEUR_2, VAINQUEUR_1, VAINQUEUR_2],
+        default=EGALITE,
+    )
+
+
+def duel_winner_sql(a="r1", b="r2"):
+    """Même règle que duel_winners(), en SQL sur les colonnes typées des alias `a` et `b`."""
+    pa, pb = f"COALESCE({a}.penalites_num, 0)", f"COALESCE({b}.penalites_num, 0)"
+    return f"""CASE
+        WHEN {a}.vitesse_num IS NULL AND {b}.vitesse_num IS NULL THEN {EGALITE}
+        WHEN {a}.vitesse_num IS NULL THEN {VAINQUEUR_2}
+        WHEN {b}.vitesse_num IS NULL THEN {VAINQUEUR_1}
+        WHEN {pa} < {pb} THEN {VAINQUEUR_1}
+        WHEN {pb} < {pa} THEN {VAINQUEUR_2}
+        WHEN {a}.vitesse_num > {b}.vitesse_num THEN {VAINQUEUR_1}
+        WHEN {b}.vitesse_num > {a}.vitesse_num THEN {VAINQUEUR_2}
+        ELSE {EGALITE} END"""
+
+
+def duel_summary(speed_1, penalty_1, speed_2, penalty_2):
+    """Scores et moyennes en confrontation directe pour les deux couples."""
+    winners = duel_winners(speed_1, penalty_1, speed_2, penalty_2)
+    n = len(winners)
+
+    def side(speed, penalty):
+        return {
+            "vitesse_moy": float(np.nanmean(speed)) if np.isfinite(speed).any() else 0.0,
+            "penalites_moy": float(np.nanmean(penalty)) if np.isfinite(penalty).any() else 0.0,
+            "pct_elimination": float(np.isnan(speed).sum() / n * 100) if n else 0.0,
+        }
+
+    return {
+        "vainqueurs": winners,
+        "score_1": int((winners == VAINQUEUR_1).sum()),
+        "score_2": int((winners == VAINQUEUR_2).sum()),
+        "couple_1": side(speed_1, penalty_1),
+        "couple_2": side(speed_2, penalty_2),
+    }
@@ -0,0 +1,26 @@
+"""Registre des pages de l'application.
+
+Chaque page est un module exposant render(), importé seulement à sa première ouverture :
+un nouveau worker ne charge que les dépendances de la page demandée.
+"""
+import importlib
+
+from k9.startup import stage
+
+# Libellé du menu -> module de k9.pages (l'ordre est celui du menu)
+PAGES = {
+    "🏠 Tableau de Bord": "dashboard",
+    "🔍 Recherche Profil": "profile",
+    "🏆 Top 10 par Race": "top10",
+    "📊 Statistiques Régionales": "regions",
+    "👨‍⚖️ Analyse des Juges": "judges",
+    "⚔️ Mode Versus": "versus",
+}
+
+
+def render(label):
+    name = PAGES[label]
+    with stage(f"import page {name}"):
+        module = importlib.import_module(f"{__name__}.{name}")
+    with stage(f"rendu page {name}"):
+        module.render()
@@ -0,0 +1,71 @@
+"""Page "Tableau de Bord" : chiffres clés, derniers concours et races les plus actives."""
+import streamlit as st
+
+from k9.analytics import DASHBOARD_RECENTS_SQL, TOP_RACES_SQL, top_races as snapshot_top_races
+from k9.kpis import DASHBOARD_KPIS_SQL, STANDARD_ERROR
+from k9.snapshot import get_snapshot
+from k9.ui import load_many
+
+
+def render():
+    st.title("🐾 Bienvenue sur K9-Tracker")
+    
+    st.markdown("""
+    ### L'encyclopédie vivante de l'Agility
+    Explorez la plus grande base de données de résultats d'agility en France. **K9-Tracker** centralise les données 
+    pour offrir une vision statistique globale.
+    """)
+    st.markdown("---")
+
+    # Les requêtes de la page sont indépendantes : un seul lot, exécuté en parallèle (k9.ui.load_many)
+    requetes = {"kpis": (DASHBOARD_KPIS_SQL, ()), "recents": (DASHBOARD_RECENTS_SQL, ())}
+    snapshot = get_snapshot()
+    if snapshot is None:
+        requetes["top_races"] = (TOP_RACES_SQL, ())
+    resultats = load_many(requetes, label="tableau de bord", shared=True)
+
+    # 1. CHIFFRES CLÉS (Les infos "sympas")
+    # Pré-calculés à l'ingestion (k9.kpis) : chiens et conducteurs sont des estimations HyperLogLog
+    stats = resultats["kpis"]
+    aide_estimation = f"Estimation (erreur type ± {STANDARD_ERROR * 100:.1f} %)"
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Parcours analysés", f"{int(stats['total_lignes'][0]):,}".replace(',', ' '))
+    col2.metric("Concours", f"{int(stats['total_concours'][0]):,}".replace(',', ' '))
+    col3.metric("Chiens suivis", f"{int(stats['total_chiens'][0]):,}".replace(',', ' '), help=aide_estimation)
+    col4.metric("Conducteurs", f"{int(stats['total_conducteurs'][0]):,}".replace(',', ' '), help=aide_estimation)
+
+    st.markdown("---")
+
+    # 2. LES 10 DERNIERS CONCOURS (Division par 3 et Tri chronologique)
+    st.subheader("🗓️ Derniers événements intégrés")
+    
+    df_recents = resultats["recents"]
+    if not df_recents.empty:
+        st.table(df_recents)
+
+    # 3. GRAPHIQUE DES RACES (Version Altair Ultra-Précise)
+    st.markdown("---")
+    st.subheader("🐕 Top 10 des races les plus actives")
+    
+    top_races = snapshot_top_races() if snapshot is not None else resultats["top_races"]
+    
+    if not top_races.empty:
+        import altair as alt  # chargé seulement quand un graphique est dessiné
+        # Création du graphique Altair avec affichage complet des noms
+        chart = alt.Chart(top_races).mark_bar(color="#ff4b4b").encode(
+            x=alt.X("nb:Q", title="Nombre de parcours"),
+            y=alt.Y(
+                "race:N", 
+                sort="-x", 
+                title="Race",
+                axis=alt.Axis(labelLimit=300) # <-- Augmente la limite de pixels pour le texte
+            ),
+            tooltip=["race", "nb"]
+        ).properties(
+            height=400
+        ).configure_axis(
+            labelFontSize=12 # Optionnel : ajuste la taille de la police si besoin
+        )
+        
+        st.altair_chart(chart, use_container_width=True)
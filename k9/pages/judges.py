@@ -0,0 +1,102 @@
+"""Page "Analyse des Juges" : sévérité et vitesse des parcours par juge."""
+import streamlit as st
+
+from k9.analytics import judge_stats
+from k9.courses import JUDGE_COURSES_SCHEMA, judge_courses_query
+from k9.dimensions import grade_from_label
+from k9.ui import load_data
+
+
+def render():
+    st.title("⚖️ Analyse des Juges")
+    st.markdown("Découvrez le profil des juges : qui dessine les parcours les plus fluides ? Qui pose les plus grands défis techniques ?")
+
+    # 1. FILTRE PAR GRADE (Nouveauté)
+    st.sidebar.markdown("---") # Petit séparateur visuel dans la barre latérale si besoin, ou juste ici en haut de page
+    
+    col_filter, col_vide = st.columns([1, 2])
+    with col_filter:
+        choix_grade_juge = st.selectbox(
+            "🏆 Filtrer par Niveau :", 
+            ["Tous les grades", "Grade 1", "Grade 2", "Grade 3"]
+        )
+
+    # 2. REQUÊTE PRINCIPALE (k9.analytics) : instantané en colonnes s'il a été exporté, sinon
+    # agrégat des parcours pré-calculés (k9.courses), une ligne par épreuve jugée
+    grade_juge = grade_from_label(choix_grade_juge)
+    df_juges = judge_stats(grade=grade_juge, min_parcours=30, load=load_data)
+
+    if not df_juges.empty:
+        # Calculs des pourcentages et arrondis
+        df_juges['Taux_Reussite (%)'] = (df_juges['Sans_Faute'] / df_juges['Total_Parcours'] * 100).round(1)
+        df_juges['Taux_Elimination (%)'] = (df_juges['Elimines'] / df_juges['Total_Parcours'] * 100).round(1)
+        df_juges['Vitesse_Moyenne'] = df_juges['Vitesse_Moyenne'].round(2)
+        df_juges['Distance_Moyenne'] = df_juges['Distance_Moyenne'].round(0)
+
+        # --- PARTIE 1 : LE CLASSEMENT COMPLET (SCROLLABLE) ---
+        st.header(f"🏆 Palmarès ({choix_grade_juge})")
+        
+        critere = st.selectbox("Trier le classement par :", [
+            "Volume : Plus grand nombre de parcours jugés",
+            "Vitesse : Vitesse moyenne la plus haute",
+            "Réussite : Plus haut taux de réussite (Sans Faute)",
+            "Distance : Parcours les plus longs (Distance moyenne)"
+        ])
+
+        if "Volume" in critere:
+            col_tri = "Total_Parcours"
+            couleur_barre = "#8e44ad"
+        elif "Vitesse" in critere:
+            col_tri = "Vitesse_Moyenne"
+            couleur_barre = "#3498db"
+        elif "Réussite" in critere:
+            col_tri = "Taux_Reussite (%)"
+            couleur_barre = "#2ecc71"
+        else:
+            col_tri = "Distance_Moyenne"
+            couleur_barre = "#e67e22"
+
+        classement_juges = df_juges.sort_values(by=col_tri, ascending=False)
+        hauteur_graphique = max(400, len(classement_juges) * 35)
+
+        import altair as alt  # chargé seulement quand un graphique est dessiné
+        chart_juges = alt.Chart(classement_juges).mark_bar(color=couleur_barre, cornerRadiusEnd=4).encode(
+            x=alt.X(f"{col_tri}:Q", title=critere.split(":")[0], scale=alt.Scale(zero=False)),
+            y=alt.Y("Juge:N", sort="-x", title="Nom du Juge", axis=alt.Axis(labelLimit=300)),
+            tooltip=["Juge", "Total_Parcours", "Vitesse_Moyenne", "Distance_Moyenne", "Taux_Reussite (%)", "Taux_Elimination (%)"]
+        ).properties(height=hauteur_graphique)
+        
+        text_top = chart_juges.mark_text(align='left', baseline='middle', dx=3).encode(text=f'{col_tri}:Q')
+        
+        with st.container(height=500, border=True):
+            st.altair_chart(chart_juges + text_top, use_container_width=True)
+
+        st.markdown("---")
+
+        # --- PARTIE 2 : RECHERCHE INDIVIDUELLE ---
+        st.header("🔍 Profil détaillé d'un juge")
+        
+        liste_noms_juges = df_juges.sort_values(by="Juge")['Juge'].tolist()
+        choix_juge_recherche = st.selectbox("Rechercher un juge spécifique :", ["--- Choisir un juge ---"] + liste_noms_juges)
+
+        if choix_juge_recherche != "--- Choisir un juge ---":
+            stats_du_juge = df_juges[df_juges['Juge'] == choix_juge_recherche].iloc[0]
+
+            st.subheader(f"Statistiques pour {choix_juge_recherche} ({choix_grade_juge})")
+            
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Parcours Jugés", f"{int(stats_du_juge['Total_Parcours']):,}".replace(',', ' '))
+            c2.metric("Vitesse Moyenne", f"{stats_du_juge['Vitesse_Moyenne']} m/s")
+            c3.metric("Distance Moyenne", f"{stats_du_juge['Distance_Moyenne']} m")
+            c4.metric("Taux d'Élimination", f"{stats_du_juge['Taux_Elimination (%)']}%", 
+                      help=f"Taux de réussite (Sans Faute) : {stats_du_juge['Taux_Reussite (%)']}%")
+
+            # Détail parcours par parcours (une ligne par épreuve jugée)
+            st.markdown(f"**📐 {int(stats_du_juge['Nb_Epreuves'])} épreuves jugées**")
+            df_parcours_juge = load_data(*judge_courses_query(choix_juge_recherche, grade=grade_juge), shared=True,
+                                         schema=JUDGE_COURSES_SCHEMA)
+            st.dataframe(df_parcours_juge, use_container_width=True, hide_index=True,
+                         column_config={"Date": st.column_config.DateColumn(format="DD/MM/YYYY")})
+
+    else:
+        st.warning(f"Aucune donnée disponible pour le filtre : {choix_grade_juge}. Essayez un autre grade.")
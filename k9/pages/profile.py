@@ -0,0 +1,206 @@
+"""Page "Recherche Profil" : statistiques, graphiques et historique d'un couple."""
+import pandas as pd
+import streamlit as st
+
+from k9.analytics import PERCENTILE_DIMENSIONS, percentiles
+from k9.history import CURSOR_COLUMNS, HISTORY_SCHEMA, history_page_query
+from k9.profiles import (profile_summary_query, profile_years, filter_summary,
+                         profile_kpis, monthly_speed, category_histogram)
+from k9.search import search_query
+from k9.ui import load_data, paginate
+
+
+def render():
+    st.title("🔎 Recherche & Analyses")
+
+    # 1. BARRE DE RECHERCHE LARGE
+    search_text = st.text_input("Rechercher un chien ou un conducteur", placeholder="Ex: Pixi...")
+
+    if search_text.strip():
+        # On récupère l'id_couple en plus des infos d'affichage
+        search_results = load_data(*search_query(search_text, limit=50))
+
+        if not search_results.empty:
+            # On stocke l'id_couple de manière invisible dans la liste via un dictionnaire
+            options_dict = {f"{row['nom_chien']} ({row['conducteur']} - {row['race']})": row['id_couple'] for _, row in search_results.iterrows()}
+            options_list = list(options_dict.keys())
+            
+            selection = st.selectbox("🎯 Résultats trouvés, choisissez le profil à analyser :", ["--- Choisir un profil ---"] + options_list)
+            
+            if selection != "--- Choisir un profil ---":
+                # On récupère l'id_couple correspondant à la sélection
+                selected_id_couple = options_dict[selection]
+                
+                # On extrait les noms juste pour l'affichage du titre
+                selected_dog = selection.split(" (")[0]
+                selected_conducteur = selection.split(" (")[1].split(" - ")[0]
+                
+                st.markdown("---")
+                st.header(f"📊 Statistiques du couple {selected_dog} & {selected_conducteur}")
+
+                # Résumé complet du couple en une seule lecture (k9.profiles) ; les filtres se font en mémoire
+                df_profil = load_data(*profile_summary_query(selected_id_couple))
+
+                annees_chien = profile_years(df_profil) if not df_profil.empty else ["2026"]
+
+                # 2. MÉTRIQUES : TAUX DE RÉUSSITE ET ÉLIMINATIONS
+
+                st.markdown("---")
+                col_filtre1, col_filtre2 = st.columns(2)
+                
+                with col_filtre1:
+                    choix_annee_stats = st.selectbox("📅 Année pour les statistiques :", annees_chien)
+                with col_filtre2:
+                    choix_epreuve = st.radio("🏃 Type d'épreuve :", ["Toutes", "Agility", "Jumping"], horizontal=True)
+
+                # Préparation de la variable SQL pour le filtre d'épreuve
+                like_epreuve = "%" if choix_epreuve == "Toutes" else f"%{choix_epreuve}%"
+
+                profil_annee = filter_summary(df_profil, choix_annee_stats,
+                                              None if choix_epreuve == "Toutes" else choix_epreuve)
+
+                # 2. MÉTRIQUES : TAUX DE RÉUSSITE ET ÉLIMINATIONS
+                stats_perf = profile_kpis(profil_annee)
+
+                col1, col2, col3 = st.columns(3)
+                total_runs = stats_perf['total']
+                
+                if total_runs > 0:
+                    nb_sans_faute = stats_perf['sans_faute']
+                    nb_elimines = stats_perf['elimines']
+                    reussite = (nb_sans_faute / total_runs) * 100
+                    taux_elim = (nb_elimines / total_runs) * 100
+                    
+                    col1.metric(f"Taux de Réussite", f"{reussite:.1f}%", help=f"{nb_sans_faute} parcours Sans Faute")
+                    col2.metric(f"Taux d'Élimination", f"{taux_elim:.1f}%", help=f"{nb_elimines} éliminations")
+                else:
+                    col1.metric("Taux de Réussite", "0.0%")
+                    col2.metric("Taux d'Élimination", "0.0%")
+                    
+                col3.metric("Parcours effectués", total_runs)
+
+                # 3. GRAPHIQUES : Vitesse et Répartition des fautes
+                st.markdown("---")
+                col_chart1, col_chart2 = st.columns(2)
+                import altair as alt  # chargé seulement quand un graphique est dessiné
+
+                # --- A. Histogramme + Courbe (Vitesse) ---
+                with col_chart1:
+                    st.subheader(f"📈 Évolution de la vitesse ({choix_epreuve})")
+                    df_vitesse = monthly_speed(profil_annee)
+
+                    if not df_vitesse.empty:
+                        mois_noms = {"01":"Jan", "02":"Fév", "03":"Mar", "04":"Avr", "05":"Mai", "06":"Juin", 
+                                     "07":"Juil", "08":"Août", "09":"Sept", "10":"Oct", "11":"Nov", "12":"Déc"}
+                        df_vitesse['mois_nom'] = df_vitesse['mois'].map(mois_noms)
+
+                        bars = alt.Chart(df_vitesse).mark_bar(color="#ff4b4b", opacity=0.4).encode(
+                            x=alt.X("mois_nom:N", sort=list(mois_noms.values()), title="Mois"),
+                            y=alt.Y("moyenne_vit:Q", title="Vitesse (m/s)")
+                        )
+                        line = alt.Chart(df_vitesse).mark_line(color="#1f77b4", size=3).encode(
+                            x=alt.X("mois_nom:N", sort=list(mois_noms.values())),
+                            y=alt.Y("moyenne_vit:Q")
+                        )
+                        st.altair_chart(bars + line, use_container_width=True)
+
+                # --- B. Camembert : Répartition des fautes ---
+                with col_chart2:
+                    st.subheader(f"🎯 Précision des parcours ({choix_epreuve})")
+
+
+                    if total_runs > 0:
+                        # Histogramme des catégories pré-calculé (même règle que k9.outcomes.classify)
+                        nb_par_categorie = category_histogram(profil_annee)
+                        df_plot = nb_par_categorie.rename_axis('Categorie').reset_index(name='Nb')
+
+                        total = df_plot['Nb'].sum()
+                        df_plot['Taux'] = (df_plot['Nb'] / total * 100).round(1)
+                        
+                        df_plot['Label_Legend'] = df_plot.apply(
+                            lambda x: f"{x['Categorie']} ({x['Taux']:.1f}%)" if x['Nb'] > 0 else x['Categorie'], 
+                            axis=1
+                        )
+
+                        chart = alt.Chart(df_plot).mark_arc(innerRadius=60).encode(
+                            theta=alt.Theta(field="Nb", type="quantitative"),
+                            color=alt.Color(field="Label_Legend", type="nominal", 
+                                scale=alt.Scale(
+                                    domain=df_plot['Label_Legend'].tolist(),
+                                    range=['#2ecc71', '#98e690', '#f1c40f', '#e67e22', '#95a5a6']
+                                ),
+                                legend=alt.Legend(title="Qualification")
+                            ),
+                            tooltip=[
+                                alt.Tooltip('Categorie', title='Résultat'),
+                                alt.Tooltip('Nb', title='Nombre'),
+                                alt.Tooltip('Taux', title='Taux (%)', format='.1f')
+                            ]
+                        ).properties(height=300)
+
+                        st.altair_chart(chart, use_container_width=True)
+                        st.write(f"📊 Analyse basée sur **{total}** parcours au total.")
+                    else:
+                        st.info("Aucune donnée pour ce type d'épreuve.")
+
+                # 4. RANGS PERCENTILES : histogrammes pré-calculés (k9.distributions), lecture en temps constant
+                st.markdown("---")
+                st.subheader(f"📐 Rang percentile ({choix_annee_stats}, toutes épreuves)")
+                rangs = percentiles(selected_id_couple, choix_annee_stats, load=load_data)
+
+                if rangs is not None and rangs["vitesse_couple"] is not None:
+                    st.caption(f"Chacun des {rangs['parcours_couple']} parcours chronométrés du couple est classé parmi "
+                               "les parcours de la population ; on retient son rang médian.")
+                    cols_rang = st.columns(len(rangs["rangs"]))
+                    for col, rang in zip(cols_rang, rangs["rangs"]):
+                        libelle = PERCENTILE_DIMENSIONS[rang["dimension"]]
+                        if rang["valeur"]:
+                            libelle += f" {rang['valeur']}"
+                        if rang["vitesse"] is None:
+                            col.metric(libelle, "—")
+                            continue
+                        aide = f"Parcours médian du couple ({rangs['vitesse_couple']:.2f} m/s) : plus rapide que " \
+                               f"{rang['vitesse']:.0f} % des {rang['parcours']} parcours (médiane {rang['vitesse_mediane']:.2f} m/s)"
+                        if rang["penalites"] is not None:
+                            aide += f" ; moins pénalisé que {rang['penalites']:.0f} % des parcours"
+                        col.metric(libelle, f"Top {max(100 - rang['vitesse'], 1):.0f} %", help=aide)
+
+                    choix_population = st.radio(
+                        "Comparer à :", [d for d in PERCENTILE_DIMENSIONS if d in rangs["histogrammes"].get("vitesse", {})],
+                        format_func=PERCENTILE_DIMENSIONS.get, horizontal=True)
+                    col_dist1, col_dist2 = st.columns(2)
+                    for col, mesure, titre, valeur in (
+                            (col_dist1, "vitesse", "Vitesse (m/s)", rangs["vitesse_couple"]),
+                            (col_dist2, "penalites", "Pénalités", rangs["penalites_couple"])):
+                        histogramme = rangs["histogrammes"].get(mesure, {}).get(choix_population)
+                        if histogramme is None or valeur is None:
+                            continue
+                        barres = alt.Chart(histogramme.frame()).mark_bar(color="#1f77b4", opacity=0.6).encode(
+                            x=alt.X("debut:Q", bin="binned", title=titre),
+                            x2="fin:Q",
+                            y=alt.Y("nb:Q", title="Parcours"),
+                        )
+                        repere = alt.Chart(pd.DataFrame({"valeur": [valeur]})).mark_rule(color="#ff4b4b", size=3).encode(
+                            x="valeur:Q")
+                        col.altair_chart(barres + repere, use_container_width=True)
+                else:
+                    st.info("Pas de parcours chronométré cette saison.")
+
+
+                # 5. TABLEAU HISTORIQUE FILTRABLE
+                st.markdown("---")
+                st.subheader("📋 Historique des concours")
+                choix_annee_tab = st.selectbox("Filtrer le tableau par année :", ["Toutes"] + annees_chien)
+
+                # Pagination par clé (date_key, rowid) : une page à la fois, quelle que soit la carrière
+                annee_hist = None if choix_annee_tab == "Toutes" else choix_annee_tab
+                df_hist = paginate(
+                    f"historique_{selected_id_couple}_{choix_epreuve}_{choix_annee_tab}",
+                    lambda cursor, limit: history_page_query(selected_id_couple, like_epreuve, annee_hist, cursor, limit),
+                    schema=HISTORY_SCHEMA,
+                )
+                st.dataframe(df_hist.drop(columns=CURSOR_COLUMNS, errors="ignore"), use_container_width=True, hide_index=True,
+                             column_config={"Date": st.column_config.DateColumn(format="DD/MM/YYYY")})
+                
+        else:
+            st.warning(f"Aucun résultat trouvé pour '{search_text}'.")
@@ -0,0 +1,79 @@
+"""Page "Statistiques Régionales" : vitesse et réussite par région."""
+import streamlit as st
+
+from k9.analytics import region_stats
+from k9.dimensions import grade_from_label
+from k9.seasons import seasons_query
+from k9.ui import load_data
+
+
+def render():
+    st.title("📍 Comparatif National par Région")
+    st.markdown("Découvrez quelles régions françaises ont les parcours les plus rapides et les meilleurs taux de réussite.")
+
+    # 1. FILTRES DE RECHERCHE
+    col_f1, col_f2 = st.columns(2)
+    with col_f1:
+        # On extrait les années disponibles dans la base
+        annees_db = load_data(*seasons_query())
+        liste_annees = ["Toutes"] + annees_db['annee'].dropna().tolist() if not annees_db.empty else ["Toutes"]
+        choix_annee_reg = st.selectbox("📅 Année :", liste_annees)
+        
+    with col_f2:
+        choix_grade = st.selectbox("🏆 Niveau (Grade) :", ["Tous les grades", "Grade 1", "Grade 2", "Grade 3"])
+
+    # Instantané en colonnes (k9.snapshot) s'il a été exporté, sinon lecture du cube
+    # pré-agrégé (k9.regions) : même résultat que l'agrégation sur resultats (k9.analytics)
+    df_stats = region_stats(
+        annee=None if choix_annee_reg == "Toutes" else choix_annee_reg,
+        grade=grade_from_label(choix_grade),
+        min_parcours=50,
+        load=load_data,
+    )
+
+    if not df_stats.empty:
+        import altair as alt  # chargé seulement quand un graphique est dessiné
+        # Calcul du Taux de Réussite en Python
+        df_stats['Taux_Reussite'] = (df_stats['Sans_Faute'] / df_stats['Total_Parcours'] * 100).round(1)
+        df_stats['Vitesse_Moyenne'] = df_stats['Vitesse_Moyenne'].round(2)
+
+        st.markdown("---")
+        
+        # 1. On calcule une hauteur dynamique pour que chaque barre respire (ex: 35 pixels par région)
+        hauteur_graphique = max(400, len(df_stats) * 35)
+
+        col_c1, col_c2 = st.columns(2)
+
+        # GRAPHIQUE 1 : Vitesse Moyenne
+        with col_c1:
+            st.subheader("⚡ Palmarès de la Vitesse (m/s)")
+            
+            # On crée une "fenêtre" de 500px de haut avec une bordure
+            with st.container(height=500, border=True):
+                chart_vitesse = alt.Chart(df_stats).mark_bar(color="#3498db", cornerRadiusEnd=4).encode(
+                    x=alt.X("Vitesse_Moyenne:Q", title="Vitesse Moyenne (m/s)", scale=alt.Scale(zero=False)),
+                    y=alt.Y("Region:N", sort="-x", title="Région", axis=alt.Axis(labelLimit=500)),
+                    tooltip=["Region", "Vitesse_Moyenne", "Total_Parcours"]
+                ).properties(height=hauteur_graphique) # On applique la grande hauteur au graphique
+                
+                text_vitesse = chart_vitesse.mark_text(align='left', baseline='middle', dx=3).encode(text='Vitesse_Moyenne:Q')
+                st.altair_chart(chart_vitesse + text_vitesse, use_container_width=True)
+
+        # GRAPHIQUE 2 : Taux de Réussite
+        with col_c2:
+            st.subheader("🎯 Taux de Réussite (%)")
+            
+            # Pareil ici, une fenêtre de 500px
+            with st.container(height=500, border=True):
+                chart_reussite = alt.Chart(df_stats).mark_bar(color="#2ecc71", cornerRadiusEnd=4).encode(
+                    x=alt.X("Taux_Reussite:Q", title="Taux de Réussite (%)"),
+                    y=alt.Y("Region:N", sort="-x", title="", axis=alt.Axis(labelLimit=500)),
+                    tooltip=["Region", "Taux_Reussite", "Total_Parcours"]
+                ).properties(height=hauteur_graphique)
+                
+                text_reussite = chart_reussite.mark_text(align='left', baseline='middle', dx=3).encode(text='Taux_Reussite:Q')
+                st.altair_chart(chart_reussite + text_reussite, use_container_width=True)
+
+        st.info("💡 Note : Les régions ayant enregistré moins de 50 parcours selon vos filtres sont masquées pour garantir la pertinence des moyennes. Vous pouvez faire défiler les graphiques vers le bas.")
+    else:
+        st.warning("Aucune donnée suffisante pour ces critères.")
@@ -0,0 +1,39 @@
+"""Page "Top 10 par Race" : classements pré-calculés par saison, épreuve et grade."""
+import streamlit as st
+
+from k9.analytics import RACES_SQL
+from k9.dimensions import grade_from_label
+from k9.leaderboards import leaderboard_query
+from k9.seasons import seasons_query
+from k9.ui import load_data
+
+
+def render():
+    st.title("🏆 Hall of Fame par Race")
+    races = load_data(RACES_SQL)
+    choix_race = st.selectbox("Sélectionnez une race", races)
+
+    col_t1, col_t2, col_t3 = st.columns(3)
+    with col_t1:
+        annees_top = load_data(*seasons_query())
+        choix_annee_top = st.selectbox("📅 Saison :", ["Toutes"] + annees_top['annee'].dropna().tolist() if not annees_top.empty else ["Toutes"])
+    with col_t2:
+        choix_epreuve_top = st.selectbox("🏃 Épreuve :", ["Toutes", "Agility", "Jumping"])
+    with col_t3:
+        choix_grade_top = st.selectbox("🏆 Niveau (Grade) :", ["Tous les grades", "Grade 1", "Grade 2", "Grade 3"])
+    
+    if choix_race:
+        # Classements pré-calculés (k9.leaderboards) : meilleur sans-faute de chaque couple
+        top_dogs = load_data(*leaderboard_query(
+            choix_race,
+            type_epreuve=None if choix_epreuve_top == "Toutes" else choix_epreuve_top,
+            grade=grade_from_label(choix_grade_top),
+            annee=None if choix_annee_top == "Toutes" else choix_annee_top,
+            limit=10,
+        ))
+        
+        if not top_dogs.empty:
+            st.subheader(f"Les 10 {choix_race} les plus rapides ⚡ (Sans-faute)")
+            st.table(top_dogs)
+        else:
+            st.warning(f"Aucun 'sans-faute' détecté pour {choix_race}.")
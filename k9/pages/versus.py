@@ -0,0 +1,162 @@
+"""Page "Mode Versus" : comparatif et confrontations directes entre deux couples."""
+import pandas as pd
+import streamlit as st
+
+from k9.analytics import VERSUS_GLOBAL_SQL, global_stats, head_to_head
+from k9.history import DUEL_PAGE_SCHEMA, duel_averages_query, duel_page_query, duel_sheet_html
+from k9.rivalries import head_to_head_query, top_rivals_query
+from k9.search import search_query
+from k9.ui import load_data, load_many, paginate
+
+
+def render():
+    st.title("⚔️ L'Arène des Champions")
+    st.markdown("Comparez deux binômes et découvrez qui domine l'autre lors des confrontations directes !")
+
+    # --- SÉLECTION DES COMBATTANTS (Par Recherche Texte) ---
+    st.subheader("🔍 Sélection des Challengers")
+    
+    col_sel1, col_sel2 = st.columns(2)
+    
+    # --- CHALLENGER 1 ---
+    with col_sel1:
+        st.markdown("🟥 **Challenger ROUGE**")
+        search_1 = st.text_input("Nom du chien 1 :", placeholder="Tapez un nom...", key="s1")
+        
+        id_1 = None
+        nom_1 = "Inconnu"
+        
+        if search_1:
+            res_1 = load_data(*search_query(search_1, limit=20))
+            
+            if not res_1.empty:
+                opts_1 = {f"{row['nom_chien']} ({row['conducteur']})": row['id_couple'] for _, row in res_1.iterrows()}
+                choix_1 = st.selectbox("Choisir le profil précis :", list(opts_1.keys()), key="box1")
+                id_1 = opts_1[choix_1]
+                nom_1 = choix_1.split(" (")[0]
+            else:
+                st.warning("Aucun profil trouvé.")
+
+    # --- CHALLENGER 2 ---
+    with col_sel2:
+        st.markdown("🟦 **Challenger BLEU**")
+        search_2 = st.text_input("Nom du chien 2 :", placeholder="Tapez un nom...", key="s2")
+        
+        id_2 = None
+        nom_2 = "Inconnu"
+        
+        if search_2:
+            res_2 = load_data(*search_query(search_2, limit=20))
+            
+            if not res_2.empty:
+                opts_2 = {f"{row['nom_chien']} ({row['conducteur']})": row['id_couple'] for _, row in res_2.iterrows()}
+                choix_2 = st.selectbox("Choisir le profil précis :", list(opts_2.keys()), key="box2")
+                id_2 = opts_2[choix_2]
+                nom_2 = choix_2.split(" (")[0]
+            else:
+                st.warning("Aucun profil trouvé.")
+
+    st.markdown("---")
+
+    # UN SEUL CHALLENGER : suggestions d'adversaires (bilans pré-calculés, k9.rivalries)
+    if id_1 and not id_2:
+        df_rivaux = load_data(*top_rivals_query(id_1, limit=5))
+        if not df_rivaux.empty:
+            st.subheader(f"🔥 Rivaux habituels de {nom_1}")
+            st.dataframe(df_rivaux.drop(columns=["id_couple"]), use_container_width=True, hide_index=True)
+
+    # SI LES DEUX SONT SÉLECTIONNÉS
+    if id_1 and id_2 and id_1 != id_2:
+        
+        # --- PARTIE A : COMPARATIF GLOBAL ---
+        st.header(f"📊 {nom_1} vs {nom_2}")
+
+        # Bilans des deux couples, score pré-calculé (k9.rivalries) et moyennes des duels :
+        # indépendants, lancés en parallèle (k9.ui.load_many)
+        resultats = load_many({
+            "global_1": (VERSUS_GLOBAL_SQL, (id_1,)),
+            "global_2": (VERSUS_GLOBAL_SQL, (id_2,)),
+            "bilan": head_to_head_query(id_1, id_2),
+            "moyennes": duel_averages_query(id_1, id_2),
+        }, label="versus")
+
+        # Calcul sécurisé des stats (k9.analytics, partagé avec l'API)
+        stats_1 = global_stats(resultats["global_1"].iloc[0])
+        stats_2 = global_stats(resultats["global_2"].iloc[0])
+        sf1, sf2 = stats_1["pct_sans_faute"], stats_2["pct_sans_faute"]
+        v1, v2 = stats_1["vitesse_moy"], stats_2["vitesse_moy"]
+
+        # Affichage Face à Face
+        c1, c2, c3 = st.columns([1, 0.2, 1])
+        with c1:
+            st.metric(f"Vitesse Moyenne ({nom_1})", f"{v1} m/s")
+            st.metric("Taux de Réussite", f"{sf1:.1f}%")
+        with c2:
+            st.markdown("<h2 style='text-align: center; margin-top: 50px;'>VS</h2>", unsafe_allow_html=True)
+        with c3:
+            st.metric(f"Vitesse Moyenne ({nom_2})", f"{v2} m/s", delta=round(v2 - v1, 2))
+            st.metric("Taux de Réussite", f"{sf2:.1f}%", delta=round(sf2 - sf1, 1))
+
+        # --- PARTIE B : L'HISTORIQUE DES DUELS ---
+        st.markdown("---")
+        st.header("⚔️ Confrontations Directes")
+
+        # Score lu dans le bilan de la paire, moyennes agrégées en SQL ; le détail est paginé plus bas
+        duel = head_to_head(resultats["bilan"], resultats["moyennes"])
+
+        if duel is not None:
+            import altair as alt  # chargé seulement quand un graphique est dessiné
+            # --- 1. SCORE ET MOYENNES (une ligne chacun) ---
+            score_1, score_2 = duel['score_1'], duel['score_2']
+
+            # --- 2. AFFICHAGE DES STATS (Histogramme) ---
+            st.subheader("📊 Statistiques en Confrontation Directe")
+            
+            avg_v1, avg_v2 = duel['couple_1']['vitesse_moy'], duel['couple_2']['vitesse_moy']
+            avg_p1, avg_p2 = duel['couple_1']['penalites_moy'], duel['couple_2']['penalites_moy']
+            pct_e1, pct_e2 = duel['couple_1']['pct_elimination'], duel['couple_2']['pct_elimination']
+
+            data_chart = pd.DataFrame({
+                'Chien': [nom_1, nom_2, nom_1, nom_2, nom_1, nom_2],
+                'Métrique': ['Vitesse (m/s)', 'Vitesse (m/s)', 'Fautes (pts)', 'Fautes (pts)', '% Élimination', '% Élimination'],
+                'Valeur': [avg_v1, avg_v2, avg_p1, avg_p2, pct_e1, pct_e2]
+            })
+
+            chart = alt.Chart(data_chart).mark_bar().encode(
+                x=alt.X('Chien:N', axis=None),
+                y=alt.Y('Valeur:Q'),
+                color=alt.Color('Chien:N', scale=alt.Scale(range=['#e74c3c', '#3498db']), legend=None),
+                column=alt.Column('Métrique:N', header=alt.Header(titleOrient="bottom")),
+                tooltip=['Chien', 'Métrique', alt.Tooltip('Valeur', format='.2f')]
+            ).properties(width=130, height=200)
+            
+            st.altair_chart(chart)
+
+            st.markdown("---")
+
+            # --- 3. AFFICHAGE DU SCORE GLOBAL ---
+            st.subheader(f"🏆 Score Actuel : {nom_1} [{score_1}] - [{score_2}] {nom_2}")
+            st.caption(f"{duel['nb_confrontations']} confrontations, {duel['egalites']} égalités"
+                       f" - dernière rencontre : {duel['derniere_rencontre']}")
+            if score_1 + score_2 > 0:
+                chart_win = pd.DataFrame({'Chien': [nom_1, nom_2], 'Victoires': [score_1, score_2]})
+                bar = alt.Chart(chart_win).mark_bar().encode(
+                    x=alt.X('Victoires:Q', axis=None), 
+                    y=alt.Y('Chien:N', sort='-x', axis=None), 
+                    color=alt.Color('Chien', scale=alt.Scale(range=['#e74c3c', '#3498db']), legend=None),
+                    tooltip=['Chien', 'Victoires']
+                ).properties(height=50)
+                st.altair_chart(bar, use_container_width=True)
+
+            # --- 4. AFFICHAGE DÉTAILLÉ (Feuille de Match) ---
+            # Une page de duels = un seul bloc HTML (k9.history), au lieu de widgets par ligne
+            page_duels = paginate(
+                f"duels_{id_1}_{id_2}",
+                lambda cursor, limit: duel_page_query(id_1, id_2, cursor, limit),
+                schema=DUEL_PAGE_SCHEMA,
+            )
+            with st.container(border=True):
+                st.markdown(duel_sheet_html(page_duels, nom_1, nom_2), unsafe_allow_html=True)
+
+        else:
+            st.info("Aucune confrontation directe trouvée.")
@@ -0,0 +1,106 @@
+"""Résumé pré-calculé par couple pour "Recherche Profil".
+
+Une ligne par (id_couple, annee, type_epreuve, mois) : totaux, sans-faute, éliminations,
+somme et nombre des vitesses du mois et histogramme des catégories de k9.outcomes.
+La page lit toutes les lignes d'un couple en une seule requête indexée, puis filtre
+année et type d'épreuve en mémoire : changer de filtre ne relance aucune requête.
+"""
+import pandas as pd
+
+from k9.changes import touched_couples_sql
+from k9.dimensions import annee_sql, type_epreuve_sql
+from k9.outcomes import CATEGORIES, category_code_sql
+
+_CATEGORY_COLUMNS = ["nb_sans_faute_cat", "nb_excellent", "nb_tres_bon", "nb_bon", "nb_elimine_cat"]
+
+
+def create_profile_tables(conn):
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS profils_couples (
+            id_couple, annee TEXT, type_epreuve TEXT, mois TEXT,
+            nb_parcours INTEGER, nb_sans_faute INTEGER, nb_elimines INTEGER,
+            nb_vitesse INTEGER, somme_vitesse REAL,
+            {", ".join(f"{c} INTEGER" for c in _CATEGORY_COLUMNS)},
+            PRIMARY KEY (id_couple, annee, type_epreuve, mois)
+        ) WITHOUT ROWID;
+    """)
+
+
+def _insert_profiles(conn, where="", params=()):
+    code = category_code_sql("r")
+    categories = ",\n            ".join(f"SUM(({code}) = {i})" for i in range(len(CATEGORIES)))
+    # La vitesse du mois ignore aussi les passages qualifiés 'Eliminé' (comme l'ancienne requête)
+    rapide = "r.qualificatif != 'Eliminé' AND r.is_eliminated = 0"
+    conn.execute(f"""
+        INSERT INTO profils_couples
+        SELECT
+            r.id_couple, {annee_sql()}, {type_epreuve_sql()}, SUBSTR(lc.date_concours, 4, 2),
+            COUNT(*), SUM(r.is_clean), SUM(r.is_eliminated),
+            COUNT(CASE WHEN {rapide} THEN r.vitesse_num END),
+            TOTAL(CASE WHEN {rapide} THEN r.vitesse_num END),
+            {categories}
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE 1 {where}
+        GROUP BY 1, 2, 3, 4
+    """, params)
+
+
+def rebuild_profiles(conn):
+    create_profile_tables(conn)
+    conn.execute("DELETE FROM profils_couples")
+    _insert_profiles(conn)
+    conn.commit()
+
+
+def refresh_profiles(conn, concours_ids):
+    """Recalcule le résumé complet des couples ayant couru les concours chargés (ou retirés au rechargement).
+
+    Un couple qui n'a plus aucune ligne perd son résumé.
+    """
+    ids = list(concours_ids)
+    if not ids:
+        return
+    couples, params = touched_couples_sql(ids)
+    conn.execute(f"DELETE FROM profils_couples WHERE id_couple IN ({couples})", params)
+    _insert_profiles(conn, f"AND r.id_couple IN ({couples})", params)
+    conn.commit()
+
+
+def profile_summary_query(id_couple):
+    return "SELECT * FROM profils_couples WHERE id_couple = ?", (id_couple,)
+
+
+def filter_summary(df_profil, annee, type_epreuve=None):
+    """Lignes d'une année, pour un type d'épreuve (None = tous)."""
+    mask = df_profil["annee"] == annee
+    if type_epreuve is not None:
+        mask &= df_profil["type_epreuve"] == type_epreuve
+    return df_profil[mask]
+
+
+def profile_years(df_profil):
+    return sorted(df_profil["annee"].dropna().unique().tolist(), reverse=True)
+
+
+def profile_kpis(rows):
+    return {
+        "total": int(rows["nb_parcours"].sum()),
+        "sans_faute": int(rows["nb_sans_faute"].sum()),
+        "elimines": int(rows["nb_elimines"].sum()),
+    }
+
+
+def monthly_speed(rows):
+    """DataFrame (mois, moyenne_vit) des mois ayant au moins un passage chronométré."""
+    by_month = rows.groupby("mois")[["somme_vitesse", "nb_vitesse"]].sum()
+    by_month = by_month[by_month["nb_vitesse"] > 0]
+    return pd.DataFrame({
+        "mois": by_month.index,
+        "moyenne_vit": (by_month["somme_vitesse"] / by_month["nb_vitesse"]).to_numpy(),
+    }).sort_values("mois").reset_index(drop=True)
+
+
+def category_histogram(rows):
+    """Nombre de passages par catégorie, dans l'ordre de CATEGORIES."""
+    return pd.Series(rows[_CATEGORY_COLUMNS].sum().to_numpy(dtype="int64"), index=CATEGORIES)
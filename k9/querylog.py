@@ -0,0 +1,133 @@
+"""Instrumentation des requêtes de load_data : durée, lignes, octets, cache, requêtes lentes.
+
+Chaque appel est rattaché à l'empreinte de sa requête (SQL normalisé, sans les paramètres).
+Par empreinte, on garde une fenêtre glissante des dernières durées pour les percentiles.
+Au-delà de SLOW_QUERY_MS, la requête est écrite sur stderr avec ses paramètres et son
+EXPLAIN QUERY PLAN. Pour les requêtes lues avec un schéma de colonnes (k9.frames), on suit
+aussi la mémoire économisée par rapport au résultat brut en dtype object.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import deque
+
+from k9.cache import normalize_sql
+from k9.db import explain, get_pool
+
+# --- RÉGLAGES ---
+SLOW_QUERY_MS = float(os.environ.get("K9_SLOW_QUERY_MS", 500))
+WINDOW = 500                       # Durées conservées par empreinte
+PERCENTILES = (50, 95, 99)
+
+
+def fingerprint(query):
+    """Empreinte courte et stable d'une requête (mêmes SQL à la mise en forme près = même empreinte)."""
+    return hashlib.blake2b(normalize_sql(query).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def percentile(sorted_values, p):
+    """Percentile au rang le plus proche d'une liste triée."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class QueryLog:
+    """Statistiques glissantes par empreinte, partagées par toutes les sessions du processus."""
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS, window=WINDOW, explain_func=None, out=None):
+        self.slow_ms = slow_ms
+        self.window = window
+        self.explain_func = explain_func   # (sql, params) -> lignes du plan, appelée pour les requêtes lentes
+        self.out = out or sys.stderr
+        self._by_fingerprint = {}          # empreinte -> dict (sql, durées, appels, hits, lignes, octets)
+        self._lock = threading.Lock()
+
+    def record(self, query, params, ms, rows, nbytes, cache_hit, raw_bytes=None):
+        """Enregistre un appel ; renvoie son résumé (pour la liste des requêtes du rerun en cours).
+
+        raw_bytes : taille qu'aurait eue le résultat non typé (lectures avec schéma uniquement).
+        """
+        fp = fingerprint(query)
+        with self._lock:
+            entry = self._by_fingerprint.get(fp)
+            if entry is None:
+                entry = self._by_fingerprint[fp] = {
+                    "sql": normalize_sql(query), "durees": deque(maxlen=self.window),
+                    "appels": 0, "hits": 0, "lignes": 0, "octets": 0, "lentes": 0,
+                    "lectures_typees": 0, "octets_bruts": 0, "octets_types": 0,
+                }
+            entry["durees"].append(ms)
+            entry["appels"] += 1
+            entry["hits"] += bool(cache_hit)
+            entry["lignes"] += rows
+            entry["octets"] += nbytes
+            slow = not cache_hit and ms >= self.slow_ms
+            entry["lentes"] += slow
+            if raw_bytes is not None:
+                entry["lectures_typees"] += 1
+                entry["octets_bruts"] += raw_bytes
+                entry["octets_types"] += nbytes
+        if slow:
+            self._log_slow(query, params, ms, rows)
+        return {"empreinte": fp, "ms": round(ms, 2), "lignes": rows, "octets": nbytes, "cache": bool(cache_hit),
+                "economie_octets": raw_bytes - nbytes if raw_bytes is not None else None,
+                "sql": normalize_sql(query)[:120]}
+
+    def _log_slow(self, query, params, ms, rows):
+        lines = [f"[k9] requête lente {ms:.0f} ms ({rows} lignes) : {normalize_sql(query)}",
+                 f"     paramètres : {tuple(params)!r}"]
+        if self.explain_func is not None:
+            try:
+                lines += [f"     plan : {step}" for step in self.explain_func(query, params)]
+            except Exception as exc:  # le plan est un bonus : ne jamais faire échouer la page
+                lines.append(f"     plan indisponible : {exc}")
+        print("\n".join(lines), file=self.out)
+
+    def summary(self, limit=20):
+        """Empreintes triées par p95 décroissant, avec percentiles sur la fenêtre glissante."""
+        with self._lock:
+            entries = [(fp, dict(e, durees=sorted(e["durees"]))) for fp, e in self._by_fingerprint.items()]
+        rows = []
+        for fp, e in entries:
+            row = {"empreinte": fp, "sql": e["sql"][:120], "appels": e["appels"],
+                   "taux_hit": round(e["hits"] / e["appels"], 3), "lentes": e["lentes"],
+                   "lignes_moy": round(e["lignes"] / e["appels"], 1), "octets_moy": e["octets"] // e["appels"]}
+            for p in PERCENTILES:
+                row[f"p{p}_ms"] = round(percentile(e["durees"], p), 2)
+            if e["lectures_typees"]:
+                row["economie_octets_moy"] = (e["octets_bruts"] - e["octets_types"]) // e["lectures_typees"]
+                row["reduction"] = round(e["octets_bruts"] / max(e["octets_types"], 1), 1)
+            rows.append(row)
+        rows.sort(key=lambda r: -r["p95_ms"])
+        return rows[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._by_fingerprint.clear()
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def _explain_with_pool(query, params):
+    with get_pool().connection() as conn:
+        return explain(conn, query, params)
+
+
+def get_query_log():
+    """Journal unique du processus ; les requêtes lentes sont expliquées via le pool de connexions."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = QueryLog(explain_func=_explain_with_pool)
+    return _log
+
+
+def query_log_summary(limit=20):
+    return get_query_log().summary(limit)
+
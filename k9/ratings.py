@@ -0,0 +1,208 @@
+"""Classement Elo des couples, calculé en un seul passage chronologique sur tout l'historique.
+
+Chaque épreuve (id_concours, nom_epreuve) est un match à plusieurs : chaque couple y affronte
+tous les autres (règle de k9.outcomes : éliminé < pénalités < vitesse), avec un K divisé par
+le nombre d'adversaires. L'historique elo_historique sert aussi de point de reprise :
+charger un concours ne rejoue que les épreuves à partir de sa date.
+
+Usage : python -m k9.ratings [chemin_de_la_base] [--race RACE] [--top N]
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+from k9.db import DB_PATH, open_readonly
+from k9.dimensions import date_iso_sql
+
+RATING_INITIAL = 1500.0
+K = 32.0
+BATCH_COURSES = 2_000     # Épreuves écrites par transaction
+
+
+def create_rating_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS elo_historique (
+            id_couple, date_iso TEXT, id_concours, nom_epreuve TEXT,
+            rating_avant REAL, rating_apres REAL, nb_courses INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_elo_historique_couple ON elo_historique (id_couple, date_iso);
+        CREATE INDEX IF NOT EXISTS idx_elo_historique_date ON elo_historique (date_iso);
+        CREATE TABLE IF NOT EXISTS elo_etat (
+            id_couple PRIMARY KEY,
+            rating REAL, nb_courses INTEGER, derniere_date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_elo_etat_rating ON elo_etat (rating);
+    """)
+
+
+def course_deltas(ratings, speed, penalty):
+    """Variation Elo de chaque participant d'une épreuve (tableaux NumPy alignés).
+
+    speed : NaN si éliminé ; penalty : NaN si non renseignée (compte pour 0).
+    """
+    n = len(ratings)
+    eliminated = np.isnan(speed)
+    pen = np.where(eliminated, 0.0, np.nan_to_num(penalty, nan=0.0))
+    spd = np.where(eliminated, 0.0, speed)
+    # Rang dense : 0 = meilleur ; mêmes (éliminé, pénalités, vitesse) = même rang
+    order = np.lexsort((-spd, pen, eliminated))
+    keys = np.stack([eliminated[order], pen[order], spd[order]], axis=1)
+    new_rank = np.r_[False, (keys[1:] != keys[:-1]).any(axis=1)]
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.cumsum(new_rank)
+
+    score = (rank[:, None] < rank[None, :]) + 0.5 * (rank[:, None] == rank[None, :])
+    expected = 1.0 / (1.0 + 10 ** ((ratings[None, :] - ratings[:, None]) / 400.0))
+    np.fill_diagonal(score, 0.0)
+    np.fill_diagonal(expected, 0.0)
+    return K / (n - 1) * (score - expected).sum(axis=1)
+
+
+def _state_before(conn, couples, date_iso):
+    """Rating et nombre d'épreuves de chaque couple juste avant `date_iso` (point de reprise)."""
+    state = {}
+    for id_couple in couples:
+        row = conn.execute("""
+            SELECT rating_apres, nb_courses FROM elo_historique
+            WHERE id_couple = ? AND date_iso < ?
+            ORDER BY date_iso DESC, rowid DESC LIMIT 1
+        """, (id_couple, date_iso)).fetchone()
+        state[id_couple] = (row[0], row[1]) if row else (RATING_INITIAL, 0)
+    return state
+
+
+def replay_from(conn, date_iso=None):
+    """Rejoue toutes les épreuves datées de `date_iso` ou après (tout l'historique si None).
+
+    Un seul curseur trié par date : la mémoire ne contient que les couples déjà rencontrés
+    depuis la reprise et l'épreuve en cours.
+    """
+    date_iso = date_iso or ""
+    touched = {c for (c,) in conn.execute(
+        "SELECT DISTINCT id_couple FROM elo_historique WHERE date_iso >= ?", (date_iso,))}
+    conn.execute("DELETE FROM elo_historique WHERE date_iso >= ?", (date_iso,))
+
+    state = {}
+    pending = []
+    read = conn.cursor()
+    rows = read.execute(f"""
+        SELECT {date_iso_sql()} AS date_iso, r.id_concours, r.nom_epreuve, r.id_couple,
+               r.vitesse_num, r.penalites_num
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE {date_iso_sql()} >= ?
+        ORDER BY date_iso, r.id_concours, r.nom_epreuve
+    """, (date_iso,))
+    for n_course, (key, course) in enumerate(itertools.groupby(rows, key=lambda row: row[:3]), 1):
+        course = list(course)
+        couples = [row[3] for row in course]
+        missing = [c for c in couples if c not in state]
+        if missing:
+            state.update(_state_before(conn, missing, key[0]))
+        if len(course) > 1:
+            before = np.array([state[c][0] for c in couples])
+            speed = np.array([row[4] if row[4] is not None else np.nan for row in course], dtype=float)
+            penalty = np.array([row[5] if row[5] is not None else np.nan for row in course], dtype=float)
+            after = before + course_deltas(before, speed, penalty)
+        else:
+            before = after = np.array([state[couples[0]][0]])
+        for c, r0, r1 in zip(couples, before, after):
+            nb = state[c][1] + 1
+            state[c] = (float(r1), nb)
+            pending.append((c, key[0], key[1], key[2], float(r0), float(r1), nb))
+        if n_course % BATCH_COURSES == 0:
+            _flush(conn, pending)
+
+    _flush(conn, pending)
+    _update_current(conn, touched | set(state))
+    conn.commit()
+
+
+def _flush(conn, pending):
+    conn.executemany("""
+        INSERT INTO elo_historique
+            (id_couple, date_iso, id_concours, nom_epreuve, rating_avant, rating_apres, nb_courses)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, pending)
+    pending.clear()
+
+
+def _update_current(conn, couples):
+    """elo_etat = dernière ligne d'historique de chaque couple touché (supprimé s'il n'en a plus)."""
+    for id_couple in couples:
+        row = conn.execute("""
+            SELECT rating_apres, nb_courses, date_iso FROM elo_historique
+            WHERE id_couple = ? ORDER BY date_iso DESC, rowid DESC LIMIT 1
+        """, (id_couple,)).fetchone()
+        if row:
+            conn.execute("INSERT OR REPLACE INTO elo_etat VALUES (?, ?, ?, ?)", (id_couple, *row))
+        else:
+            conn.execute("DELETE FROM elo_etat WHERE id_couple = ?", (id_couple,))
+
+
+def rebuild_ratings(conn):
+    create_rating_tables(conn)
+    conn.execute("DELETE FROM elo_etat")
+    replay_from(conn, None)
+
+
+def refresh_ratings(conn, concours_ids):
+    """Rejoue à partir du plus ancien des concours chargés (seulement eux s'ils sont les plus récents)."""
+    ids = list(concours_ids)
+    if not ids:
+        return
+    (start,) = conn.execute(f"""
+        SELECT MIN({date_iso_sql()}) FROM liste_concours lc
+        WHERE lc.id_concours IN ({', '.join('?' * len(ids))})
+    """, ids).fetchone()
+    if start is not None:
+        replay_from(conn, start)
+
+
+def rating_history_query(id_couple):
+    """(sql, params) de l'évolution du rating d'un couple, épreuve par épreuve."""
+    return """
+        SELECT date_iso AS Date, id_concours, nom_epreuve AS Epreuve,
+               ROUND(rating_avant, 1) AS Avant, ROUND(rating_apres, 1) AS Après
+        FROM elo_historique
+        WHERE id_couple = ?
+        ORDER BY date_iso, rowid
+    """, (id_couple,)
+
+
+def leaderboard_query(race=None, min_courses=10, limit=50):
+    """(sql, params) du classement Elo national, ou d'une race si `race` est donné."""
+    where, params = "WHERE e.nb_courses >= ?", [min_courses]
+    if race is not None:
+        where += " AND rc.race = ?"
+        params.append(race)
+    return f"""
+        SELECT rc.nom_chien, rc.conducteur, rc.race,
+               ROUND(e.rating, 1) AS Elo, e.nb_courses AS Epreuves, e.derniere_date AS [Dernière épreuve]
+        FROM elo_etat e
+        LEFT JOIN recherche_couples rc ON rc.id_couple = e.id_couple
+        {where}
+        ORDER BY e.rating DESC
+        LIMIT ?
+    """, tuple(params) + (limit,)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Affiche le classement Elo des couples.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    parser.add_argument("--race")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    conn = open_readonly(args.db_path)
+    try:
+        sql, params = leaderboard_query(race=args.race, limit=args.top)
+        for i, (chien, conducteur, race, elo, nb, date) in enumerate(conn.execute(sql, params), 1):
+            print(f"{i:>3}. {elo:7.1f}  {chien} ({conducteur} - {race}), {nb} épreuves, dernière le {date}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
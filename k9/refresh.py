@@ -0,0 +1,73 @@
+"""Mise à jour des tables dérivées après le chargement de nouveaux concours.
+
+Usage : python -m k9.refresh [chemin_de_la_base] [--concours ID ...] [--full]
+"""
+import argparse
+import sys
+import time
+
+from k9.changes import clear_removed_couples, create_change_tables
+from k9.db import DB_PATH, open_readwrite
+from k9.courses import rebuild_courses, refresh_courses
+from k9.distributions import rebuild_distributions, refresh_distributions
+from k9.kpis import rebuild_kpis, refresh_kpis
+from k9.leaderboards import rebuild_leaderboards, refresh_leaderboards
+from k9.profiles import rebuild_profiles, refresh_profiles
+from k9.ratings import rebuild_ratings, refresh_ratings
+from k9.regions import rebuild_region_cube, refresh_region_cube
+from k9.rivalries import rebuild_rivalries, refresh_rivalries
+from k9.seasons import rebuild_seasons, refresh_seasons
+from k9.search import rebuild_search_index, refresh_search_index
+from k9.snapshot import rebuild_snapshot, refresh_snapshot
+
+# (nom, reconstruction complète, mise à jour incrémentale pour une liste d'id_concours)
+REFRESHERS = [
+    ("saisons", rebuild_seasons, refresh_seasons),
+    ("recherche", rebuild_search_index, refresh_search_index),
+    ("kpis", rebuild_kpis, refresh_kpis),
+    ("cube_regions", rebuild_region_cube, refresh_region_cube),
+    ("parcours_juges", rebuild_courses, refresh_courses),
+    ("rivalites", rebuild_rivalries, refresh_rivalries),
+    ("elo", rebuild_ratings, refresh_ratings),
+    ("classements", rebuild_leaderboards, refresh_leaderboards),
+    ("profils", rebuild_profiles, refresh_profiles),
+    ("distributions", rebuild_distributions, refresh_distributions),
+    ("instantane", rebuild_snapshot, refresh_snapshot),   # Seulement s'il a déjà été exporté
+]
+
+
+def refresh_all(conn, concours_ids=None):
+    """Rafraîchit toutes les tables dérivées ; concours_ids=None force une reconstruction complète."""
+    create_change_tables(conn)
+    timings = {}
+    for name, rebuild, refresh in REFRESHERS:
+        t0 = time.perf_counter()
+        if concours_ids is None:
+            rebuild(conn)
+        else:
+            refresh(conn, concours_ids)
+        timings[name] = time.perf_counter() - t0
+    clear_removed_couples(conn)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rafraîchit les tables dérivées de K9-Tracker.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    parser.add_argument("--concours", nargs="+", type=int, default=[], help="id_concours nouvellement chargés")
+    parser.add_argument("--full", action="store_true", help="reconstruit tout depuis resultats")
+    args = parser.parse_args(argv)
+    if not args.full and not args.concours:
+        parser.error("indiquer --concours ID ... ou --full")
+
+    conn = open_readwrite(args.db_path)
+    try:
+        timings = refresh_all(conn, None if args.full else args.concours)
+    finally:
+        conn.close()
+    for name, seconds in timings.items():
+        print(f"{name:<20} {seconds:8.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
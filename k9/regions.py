@@ -0,0 +1,106 @@
+"""Cube pré-agrégé région × année × grade × type d'épreuve pour "Statistiques Régionales".
+
+Deux niveaux :
+- cube_regions_concours : contribution de chaque concours (remplacée à chaque rechargement,
+  ce qui rend la mise à jour idempotente) ;
+- cube_regions : somme des contributions, relue par la page (quelques centaines de lignes).
+"""
+from k9.dimensions import annee_sql, grade_sql, region_francaise_sql, region_sql, type_epreuve_sql
+
+_MEASURES = "nb_parcours, nb_vitesse, somme_vitesse, nb_sans_faute"
+
+
+def create_region_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS cube_regions_concours (
+            id_concours, region TEXT, annee TEXT, grade INTEGER, type_epreuve TEXT,
+            nb_parcours INTEGER, nb_vitesse INTEGER, somme_vitesse REAL, nb_sans_faute INTEGER,
+            PRIMARY KEY (id_concours, region, grade, type_epreuve)
+        );
+        CREATE INDEX IF NOT EXISTS idx_cube_regions_concours_annee ON cube_regions_concours (annee);
+        CREATE TABLE IF NOT EXISTS cube_regions (
+            annee TEXT, grade INTEGER, type_epreuve TEXT, region TEXT,
+            nb_parcours INTEGER, nb_vitesse INTEGER, somme_vitesse REAL, nb_sans_faute INTEGER,
+            PRIMARY KEY (annee, grade, type_epreuve, region)
+        );
+    """)
+
+
+def _insert_contributions(conn, where="", params=()):
+    conn.execute(f"""
+        INSERT INTO cube_regions_concours
+            (id_concours, region, annee, grade, type_epreuve, {_MEASURES})
+        SELECT
+            r.id_concours, {region_sql()}, {annee_sql()}, {grade_sql()}, {type_epreuve_sql()},
+            COUNT(*), COUNT(r.vitesse_num), SUM(r.vitesse_num), SUM(r.is_clean)
+        FROM resultats r
+        JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        WHERE {region_francaise_sql()} {where}
+        GROUP BY 1, 2, 3, 4, 5
+    """, params)
+
+
+def _rollup(conn, annees=None):
+    """Recalcule cube_regions pour les années touchées (toutes si annees=None)."""
+    where, params = "", ()
+    if annees is not None:
+        annees = list(annees)
+        if not annees:
+            return
+        where = f"WHERE annee IN ({', '.join('?' * len(annees))})"
+        params = annees
+    conn.execute(f"DELETE FROM cube_regions {where}", params)
+    conn.execute(f"""
+        INSERT INTO cube_regions (annee, grade, type_epreuve, region, {_MEASURES})
+        SELECT annee, grade, type_epreuve, region,
+               SUM(nb_parcours), SUM(nb_vitesse), SUM(somme_vitesse), SUM(nb_sans_faute)
+        FROM cube_regions_concours
+        {where}
+        GROUP BY annee, grade, type_epreuve, region
+    """, params)
+
+
+def rebuild_region_cube(conn):
+    create_region_tables(conn)
+    conn.execute("DELETE FROM cube_regions_concours")
+    _insert_contributions(conn)
+    _rollup(conn)
+    conn.commit()
+
+
+def refresh_region_cube(conn, concours_ids):
+    ids = list(concours_ids)
+    if not ids:
+        return
+    in_ids = f"IN ({', '.join('?' * len(ids))})"
+    # Années avant ET après rechargement : un concours dont la date a été corrigée change d'année
+    annees = {a for (a,) in conn.execute(
+        f"SELECT DISTINCT annee FROM cube_regions_concours WHERE id_concours {in_ids}", ids)}
+    conn.execute(f"DELETE FROM cube_regions_concours WHERE id_concours {in_ids}", ids)
+    _insert_contributions(conn, f"AND r.id_concours {in_ids}", ids)
+    annees |= {a for (a,) in conn.execute(
+        f"SELECT DISTINCT annee FROM cube_regions_concours WHERE id_concours {in_ids}", ids)}
+    _rollup(conn, annees)
+    conn.commit()
+
+
+def region_stats_query(annee=None, grade=None, type_epreuve=None, min_parcours=50):
+    """(sql, params) du classement des régions pour une combinaison de filtres (None = tous)."""
+    filters, params = [], []
+    for column, value in (("annee", annee), ("grade", grade), ("type_epreuve", type_epreuve)):
+        if value is not None:
+            filters.append(f"{column} = ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    return f"""
+        SELECT
+            region as Region,
+            SUM(nb_parcours) as Total_Parcours,
+            SUM(somme_vitesse) / SUM(nb_vitesse) as Vitesse_Moyenne,
+            SUM(nb_sans_faute) as Sans_Faute
+        FROM cube_regions
+        {where}
+        GROUP BY region
+        HAVING Total_Parcours > ?
+        ORDER BY Vitesse_Moyenne DESC
+    """, tuple(params) + (min_parcours,)
@@ -0,0 +1,121 @@
+"""Bilans des confrontations directes pour toutes les paires de couples ayant couru la même épreuve.
+
+Une ligne par paire (couple_a < couple_b) : victoires de chacun, égalités, nombre de
+confrontations et dernière rencontre. Le vainqueur d'un duel suit la règle de k9.outcomes.
+"""
+from k9.changes import touched_couples_sql
+from k9.dimensions import date_iso_sql
+from k9.outcomes import EGALITE, VAINQUEUR_1, VAINQUEUR_2, duel_winner_sql
+
+
+def create_rivalry_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS rivalites (
+            couple_a, couple_b,
+            victoires_a INTEGER, victoires_b INTEGER, egalites INTEGER,
+            nb_confrontations INTEGER,
+            derniere_rencontre TEXT,
+            dernier_concours,
+            PRIMARY KEY (couple_a, couple_b)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_rivalites_b ON rivalites (couple_b);
+    """)
+
+
+def _insert_pairs(conn, runs_source):
+    """Agrège par paire de couples les duels de `runs_source` (resultats ou une table temporaire de passages)."""
+    winner = duel_winner_sql("a", "b")
+    # Seul agrégat MAX() de la requête : SQLite prend id_concours sur la ligne de la dernière rencontre
+    conn.execute(f"""
+        INSERT OR REPLACE INTO rivalites
+        SELECT
+            ca, cb,
+            SUM(vainqueur = {VAINQUEUR_1}), SUM(vainqueur = {VAINQUEUR_2}), SUM(vainqueur = {EGALITE}),
+            COUNT(*),
+            MAX(date_iso), id_concours
+        FROM (
+            SELECT a.id_couple AS ca, b.id_couple AS cb, a.id_concours,
+                   {winner} AS vainqueur,
+                   {date_iso_sql()} AS date_iso
+            FROM {runs_source} a
+            JOIN {runs_source} b
+              ON a.id_concours = b.id_concours AND a.nom_epreuve = b.nom_epreuve AND a.id_couple < b.id_couple
+            LEFT JOIN liste_concours lc ON a.id_concours = lc.id_concours
+        )
+        GROUP BY ca, cb
+    """)
+
+
+def rebuild_rivalries(conn):
+    create_rivalry_tables(conn)
+    conn.execute("DELETE FROM rivalites")
+    _insert_pairs(conn, "resultats")
+    conn.commit()
+
+
+def refresh_rivalries(conn, concours_ids):
+    """Recalcule l'historique complet de toutes les paires présentes dans les concours chargés.
+
+    Recalculer (plutôt qu'additionner) rend le rechargement d'un concours idempotent. Les couples
+    retirés au rechargement sont inclus : une paire dont les deux couples ont été touchés est
+    supprimée puis réinsérée, et disparaît si elle n'a plus aucune confrontation. Une paire dont
+    un couple n'a pas été touché n'a pu gagner ni perdre de confrontation.
+    """
+    ids = list(concours_ids)
+    if not ids:
+        return
+    couples, params = touched_couples_sql(ids)
+    conn.execute("DROP TABLE IF EXISTS temp.rivalites_couples")
+    conn.execute("CREATE TEMP TABLE rivalites_couples (id_couple PRIMARY KEY) WITHOUT ROWID")
+    conn.execute(f"INSERT INTO temp.rivalites_couples {couples}", params)
+    conn.execute("DROP TABLE IF EXISTS temp.rivalites_passages")
+    conn.execute("""
+        CREATE TEMP TABLE rivalites_passages AS
+        SELECT id_couple, id_concours, nom_epreuve, vitesse_num, penalites_num
+        FROM resultats
+        WHERE id_couple IN (SELECT id_couple FROM temp.rivalites_couples)
+    """)
+    conn.execute("CREATE INDEX temp.idx_rivalites_passages ON rivalites_passages (id_concours, nom_epreuve)")
+    conn.execute("""
+        DELETE FROM rivalites
+        WHERE couple_a IN (SELECT id_couple FROM temp.rivalites_couples)
+          AND couple_b IN (SELECT id_couple FROM temp.rivalites_couples)
+    """)
+    _insert_pairs(conn, "temp.rivalites_passages")
+    conn.execute("DROP TABLE temp.rivalites_passages")
+    conn.execute("DROP TABLE temp.rivalites_couples")
+    conn.commit()
+
+
+def head_to_head_query(id_1, id_2):
+    """(sql, params) du bilan de id_1 contre id_2, orienté du point de vue de id_1."""
+    return """
+        SELECT
+            CASE WHEN couple_a = ? THEN victoires_a ELSE victoires_b END AS victoires,
+            CASE WHEN couple_a = ? THEN victoires_b ELSE victoires_a END AS defaites,
+            egalites, nb_confrontations, derniere_rencontre
+        FROM rivalites
+        WHERE (couple_a = ? AND couple_b = ?) OR (couple_a = ? AND couple_b = ?)
+    """, (id_1, id_1, id_1, id_2, id_2, id_1)
+
+
+def top_rivals_query(id_couple, limit=5):
+    """(sql, params) des adversaires les plus souvent rencontrés par un couple."""
+    return """
+        SELECT
+            rv.adversaire AS id_couple, rc.nom_chien, rc.conducteur,
+            rv.nb_confrontations AS Confrontations,
+            rv.victoires AS Victoires, rv.defaites AS Défaites, rv.egalites AS Égalités,
+            rv.derniere_rencontre AS [Dernière rencontre]
+        FROM (
+            SELECT couple_b AS adversaire, victoires_a AS victoires, victoires_b AS defaites,
+                   egalites, nb_confrontations, derniere_rencontre
+            FROM rivalites WHERE couple_a = ?
+            UNION ALL
+            SELECT couple_a, victoires_b, victoires_a, egalites, nb_confrontations, derniere_rencontre
+            FROM rivalites WHERE couple_b = ?
+        ) rv
+        LEFT JOIN recherche_couples rc ON rc.id_couple = rv.adversaire
+        ORDER BY rv.nb_confrontations DESC, rv.derniere_rencontre DESC
+        LIMIT ?
+    """, (id_couple, id_couple, limit)
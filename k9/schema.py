@@ -0,0 +1,163 @@
+"""Index de la base et conseiller EXPLAIN QUERY PLAN pour les requêtes des pages.
+
+Usage : python -m k9.schema [chemin_de_la_base] [--create] [--strict]
+"""
+import argparse
+import re
+import sys
+
+from k9.db import DB_PATH, explain, open_readonly, open_readwrite
+from k9.courses import judge_courses_query, judge_stats_query
+from k9.distributions import couple_context_query, couple_runs_query, distributions_query
+from k9.history import duel_averages_query, duel_page_query, history_page_query
+from k9.kpis import DASHBOARD_KPIS_SQL
+from k9.leaderboards import leaderboard_query as top_k_query
+from k9.profiles import profile_summary_query
+from k9.ratings import leaderboard_query, rating_history_query
+from k9.regions import region_stats_query
+from k9.rivalries import head_to_head_query, top_rivals_query
+from k9.search import search_query
+from k9.seasons import seasons_query
+
+# --- INDEX ---
+# (nom, table, colonnes) : les colonnes en fin d'index rendent les lectures "couvrantes"
+# (SQLite n'a plus besoin de revenir à la ligne de la table).
+INDEXES = [
+    # Profil et Versus : tout part de id_couple, puis jointure sur le concours / l'épreuve
+    ("idx_resultats_couple", "resultats",
+     ("id_couple", "id_concours", "nom_epreuve", "vitesse", "penalites")),
+    # Duels (auto-jointure) et comptage des participants par concours
+    ("idx_resultats_concours_epreuve", "resultats", ("id_concours", "nom_epreuve", "id_couple")),
+    # Top 10 par race : sans-faute triés par vitesse, directement dans l'ordre de l'index
+    ("idx_resultats_race", "resultats", ("race", "is_clean", "vitesse_num")),
+    ("idx_resultats_juge", "resultats",
+     ("juge", "nom_epreuve", "vitesse_num", "temps_num", "is_clean", "is_eliminated")),
+    ("idx_resultats_region", "resultats",
+     ("region", "id_concours", "nom_epreuve", "vitesse_num", "is_clean")),
+    ("idx_liste_concours_id", "liste_concours", ("id_concours", "date_concours", "nom_concours")),
+]
+
+
+def create_indexes(conn, indexes=INDEXES):
+    """Crée les index manquants puis rafraîchit les statistiques du planificateur."""
+    for name, table, columns in indexes:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def verify_indexes(conn, indexes=INDEXES):
+    """Renvoie la liste des problèmes : index absents ou dont les colonnes ne correspondent plus."""
+    problems = []
+    for name, table, columns in indexes:
+        actual = tuple(row[2] for row in conn.execute(f"PRAGMA index_info({name})"))
+        if not actual:
+            problems.append(f"{name} : absent")
+        elif actual != tuple(columns):
+            problems.append(f"{name} : colonnes {actual} au lieu de {tuple(columns)}")
+    return problems
+
+
+# --- CATALOGUE DES REQUÊTES DE app.py ---
+# Paramètres d'exemple : EXPLAIN QUERY PLAN ne dépend pas des valeurs, seulement de la forme.
+_JOIN = "FROM resultats r JOIN liste_concours lc ON r.id_concours = lc.id_concours"
+
+APP_QUERIES = {
+    "dashboard_kpis": (DASHBOARD_KPIS_SQL, ()),
+    "dashboard_recents": ("""
+        SELECT lc.date_concours, lc.nom_concours,
+               (SELECT COUNT(*) FROM resultats r WHERE r.id_concours = lc.id_concours) / 3
+        FROM liste_concours lc
+        ORDER BY lc.date_key DESC
+        LIMIT 10
+    """, ()),
+    "dashboard_top_races": ("""
+        SELECT race, COUNT(*) as nb FROM resultats
+        WHERE race IS NOT NULL AND race != '' GROUP BY race ORDER BY nb DESC LIMIT 10
+    """, ()),
+    "recherche": search_query("Pixi"),
+    "recherche_courte": search_query("Pi"),
+    "profil_resume": profile_summary_query(1),
+    "profil_contexte": couple_context_query(1, "2025"),
+    "profil_parcours_saison": couple_runs_query(1, "2025"),
+    "profil_distributions": distributions_query("2025", [("race", "Border Collie"), ("grade", "1"),
+                                                         ("region", "BRETAGNE"), ("saison", "")]),
+    "profil_historique": history_page_query(1),
+    "profil_historique_suite": history_page_query(1, "%Agility%", cursor=(20250601, 1000)),
+    "profil_historique_saison": history_page_query(1, annee="2025", cursor=(20250601, 1000)),
+    "top10_races": ("""
+        SELECT DISTINCT race FROM resultats WHERE race IS NOT NULL AND race != '' ORDER BY race
+    """, ()),
+    "top10_race": top_k_query("Border Collie"),
+    "top10_race_filtres": top_k_query("Border Collie", type_epreuve="Agility", grade=2, annee="2025"),
+    "saisons": seasons_query(),
+    "regions": region_stats_query(),
+    "regions_filtres": region_stats_query(annee="2025", grade=1),
+    "juges": judge_stats_query(),
+    "juges_grade": judge_stats_query(grade=1),
+    "juge_parcours": judge_courses_query("DUPONT", grade=1),
+    "versus_global": ("""
+        SELECT COUNT(id), AVG(vitesse_num), SUM(is_clean) FROM resultats WHERE id_couple = ?
+    """, (1,)),
+    "versus_rivaux": top_rivals_query(1),
+    "versus_bilan": head_to_head_query(1, 2),
+    "elo_historique": rating_history_query(1),
+    "elo_classement": leaderboard_query(),
+    "elo_classement_race": leaderboard_query(race="Border Collie"),
+    "versus_duels": duel_averages_query(1, 2),
+    "versus_feuille": duel_page_query(1, 2),
+    "versus_feuille_suite": duel_page_query(1, 2, cursor=(20250601, 1000)),
+}
+
+
+# --- CONSEILLER ---
+# "SCAN t" seul = parcours de la table entière ; "SCAN t USING COVERING INDEX" reste acceptable
+# pour les agrégats globaux (lecture séquentielle d'un index plus étroit que la table), de même
+# qu'un MATCH sur une table virtuelle FTS5 (qui passe par son propre index).
+_FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\w+)(?!\w)(?! USING COVERING INDEX| VIRTUAL TABLE)")
+
+
+def advise(conn, queries=None):
+    """Renvoie {nom: (plan, tables parcourues en entier)} pour chaque requête du catalogue."""
+    report = {}
+    for name, (sql, params) in (queries or APP_QUERIES).items():
+        plan = explain(conn, sql, params)
+        scans = [m.group(1) for m in map(_FULL_SCAN.match, plan) if m]
+        report[name] = (plan, scans)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vérifie les index et les plans de requêtes de K9-Tracker.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    parser.add_argument("--create", action="store_true", help="crée les index manquants avant l'analyse")
+    parser.add_argument("--strict", action="store_true", help="code retour 1 si un plan parcourt une table")
+    args = parser.parse_args(argv)
+
+    conn = open_readwrite(args.db_path) if args.create else open_readonly(args.db_path)
+    try:
+        if args.create:
+            create_indexes(conn)
+        problems = verify_indexes(conn)
+        for problem in problems:
+            print(f"⚠️  Index {problem}")
+        if not problems:
+            print(f"✅ {len(INDEXES)} index présents.")
+
+        flagged = 0
+        for name, (plan, scans) in advise(conn).items():
+            status = f"⚠️  SCAN {', '.join(scans)}" if scans else "✅"
+            print(f"\n{status}  {name}")
+            for line in plan:
+                print(f"    {line}")
+            flagged += bool(scans)
+        print(f"\n{flagged} requête(s) sur {len(APP_QUERIES)} parcourent encore une table entière.")
+    finally:
+        conn.close()
+
+    if args.strict and (flagged or problems):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
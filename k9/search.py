@@ -0,0 +1,110 @@
+"""Index de recherche des couples (chien + conducteur) : FTS5 trigrammes, sans accents ni casse."""
+import unicodedata
+
+from k9.changes import touched_couples_sql
+
+# Le tokenizer trigram ne sait pas chercher moins de 3 caractères : en dessous,
+# on retombe sur un LIKE, mais sur la petite table des couples et non sur resultats.
+MIN_TRIGRAM = 3
+
+
+def fold(text):
+    """Majuscules sans accents ni espaces superflus : 'Éclair  de l'Étang' -> 'ECLAIR DE L'ETANG'."""
+    if text is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.upper().split())
+
+
+def search_key(nom_chien, conducteur):
+    return f"{fold(nom_chien)} | {fold(conducteur)}"
+
+
+def create_search_tables(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS recherche_couples (
+            id_couple PRIMARY KEY,
+            nom_chien TEXT,
+            conducteur TEXT,
+            race TEXT,
+            cle TEXT,
+            nb_parcours INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_recherche_activite ON recherche_couples (nb_parcours);
+        CREATE VIRTUAL TABLE IF NOT EXISTS recherche_fts USING fts5(cle, tokenize = 'trigram');
+    """)
+
+
+# Une ligne par couple : noms de la participation la plus récente (MAX(rowid)) et volume d'activité
+_COUPLES_SQL = """
+    SELECT id_couple, nom_chien, conducteur, race, COUNT(*) AS nb_parcours, MAX(rowid)
+    FROM resultats
+    {where}
+    GROUP BY id_couple
+"""
+
+
+def _upsert(conn, rows):
+    for id_couple, nom_chien, conducteur, race, nb_parcours, _ in rows:
+        cle = search_key(nom_chien, conducteur)
+        conn.execute("""
+            INSERT INTO recherche_couples (id_couple, nom_chien, conducteur, race, cle, nb_parcours)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id_couple) DO UPDATE SET
+                nom_chien = excluded.nom_chien, conducteur = excluded.conducteur,
+                race = excluded.race, cle = excluded.cle, nb_parcours = excluded.nb_parcours
+        """, (id_couple, nom_chien, conducteur, race, cle, nb_parcours))
+        rowid = conn.execute("SELECT rowid FROM recherche_couples WHERE id_couple = ?", (id_couple,)).fetchone()[0]
+        conn.execute("DELETE FROM recherche_fts WHERE rowid = ?", (rowid,))
+        conn.execute("INSERT INTO recherche_fts (rowid, cle) VALUES (?, ?)", (rowid, cle))
+
+
+def rebuild_search_index(conn):
+    """Reconstruction complète (migration initiale ou réparation)."""
+    create_search_tables(conn)
+    conn.execute("DELETE FROM recherche_couples")
+    conn.execute("DELETE FROM recherche_fts")
+    _upsert(conn, conn.execute(_COUPLES_SQL.format(where="")).fetchall())
+    conn.commit()
+
+
+def refresh_search_index(conn, concours_ids):
+    """Mise à jour incrémentale : seuls les couples ayant couru les concours chargés (ou retirés
+    au rechargement) sont recalculés ; ceux qui n'ont plus aucune ligne sortent de l'index."""
+    ids = list(concours_ids)
+    if not ids:
+        return
+    couples, params = touched_couples_sql(ids)
+    where = f"WHERE id_couple IN ({couples})"
+    _upsert(conn, conn.execute(_COUPLES_SQL.format(where=where), params).fetchall())
+    gone = """
+        SELECT rowid FROM recherche_couples
+        WHERE id_couple IN (SELECT id_couple FROM couples_retires)
+          AND NOT EXISTS (SELECT 1 FROM resultats r WHERE r.id_couple = recherche_couples.id_couple)
+    """
+    conn.execute(f"DELETE FROM recherche_fts WHERE rowid IN ({gone})")
+    conn.execute(f"DELETE FROM recherche_couples WHERE rowid IN ({gone})")
+    conn.commit()
+
+
+def search_query(text, limit=50):
+    """Renvoie (sql, params) pour load_data : couples correspondant à `text`, les plus actifs d'abord."""
+    folded = fold(text)
+    if len(folded) >= MIN_TRIGRAM:
+        phrase = '"' + folded.replace('"', '""') + '"'
+        return """
+            SELECT c.id_couple, c.nom_chien, c.conducteur, c.race
+            FROM recherche_fts f
+            JOIN recherche_couples c ON c.rowid = f.rowid
+            WHERE recherche_fts MATCH ?
+            ORDER BY c.nb_parcours DESC
+            LIMIT ?
+        """, (phrase, limit)
+    return """
+        SELECT id_couple, nom_chien, conducteur, race
+        FROM recherche_couples
+        WHERE cle LIKE ?
+        ORDER BY nb_parcours DESC
+        LIMIT ?
+    """, (f"%{folded}%", limit)
@@ -0,0 +1,191 @@
+"""Découpage des résultats par saison : clé de date entière, élagage des filtres année, saisons fermées.
+
+liste_concours porte la partition : date_key (AAAAMMJJ entier) et annee, tenues à jour par
+triggers et indexées. Un filtre "année" devient un intervalle sur date_key : SQLite ne lit que
+les concours de la saison, puis leurs résultats par idx_resultats_concours_epreuve, au lieu de
+calculer SUBSTR(date_concours, 7, 4) sur toutes les lignes.
+
+Une saison fermée est en lecture seule : les triggers refusent toute écriture dans ses
+concours ou ses résultats, ce qui garantit que les tables dérivées et les caches la concernant
+ne changeront plus.
+
+Usage : python -m k9.seasons [chemin_de_la_base] [--fermer ANNEE ...] [--rouvrir ANNEE ...]
+"""
+import argparse
+
+from k9.db import DB_PATH, open_readwrite
+from k9.dimensions import date_key_sql
+
+
+def _season_of(id_concours_expr):
+    return f"(SELECT annee FROM liste_concours WHERE id_concours = {id_concours_expr})"
+
+
+def _closed(annee_expr):
+    return f"EXISTS (SELECT 1 FROM saisons WHERE annee = {annee_expr} AND fermee = 1)"
+
+
+def create_season_tables(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(liste_concours)")}
+    for name in ("date_key", "annee"):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE liste_concours ADD COLUMN {name} INTEGER")
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS saisons (
+            annee INTEGER PRIMARY KEY,
+            date_debut INTEGER, date_fin INTEGER,
+            nb_concours INTEGER, nb_resultats INTEGER,
+            fermee INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_liste_concours_date
+            ON liste_concours (date_key, id_concours, date_concours, nom_concours);
+
+        DROP TRIGGER IF EXISTS liste_concours_date_insert;
+        CREATE TRIGGER liste_concours_date_insert AFTER INSERT ON liste_concours
+        BEGIN
+            UPDATE liste_concours SET date_key = {date_key_sql("NEW.date_concours")},
+                                      annee = {date_key_sql("NEW.date_concours")} / 10000
+            WHERE rowid = NEW.rowid;
+        END;
+
+        DROP TRIGGER IF EXISTS liste_concours_date_update;
+        CREATE TRIGGER liste_concours_date_update AFTER UPDATE OF date_concours ON liste_concours
+        BEGIN
+            UPDATE liste_concours SET date_key = {date_key_sql("NEW.date_concours")},
+                                      annee = {date_key_sql("NEW.date_concours")} / 10000
+            WHERE rowid = NEW.rowid;
+        END;
+
+        DROP TRIGGER IF EXISTS liste_concours_saison_fermee;
+        CREATE TRIGGER liste_concours_saison_fermee
+        BEFORE UPDATE OF id_concours, nom_concours, date_concours ON liste_concours
+        WHEN {_closed("OLD.annee")} OR {_closed(date_key_sql("NEW.date_concours") + " / 10000")}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : concours en lecture seule');
+        END;
+
+        DROP TRIGGER IF EXISTS liste_concours_saison_fermee_insert;
+        CREATE TRIGGER liste_concours_saison_fermee_insert BEFORE INSERT ON liste_concours
+        WHEN {_closed(date_key_sql("NEW.date_concours") + " / 10000")}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : concours en lecture seule');
+        END;
+
+        DROP TRIGGER IF EXISTS liste_concours_saison_fermee_delete;
+        CREATE TRIGGER liste_concours_saison_fermee_delete BEFORE DELETE ON liste_concours
+        WHEN {_closed("OLD.annee")}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : concours en lecture seule');
+        END;
+
+        DROP TRIGGER IF EXISTS resultats_saison_fermee_insert;
+        CREATE TRIGGER resultats_saison_fermee_insert BEFORE INSERT ON resultats
+        WHEN {_closed(_season_of("NEW.id_concours"))}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : résultats en lecture seule');
+        END;
+
+        DROP TRIGGER IF EXISTS resultats_saison_fermee_update;
+        CREATE TRIGGER resultats_saison_fermee_update BEFORE UPDATE ON resultats
+        WHEN {_closed(_season_of("OLD.id_concours"))} OR {_closed(_season_of("NEW.id_concours"))}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : résultats en lecture seule');
+        END;
+
+        DROP TRIGGER IF EXISTS resultats_saison_fermee_delete;
+        CREATE TRIGGER resultats_saison_fermee_delete BEFORE DELETE ON resultats
+        WHEN {_closed(_season_of("OLD.id_concours"))}
+        BEGIN
+            SELECT RAISE(ABORT, 'saison fermée : résultats en lecture seule');
+        END;
+    """)
+
+
+def _update_seasons(conn, annees=None):
+    """Recalcule l'étendue et les volumes des saisons (toutes si annees=None) ; le drapeau fermee est conservé."""
+    where, params = "", ()
+    if annees is not None:
+        annees = list(annees)
+        if not annees:
+            return
+        where, params = f"AND lc.annee IN ({', '.join('?' * len(annees))})", tuple(annees)
+        conn.execute(f"DELETE FROM saisons WHERE annee IN ({', '.join('?' * len(annees))}) "
+                     "AND annee NOT IN (SELECT annee FROM liste_concours WHERE annee IS NOT NULL)", params)
+    conn.execute(f"""
+        INSERT INTO saisons (annee, date_debut, date_fin, nb_concours, nb_resultats)
+        SELECT lc.annee, MIN(lc.date_key), MAX(lc.date_key), COUNT(*),
+               SUM((SELECT COUNT(*) FROM resultats r WHERE r.id_concours = lc.id_concours))
+        FROM liste_concours lc
+        WHERE lc.annee IS NOT NULL {where}
+        GROUP BY lc.annee
+        ON CONFLICT (annee) DO UPDATE SET
+            date_debut = excluded.date_debut, date_fin = excluded.date_fin,
+            nb_concours = excluded.nb_concours, nb_resultats = excluded.nb_resultats
+    """, params)
+
+
+def rebuild_seasons(conn):
+    create_season_tables(conn)
+    conn.execute(f"UPDATE liste_concours SET date_key = {date_key_sql('date_concours')}, "
+                 f"annee = {date_key_sql('date_concours')} / 10000")
+    conn.execute("DELETE FROM saisons WHERE annee NOT IN (SELECT annee FROM liste_concours WHERE annee IS NOT NULL)")
+    _update_seasons(conn)
+    conn.commit()
+
+
+def refresh_seasons(conn, concours_ids):
+    ids = list(concours_ids)
+    if not ids:
+        return
+    annees = {a for (a,) in conn.execute(
+        f"SELECT DISTINCT annee FROM liste_concours WHERE id_concours IN ({', '.join('?' * len(ids))})", ids)}
+    _update_seasons(conn, annees)
+    conn.commit()
+
+
+def set_closed(conn, annee, fermee=True):
+    """Ferme (lecture seule) ou rouvre une saison."""
+    conn.execute("UPDATE saisons SET fermee = ? WHERE annee = ?", (int(fermee), annee))
+    conn.commit()
+
+
+def season_bounds(annee):
+    """Intervalle [début, fin] de date_key couvrant la saison `annee`."""
+    annee = int(annee)
+    return annee * 10000 + 101, annee * 10000 + 1231
+
+
+def season_filter_sql(annee, concours_col="r.id_concours"):
+    """(condition, params) limitant `concours_col` aux concours d'une saison (élagage par date_key)."""
+    return (f"{concours_col} IN (SELECT id_concours FROM liste_concours WHERE date_key BETWEEN ? AND ?)",
+            season_bounds(annee))
+
+
+def seasons_query():
+    """(sql, params) des saisons présentes, de la plus récente à la plus ancienne (texte, comme les filtres)."""
+    return "SELECT CAST(annee AS TEXT) AS annee FROM saisons ORDER BY saisons.annee DESC", ()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Liste, ferme ou rouvre les saisons.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    parser.add_argument("--fermer", nargs="+", type=int, default=[], metavar="ANNEE")
+    parser.add_argument("--rouvrir", nargs="+", type=int, default=[], metavar="ANNEE")
+    args = parser.parse_args(argv)
+
+    conn = open_readwrite(args.db_path)
+    try:
+        for annee in args.fermer:
+            set_closed(conn, annee, True)
+        for annee in args.rouvrir:
+            set_closed(conn, annee, False)
+        for annee, debut, fin, nb_concours, nb_resultats, fermee in conn.execute(
+                "SELECT * FROM saisons ORDER BY annee"):
+            etat = "fermée" if fermee else "ouverte"
+            print(f"{annee}  {debut} → {fin}  {nb_concours:>5} concours  {nb_resultats:>9,} résultats  {etat}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
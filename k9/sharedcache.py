@@ -0,0 +1,218 @@
+"""Cache de résultats sur disque, partagé par tous les processus Streamlit de la machine.
+
+Le cache de k9.cache vit dans chaque processus : derrière un répartiteur de charge, les
+agrégats coûteux (juges, régions...) seraient recalculés une fois par worker après chaque
+déploiement ou rechargement. Celui-ci est un fichier SQLite (mode WAL) à côté de la base :
+- DataFrames sérialisés en binaire compact (pickle protocole 5, compressé zlib) ;
+- écritures atomiques : une entrée est écrite dans une transaction, jamais à moitié ;
+- un seul calcul par entrée manquante : le premier worker pose un bail dans la table
+  calculs, les autres attendent que l'entrée apparaisse (ou que le bail expire) ;
+- invalidation par version : chaque entrée porte la version de la base de résultats
+  (k9.cache.db_version) ; une entrée d'une autre version est ignorée puis purgée.
+
+N'y passent que les requêtes marquées shared=True (k9.ui.load_data / load_many) : pour
+une requête de quelques millisecondes, le bail coûterait plus cher que le calcul.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+from k9 import db
+from k9.cache import db_version, normalize_sql
+
+# --- RÉGLAGES ---
+MAX_BYTES = 512 * 1024 * 1024      # Taille maximale des données en cache sur disque
+LEASE_SECONDS = 120                # Au-delà, le bail d'un worker disparu est repris
+POLL_SECONDS = 0.05                # Attente entre deux vérifications quand un autre worker calcule
+COMPRESSION_LEVEL = 1              # zlib rapide : le gain de taille est déjà important
+
+
+def cache_path():
+    return os.environ.get("K9_SHARED_CACHE") or f"{db.DB_PATH}.cache"
+
+
+def cache_key(query, params=(), schema=None):
+    raw = normalize_sql(query) + "\x00" + repr(tuple(params))
+    if schema:
+        raw += "\x00" + repr(tuple(schema.items()))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def dumps(df):
+    return zlib.compress(pickle.dumps(df, protocol=5), COMPRESSION_LEVEL)
+
+
+def loads(blob):
+    return pickle.loads(zlib.decompress(blob))
+
+
+class SharedCache:
+    """Cache clé -> DataFrame dans un fichier SQLite, sûr entre threads et entre processus."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, lease=LEASE_SECONDS, version_func=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lease = lease
+        self.version_func = version_func or (lambda: repr(db_version()))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "calculs": 0, "attentes": 0, "baux_repris": 0,
+                       "ecritures": 0, "purges_version": 0, "evictions": 0}
+        self._known_version = None
+        conn = self._conn()
+        conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS entrees (
+                cle TEXT PRIMARY KEY, version TEXT NOT NULL, cree_le REAL NOT NULL,
+                octets INTEGER NOT NULL, donnees BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entrees_cree_le ON entrees (cree_le);
+            CREATE TABLE IF NOT EXISTS calculs (cle TEXT PRIMARY KEY, pid INTEGER, expire REAL NOT NULL);
+        """)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _read(self, key, version):
+        row = self._conn().execute("SELECT version, donnees FROM entrees WHERE cle = ?", (key,)).fetchone()
+        if row is None or row[0] != version:
+            return None
+        return loads(row[1])
+
+    def _check_version(self, version):
+        """Au premier passage sur une nouvelle version de la base, purge les entrées des autres."""
+        if version == self._known_version:
+            return
+        deleted = self._conn().execute("DELETE FROM entrees WHERE version != ?", (version,)).rowcount
+        if deleted:
+            self._count("purges_version", deleted)
+        self._known_version = version
+
+    def _try_lease(self, key):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stale = conn.execute("DELETE FROM calculs WHERE cle = ? AND expire < ?", (key, now)).rowcount
+            taken = conn.execute("INSERT OR IGNORE INTO calculs (cle, pid, expire) VALUES (?, ?, ?)",
+                                 (key, os.getpid(), now + self.lease)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if stale and taken:
+            self._count("baux_repris")
+        return bool(taken)
+
+    def _release(self, key):
+        self._conn().execute("DELETE FROM calculs WHERE cle = ? AND pid = ?", (key, os.getpid()))
+
+    def _write(self, key, version, df):
+        blob = dumps(df)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO entrees (cle, version, cree_le, octets, donnees) VALUES (?, ?, ?, ?, ?)",
+                         (key, version, time.time(), len(blob), blob))
+            (total,) = conn.execute("SELECT COALESCE(SUM(octets), 0) FROM entrees").fetchone()
+            evicted = 0
+            if total > self.max_bytes:
+                # Les plus anciennes d'abord, jusqu'à repasser sous le budget
+                for old_key, size in conn.execute(
+                        "SELECT cle, octets FROM entrees WHERE cle != ? ORDER BY cree_le", (key,)).fetchall():
+                    conn.execute("DELETE FROM entrees WHERE cle = ?", (old_key,))
+                    evicted += 1
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._count("ecritures")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def get_or_compute(self, key, compute):
+        """(DataFrame, trouvé en cache) ; compute() n'est appelé que par un seul worker à la fois par clé."""
+        version = self.version_func()
+        self._check_version(version)
+        df = self._read(key, version)
+        if df is not None:
+            self._count("hits")
+            return df, True
+        self._count("misses")
+        waited = False
+        while True:
+            if self._try_lease(key):
+                try:
+                    # Un autre worker a pu terminer entre la lecture et la prise du bail
+                    df = self._read(key, version)
+                    if df is not None:
+                        return df, True
+                    self._count("calculs")
+                    df = compute()
+                    self._write(key, version, df)
+                    return df, False
+                finally:
+                    self._release(key)
+            if not waited:
+                self._count("attentes")
+                waited = True
+            time.sleep(POLL_SECONDS)
+            df = self._read(key, version)
+            if df is not None:
+                return df, True
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entrees")
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["entrees"], s["octets"] = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(octets), 0) FROM entrees").fetchone()
+        lookups = s["hits"] + s["misses"]
+        s["taux_hit"] = (s["hits"] / lookups) if lookups else 0.0
+        return s
+
+
+_shared = None
+_shared_lock = threading.Lock()
+_disabled = False
+
+
+def get_shared_cache():
+    """Cache disque du processus ; None s'il est désactivé (K9_SHARED_CACHE=0) ou inaccessible."""
+    global _shared, _disabled
+    if _shared is None and not _disabled:
+        with _shared_lock:
+            if _shared is None and not _disabled:
+                if cache_path() == "0":
+                    _disabled = True
+                    return None
+                try:
+                    _shared = SharedCache(cache_path())
+                except sqlite3.Error as exc:
+                    _disabled = True
+                    print(f"[k9] cache disque désactivé ({cache_path()}) : {exc}", file=sys.stderr)
+    return _shared
+
+
+def shared_cache_stats():
+    cache = get_shared_cache()
+    return cache.stats() if cache is not None else {"actif": False}
@@ -0,0 +1,360 @@
+"""Instantané en colonnes de resultats pour les pages d'agrégats (régions, juges, races).
+
+Chaque colonne est un fichier .npy à largeur fixe (entiers, flottants) ; les libellés sont
+encodés par dictionnaire : codes entiers en .npy + liste des valeurs distinctes en JSON.
+Les fichiers sont projetés en mémoire en lecture seule (np.load(mmap_mode="r")) : tous
+les processus Streamlit partagent les mêmes pages du cache du système, et les regroupements
+se font par np.bincount sur les codes, sans décoder une seule ligne SQLite.
+
+Disposition : <base>.colonnes/<version>/ + le fichier COURANT, qui désigne la version
+publiée. Un export écrit une nouvelle version puis remplace COURANT atomiquement ; un
+lecteur ne voit donc jamais un instantané à moitié écrit. L'instantané est reconstruit
+par k9.refresh, mais seulement s'il a déjà été exporté une première fois.
+
+Le manifeste note l'empreinte du contenu exporté (content_version) : après une écriture que
+l'instantané n'a pas vue (k9.ingest --sans-refresh, UPDATE à la main...), get_snapshot()
+renvoie None et les pages repassent par SQL. L'empreinte n'est recalculée que si le fichier de la base a changé
+(k9.cache.db_version).
+
+Usage : python -m k9.snapshot [chemin_de_la_base] [--garder 2]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from k9 import db
+from k9.cache import db_version
+from k9.changes import change_count
+from k9.db import DB_PATH, open_readonly
+from k9.dimensions import PAYS_ETRANGERS, grade_sql, type_epreuve_sql
+
+# --- RÉGLAGES ---
+CHUNK_ROWS = 200_000               # Lignes lues par fetchmany pendant l'export
+KEEP_VERSIONS = 2                  # Versions conservées : un lecteur peut encore lire la précédente
+FORMAT = 3                         # 3 : compteur de modifications dans l'empreinte du contenu
+
+# Colonnes numériques : nom -> (expression SQL, dtype, valeur si NULL)
+NUMERIC_COLUMNS = {
+    "id_concours": ("r.id_concours", "int32", 0),
+    "date_key": ("lc.date_key", "int32", 0),
+    "grade": (grade_sql(), "int8", 0),
+    "vitesse_num": ("r.vitesse_num", "float64", np.nan),
+    "temps_num": ("r.temps_num", "float64", np.nan),
+    "penalites_num": ("r.penalites_num", "float64", np.nan),
+    "is_clean": ("r.is_clean", "int8", 0),
+    "is_eliminated": ("r.is_eliminated", "int8", 0),
+}
+# Colonnes encodées par dictionnaire : nom -> expression SQL (NULL devient '')
+DICTIONARY_COLUMNS = {
+    "region": "UPPER(TRIM(r.region))",
+    "juge": "UPPER(TRIM(r.juge))",
+    "race": "r.race",
+    "nom_epreuve": "r.nom_epreuve",
+    "type_epreuve": type_epreuve_sql(),
+}
+
+
+def snapshot_dir(db_path=None):
+    return os.environ.get("K9_SNAPSHOT_DIR") or f"{db_path or db.DB_PATH}.colonnes"
+
+
+def _db_file(conn):
+    return next(row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main")
+
+
+def content_version(conn):
+    """Empreinte du contenu exporté : [version du schéma, lignes de resultats, compteur de modifications].
+
+    Le compteur de k9.changes avance à chaque INSERT, UPDATE ou DELETE sur resultats et
+    liste_concours, y compris une mise à jour sur place.
+    """
+    (user_version,) = conn.execute("PRAGMA user_version").fetchone()
+    (lignes,) = conn.execute("SELECT COUNT(*) FROM resultats").fetchone()
+    return [user_version, lignes, change_count(conn)]
+
+
+# --- EXPORT ---
+class _Dictionary:
+    """Encodage incrémental : valeur -> code, dans l'ordre de première apparition."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, column):
+        values = pd.Series(column, dtype=object).fillna("")
+        for value in pd.unique(values):
+            if value not in self.codes:
+                self.codes[value] = len(self.values)
+                self.values.append(value)
+        return values.map(self.codes).to_numpy()
+
+
+def export_snapshot(conn, directory=None, keep=KEEP_VERSIONS):
+    """Écrit une nouvelle version de l'instantané puis la publie ; renvoie son chemin."""
+    directory = directory or snapshot_dir(_db_file(conn))
+    # Nom unique même pour deux exports dans la même seconde (même processus ou non)
+    os.makedirs(directory, exist_ok=True)
+    target = tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=directory)
+    os.chmod(target, 0o755)        # mkdtemp crée en 0700 : les autres processus doivent pouvoir lire
+    version = os.path.basename(target)
+
+    # COUNT(*) et lecture dans une même transaction : un écrivain ne peut rien glisser entre
+    # les deux (sinon lignes manquantes, ou lignes à zéro en fin de colonne comptées dans les agrégats)
+    conn.execute("BEGIN")
+    try:
+        contenu = content_version(conn)
+        n = contenu[1]
+
+        def column_file(name, dtype):
+            return np.lib.format.open_memmap(os.path.join(target, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n,))
+
+        numeric = {name: column_file(name, dtype) for name, (_, dtype, _) in NUMERIC_COLUMNS.items()}
+        codes = {name: column_file(name, "int32") for name in DICTIONARY_COLUMNS}
+        dictionaries = {name: _Dictionary() for name in DICTIONARY_COLUMNS}
+
+        expressions = [expr for expr, _, _ in NUMERIC_COLUMNS.values()] + list(DICTIONARY_COLUMNS.values())
+        cursor = conn.execute(f"""
+            SELECT {', '.join(expressions)}
+            FROM resultats r
+            LEFT JOIN liste_concours lc ON r.id_concours = lc.id_concours
+        """)
+        start = 0
+        while start < n:
+            rows = cursor.fetchmany(min(CHUNK_ROWS, n - start))
+            if not rows:
+                break
+            chunk = pd.DataFrame.from_records(rows, columns=list(NUMERIC_COLUMNS) + list(DICTIONARY_COLUMNS))
+            stop = start + len(chunk)
+            for name, (_, dtype, missing) in NUMERIC_COLUMNS.items():
+                values = pd.to_numeric(chunk[name], errors="coerce").fillna(missing)
+                numeric[name][start:stop] = values.to_numpy(dtype=dtype)
+            for name in DICTIONARY_COLUMNS:
+                codes[name][start:stop] = dictionaries[name].encode(chunk[name])
+            start = stop
+    finally:
+        conn.commit()               # Fin de la transaction de lecture
+
+    for array in list(numeric.values()) + list(codes.values()):
+        array.flush()
+    columns = {name: str(dtype) for name, (_, dtype, _) in NUMERIC_COLUMNS.items()}
+    for name, dictionary in dictionaries.items():
+        with open(os.path.join(target, f"{name}.dict.json"), "w", encoding="utf-8") as f:
+            json.dump(dictionary.values, f, ensure_ascii=False)
+        columns[name] = "dictionnaire/int32"
+    with open(os.path.join(target, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "version": version, "lignes": start, "contenu": contenu,
+                   "colonnes": columns, "cree_le": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=2)
+
+    # Publication atomique : COURANT désigne la nouvelle version
+    pointer = os.path.join(directory, "COURANT")
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    _prune(directory, keep)
+    return target
+
+
+def _prune(directory, keep):
+    """Supprime les versions les plus anciennes, jamais celle que désigne COURANT."""
+    with open(os.path.join(directory, "COURANT"), encoding="utf-8") as f:
+        current = f.read().strip()
+    versions = sorted(d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d)))
+    for old in versions[:-keep]:
+        if old != current:
+            shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+
+def rebuild_snapshot(conn):
+    """Réexporte l'instantané s'il existe déjà (l'export initial se fait par la ligne de commande)."""
+    if os.path.exists(os.path.join(snapshot_dir(_db_file(conn)), "COURANT")):
+        export_snapshot(conn)
+
+
+def refresh_snapshot(conn, concours_ids):
+    """Pas de mise à jour partielle : des fichiers à largeur fixe se réécrivent en entier."""
+    if list(concours_ids):
+        rebuild_snapshot(conn)
+
+
+# --- LECTURE ---
+class Snapshot:
+    """Colonnes d'une version, toutes projetées en mémoire à l'ouverture.
+
+    Projeter ne lit rien : seules les pages touchées par un calcul sont chargées, et une fois
+    projetés les fichiers restent lisibles même si une version plus récente les supprime.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._checked = (None, False)      # (db_version vérifiée, instantané à jour ?)
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self._columns, self._dictionaries = {}, {}
+        for name, kind in self.manifest["colonnes"].items():
+            self._columns[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            if kind.startswith("dictionnaire"):
+                with open(os.path.join(path, f"{name}.dict.json"), encoding="utf-8") as f:
+                    self._dictionaries[name] = np.array(json.load(f), dtype=object)
+
+    def __len__(self):
+        return self.manifest["lignes"]
+
+    def column(self, name):
+        return self._columns[name]
+
+    def dictionary(self, name):
+        return self._dictionaries[name]
+
+    def is_current(self):
+        """L'instantané correspond-il encore à la base ? Empreinte relue seulement si le fichier a changé."""
+        version = db_version()
+        checked, current = self._checked
+        if version != checked:
+            with db.get_pool().connection() as conn:
+                current = self.manifest.get("contenu") == content_version(conn)
+            self._checked = (version, current)
+        return current
+
+    def code_of(self, name, value):
+        """Code d'une valeur d'une colonne encodée (-1 si absente)."""
+        matches = np.flatnonzero(self.dictionary(name) == value)
+        return int(matches[0]) if len(matches) else -1
+
+
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot(directory=None):
+    """Instantané publié (rouvert si COURANT a changé) ; None s'il n'a jamais été exporté
+    ou si la base a changé depuis l'export (les pages repassent alors par SQL)."""
+    global _snapshot, _snapshot_key
+    directory = directory or snapshot_dir()
+    pointer = os.path.join(directory, "COURANT")
+    try:
+        st = os.stat(pointer)
+    except FileNotFoundError:
+        return None
+    key = (pointer, st.st_mtime_ns, st.st_size)
+    if key != _snapshot_key:
+        with _snapshot_lock:
+            if key != _snapshot_key:
+                with open(pointer, encoding="utf-8") as f:
+                    _snapshot = Snapshot(os.path.join(directory, f.read().strip()))
+                _snapshot_key = key
+    snapshot = _snapshot
+    return snapshot if snapshot.is_current() else None
+
+
+# --- REGROUPEMENTS VECTORISÉS ---
+def _sums(codes, size, mask, **weights):
+    """Effectif et sommes pondérées par code, sur les lignes retenues par `mask`."""
+    kept = codes[mask]
+    sums = {"nb": np.bincount(kept, minlength=size)}
+    for name, values in weights.items():
+        sums[name] = np.bincount(kept, weights=values[mask], minlength=size)
+    return sums
+
+
+def _ratio(num, den):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def _grade_mask(snapshot, grade):
+    return True if grade is None else snapshot.column("grade") == grade
+
+
+def region_stats(snapshot, annee=None, grade=None, min_parcours=50):
+    """Mêmes colonnes et même ordre que region_stats_query (type_epreuve non filtré, comme la page)."""
+    regions = snapshot.dictionary("region")
+    francaise = (regions != "") & ~np.isin(regions, PAYS_ETRANGERS)
+    codes = snapshot.column("region")
+    date_key = snapshot.column("date_key")
+    mask = francaise[codes] & (date_key > 0) & _grade_mask(snapshot, grade)
+    if annee is not None:
+        mask &= (date_key // 10000) == int(annee)
+    vitesse = snapshot.column("vitesse_num")
+    has_speed = ~np.isnan(vitesse)
+    s = _sums(codes, len(regions), mask, nb_vitesse=has_speed, somme_vitesse=np.where(has_speed, vitesse, 0.0),
+              sans_faute=snapshot.column("is_clean"))
+    df = pd.DataFrame({
+        "Region": regions,
+        "Total_Parcours": s["nb"],
+        "Vitesse_Moyenne": _ratio(s["somme_vitesse"], s["nb_vitesse"]),
+        "Sans_Faute": s["sans_faute"].astype("int64"),
+    })
+    df = df[df["Total_Parcours"] > min_parcours]
+    return df.sort_values("Vitesse_Moyenne", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def judge_stats(snapshot, grade=None, min_parcours=30):
+    """Mêmes colonnes que judge_stats_query, triées par juge."""
+    juges = snapshot.dictionary("juge")
+    codes = snapshot.column("juge")
+    mask = (juges != "")[codes] & _grade_mask(snapshot, grade)
+    vitesse, temps = snapshot.column("vitesse_num"), snapshot.column("temps_num")
+    has_speed = ~np.isnan(vitesse)
+    distance = vitesse * temps
+    has_distance = ~np.isnan(distance)
+    s = _sums(codes, len(juges), mask,
+              nb_vitesse=has_speed, somme_vitesse=np.where(has_speed, vitesse, 0.0),
+              nb_distance=has_distance, somme_distance=np.where(has_distance, distance, 0.0),
+              sans_faute=snapshot.column("is_clean"), elimines=snapshot.column("is_eliminated"))
+
+    # Épreuves distinctes (id_concours, nom_epreuve) par juge, via une clé entière combinée
+    concours = snapshot.column("id_concours")[mask].astype("int64")
+    nb_noms, nb_concours = len(snapshot.dictionary("nom_epreuve")), int(concours.max(initial=0)) + 1
+    keys = (codes[mask].astype("int64") * nb_noms + snapshot.column("nom_epreuve")[mask]) * nb_concours + concours
+    nb_epreuves = np.bincount(np.unique(keys) // (nb_noms * nb_concours), minlength=len(juges))
+
+    df = pd.DataFrame({
+        "Juge": juges,
+        "Total_Parcours": s["nb"],
+        "Vitesse_Moyenne": _ratio(s["somme_vitesse"], s["nb_vitesse"]),
+        "Distance_Moyenne": _ratio(s["somme_distance"], s["nb_distance"]),
+        "Sans_Faute": s["sans_faute"].astype("int64"),
+        "Elimines": s["elimines"].astype("int64"),
+        "Nb_Epreuves": nb_epreuves,
+    })
+    return df[df["Total_Parcours"] > min_parcours].sort_values("Juge").reset_index(drop=True)
+
+
+def top_races(snapshot, limit=10):
+    """Races les plus courues (colonnes race, nb), comme la requête du tableau de bord."""
+    races = snapshot.dictionary("race")
+    nb = np.bincount(snapshot.column("race"), minlength=len(races))
+    df = pd.DataFrame({"race": races, "nb": nb})
+    df = df[(df["race"] != "") & (df["nb"] > 0)]
+    return df.sort_values("nb", ascending=False, kind="stable").head(limit).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporte l'instantané en colonnes de resultats.")
+    parser.add_argument("db_path", nargs="?", default=DB_PATH)
+    parser.add_argument("--garder", type=int, default=KEEP_VERSIONS, help="versions conservées sur disque")
+    args = parser.parse_args(argv)
+
+    conn = open_readonly(args.db_path)
+    try:
+        t0 = time.perf_counter()
+        path = export_snapshot(conn, snapshot_dir(args.db_path), args.garder)
+    finally:
+        conn.close()
+    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    print(f"✅ {path} : {Snapshot(path).manifest['lignes']:,} lignes, {size / 1e6:.1f} Mo "
+          f"en {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Mesure du démarrage à froid d'un worker Streamlit.
+
+Deux outils :
+- stage() chronomètre une étape (imports, premier accès à la base, import et premier rendu
+  d'une page) ; seul le premier passage de chaque étape dans le processus est retenu, c'est-à-dire
+  le coût à froid. startup_report() les restitue (panneau admin de app.py) ;
+- la ligne de commande relance les imports dans un interpréteur neuf avec `-X importtime` et
+  affiche les modules les plus coûteux, pour suivre l'effet d'une nouvelle dépendance.
+
+Usage : python -m k9.startup [--page NOM] [--top N]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+_PROCESS_START = time.perf_counter()
+_STAGES = {}          # nom -> durée en secondes, dans l'ordre du premier passage
+_reported = False
+
+
+@contextmanager
+def stage(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _STAGES.setdefault(name, time.perf_counter() - t0)
+
+
+def startup_report():
+    """Durée à froid de chaque étape, en ms ("premier rendu" part du chargement de k9.startup)."""
+    return {name: round(seconds * 1000, 1) for name, seconds in _STAGES.items()}
+
+
+def mark_first_render():
+    """À appeler en fin de script : note le premier rendu complet et l'écrit une fois sur stderr."""
+    global _reported
+    _STAGES.setdefault("premier rendu", time.perf_counter() - _PROCESS_START)
+    if not _reported:
+        _reported = True
+        etapes = ", ".join(f"{name} {ms:.0f} ms" for name, ms in startup_report().items())
+        print(f"[k9] démarrage à froid : {etapes}", file=sys.stderr)
+
+
+# --- PROFIL D'IMPORT (-X importtime) ---
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_profile(modules, depth=1):
+    """[(module, niveau, cumul_us, propre_us)] des imports d'un interpréteur neuf, jusqu'au niveau `depth`."""
+    code = "; ".join(f"import {m}" for m in modules)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=project_root)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match and len(match.group(3)) // 2 < depth:
+            rows.append((match.group(4), len(match.group(3)) // 2, int(match.group(2)), int(match.group(1))))
+    return rows
+
+
+def main(argv=None):
+    from k9.pages import PAGES
+
+    parser = argparse.ArgumentParser(description="Profil des imports au démarrage à froid d'une page.")
+    parser.add_argument("--page", choices=sorted(PAGES.values()),
+                        help="page à importer en plus du socle (toutes par défaut)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--depth", type=int, default=2, help="niveaux d'imports imbriqués affichés")
+    args = parser.parse_args(argv)
+
+    pages = [args.page] if args.page else list(PAGES.values())
+    modules = ["streamlit", "k9.ui", "k9.pages"] + [f"k9.pages.{p}" for p in pages]
+    rows = import_profile(modules, args.depth)
+    total = sum(cumul for _, niveau, cumul, _ in rows if niveau == 0)
+    print(f"Imports de {', '.join(modules)} : {total / 1000:.0f} ms au total")
+    for name, niveau, cumul, propre in sorted(rows, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumul / 1000:8.1f} ms  (propre {propre / 1000:6.1f} ms)  {'  ' * niveau}{name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Accès aux données et composants partagés par les pages Streamlit."""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from k9.analytics import fetch
+from k9.db import DB_PATH
+from k9.history import PAGE_SIZE, next_cursor
+from k9.querylog import get_query_log
+
+# --- RÉGLAGES ---
+MAX_WORKERS = int(os.environ.get("K9_QUERY_WORKERS", 4))   # Requêtes d'un lot exécutées en même temps
+
+
+def _db_error():
+    st.error(f"❌ Impossible de trouver la base de données à l'adresse : {DB_PATH}")
+    return pd.DataFrame()
+
+
+def load_data(query, params=(), shared=False, schema=None):
+    """Connexion sécurisée à la base de données (cache de résultats, puis connexion du pool partagé)
+
+    shared=True : résultat aussi partagé entre les processus (k9.sharedcache), pour les agrégats coûteux.
+    schema : {colonne: type} (k9.frames), résultat lu par paquets en colonnes numériques, catégories et dates.
+    """
+    try:
+        df, size, hit, t0, t1, raw_size = fetch(query, params, shared, schema)
+    except sqlite3.OperationalError:
+        return _db_error()
+    _record(query, params, (t1 - t0) * 1000, df, size, cache_hit=hit, raw_size=raw_size)
+    return df
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Threads partagés par toutes les sessions ; chacun emprunte sa propre connexion au pool."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="k9-requetes")
+    return _executor
+
+
+def load_many(queries, label="lot", shared=False, schemas=None):
+    """Exécute en parallèle des requêtes indépendantes : {nom: (sql, params)} -> {nom: DataFrame}.
+
+    La page attend la plus lente au lieu de la somme de toutes. Le détail du lot (début et fin
+    de chaque requête, chemin critique) est ajouté à rerun_batches(). shared : comme load_data ;
+    schemas : {nom: schéma de colonnes} pour les requêtes à typer (voir load_data).
+    """
+    schemas = schemas or {}
+    t_start = time.perf_counter()
+    futures = {name: _get_executor().submit(fetch, query, params, shared, schemas.get(name))
+               for name, (query, params) in queries.items()}
+    frames, timeline = {}, {}
+    for name, future in futures.items():
+        query, params = queries[name]
+        try:
+            df, size, hit, t0, t1, raw_size = future.result()
+        except sqlite3.OperationalError:
+            frames[name] = _db_error()
+            continue
+        _record(query, params, (t1 - t0) * 1000, df, size, cache_hit=hit, raw_size=raw_size)
+        frames[name] = df
+        timeline[name] = {"debut_ms": round((t0 - t_start) * 1000, 2), "fin_ms": round((t1 - t_start) * 1000, 2),
+                          "ms": round((t1 - t0) * 1000, 2), "cache": hit}
+    rerun_batches().append(batch_report(label, timeline, (time.perf_counter() - t_start) * 1000))
+    return frames
+
+
+def batch_report(label, timeline, total_ms):
+    """Résumé d'un lot : durée réelle, somme des requêtes (exécution en série) et chemin critique."""
+    critical = max(timeline, key=lambda name: timeline[name]["fin_ms"], default=None)
+    serial_ms = sum(t["ms"] for t in timeline.values())
+    return {
+        "lot": label,
+        "requetes": len(timeline),
+        "total_ms": round(total_ms, 2),
+        "somme_ms": round(serial_ms, 2),
+        "gain": round(serial_ms / total_ms, 2) if total_ms > 0 else None,
+        "chemin_critique": critical,
+        "detail": timeline,
+    }
+
+
+def _record(query, params, ms, df, size, cache_hit, raw_size=None):
+    """Instrumentation (k9.querylog) : statistiques du processus + liste des requêtes du rerun en cours."""
+    entry = get_query_log().record(query, params, ms, len(df), size, cache_hit, raw_size)
+    rerun_queries().append(entry)
+
+
+def begin_rerun():
+    """À appeler en tête de script : vide les listes de requêtes et de lots du rerun précédent."""
+    st.session_state["k9_requetes_rerun"] = []
+    st.session_state["k9_lots_rerun"] = []
+
+
+def rerun_queries():
+    return st.session_state.setdefault("k9_requetes_rerun", [])
+
+
+def rerun_batches():
+    return st.session_state.setdefault("k9_lots_rerun", [])
+
+
+def paginate(key, build_query, page_size=PAGE_SIZE, schema=None):
+    """Page courante d'une liste paginée par clé (k9.history) ; la pile des curseurs vit dans la session."""
+    curseurs = st.session_state.setdefault(key, [None])
+    page = load_data(*build_query(curseurs[-1], page_size + 1), schema=schema)
+    has_next = len(page) > page_size
+    page = page.iloc[:page_size]
+
+    nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+    nav_prev.button("◀ Précédent", key=f"{key}_prev", disabled=len(curseurs) == 1, on_click=curseurs.pop)
+    nav_page.markdown(f"<div style='text-align: center;'>Page {len(curseurs)}</div>", unsafe_allow_html=True)
+    if has_next:
+        nav_next.button("Suivant ▶", key=f"{key}_next", on_click=curseurs.append, args=(next_cursor(page),))
+    return page